@@ -0,0 +1,36 @@
+"""
+bench_ribosome.py
+Compares Protein.ribosome's indexed/byte-table translation against the original per-residue library scan.
+Run from the repository root: python -m benchmarks.bench_ribosome
+"""
+import timeit
+import numpy as np
+from src.tau_project.models.aa import AminoAcid_library
+from src.tau_project.models.isoforms import CANONICAL_SEQUENCE
+from src.tau_project.models.protein import Protein
+
+
+def legacy_ribosome(AA_seq, AA_lib=AminoAcid_library):
+    """
+    The original Protein.ribosome loop: a linear library scan with is_identifier per residue.
+    """
+    created_seq = np.empty(len(AA_seq), dtype=object)
+    for i in range(len(AA_seq)):
+        iden = AA_seq[i]
+        for aa in AA_lib:
+            if aa.is_identifier(iden):
+                created_seq[i] = aa
+                break
+    return created_seq
+
+
+def main(n_proteins=200):
+    legacy = timeit.timeit(lambda: legacy_ribosome(CANONICAL_SEQUENCE), number=n_proteins)
+    indexed = timeit.timeit(lambda: Protein("Tau", CANONICAL_SEQUENCE), number=n_proteins)
+    print(f"{n_proteins} x {len(CANONICAL_SEQUENCE)}-residue tau")
+    print(f"  legacy scan : {legacy:.4f} s")
+    print(f"  byte table  : {indexed:.4f} s  ({legacy / indexed:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
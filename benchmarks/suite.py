@@ -0,0 +1,295 @@
+"""
+suite.py
+Benchmark suite for the simulation hot paths, parameterized over sequence length, number of sites, horizon and
+ensemble size. Results are written as JSON and can be compared against a stored baseline; cases slower than the
+baseline by more than the threshold are reported as regressions (exit status 1).
+Runs offline with only the project's own dependencies.
+Run from the repository root:
+    python -m benchmarks.suite --out bench.json
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --threshold 0.25
+"""
+import argparse
+import copy
+import json
+import platform
+import statistics
+import sys
+import time
+import timeit
+
+import numpy as np
+from src.tau_project.environment import Environment
+from src.tau_project.models.aa import AminoAcid_library
+from src.tau_project.models.isoforms import CANONICAL_SEQUENCE
+from src.tau_project.models.protein import Protein
+from src.tau_project.models.tau_protein import TauProtein
+from src.tau_project.phospho_utils import (
+    PhosphoEnsemble,
+    phospo_over_time,
+    phosphorylation,
+    phosphorylation_constants,
+    ptm_state,
+    set_ptm_state,
+)
+from src.tau_project.site_engine import ENGINE_VERSION
+
+THRESHOLD = 0.25
+
+
+def sequence_of_length(length):
+    """
+    Tau sequence repeated and cut to the requested length.
+    """
+    return (CANONICAL_SEQUENCE * (length // len(CANONICAL_SEQUENCE) + 1))[:length]
+
+
+def bench_ribosome(length):
+    sequence = sequence_of_length(length)
+    return lambda: Protein("Tau", sequence)
+
+
+def bench_add_ptm(n_residues):
+    serine = copy.deepcopy(next(aa for aa in AminoAcid_library if aa.one_letter == "S"))
+
+    def run():
+        for _ in range(n_residues):
+            serine.add_PTM("Phosphorylation")
+            serine.remove_PTM()
+
+    return run
+
+
+def bench_calculate_weight(n_residues):
+    residues = [copy.deepcopy(AminoAcid_library[i % len(AminoAcid_library)]) for i in range(n_residues)]
+
+    def run():
+        for aa in residues:
+            aa.calculate_weight()
+
+    return run
+
+
+def resettable(protein):
+    """
+    Setup for cases that mutate a protein: every sample starts from its initial PTM state and a fresh seeded rng.
+    Returns:
+        tuple: (reset callable, dict whose 'rng' entry is the current generator)
+    """
+    initial, _ = ptm_state(protein)
+    state = {}
+
+    def reset():
+        set_ptm_state(protein, initial)
+        state["rng"] = np.random.default_rng(0)
+
+    return reset, state
+
+
+def bench_phosphorylation(length):
+    protein = Protein("Tau", sequence_of_length(length))
+    pK, dpK = phosphorylation_constants(protein, rng=np.random.default_rng(0))
+    reset, state = resettable(protein)
+    return reset, lambda: phosphorylation(protein, pK, dpK, rng=state["rng"])
+
+
+def bench_phospo_over_time(horizon):
+    protein = Protein("Tau", CANONICAL_SEQUENCE)
+    reset, state = resettable(protein)
+    return reset, lambda: phospo_over_time(protein, horizon, rng=state["rng"])
+
+
+def bench_update_state(horizon, n_sites=79):
+    environment = Environment(39, 1.5, oxidative_stress=0.2)
+    tau = TauProtein(initial_probabilities=np.random.default_rng(0).random(n_sites))
+    timepoints = np.arange(horizon)
+    return lambda: tau.update_state(environment, timepoints)
+
+
+def bench_detect_motifs(length):
+    tau = TauProtein()
+    tau.sequence = Protein("Tau", sequence_of_length(length)).sequence
+
+    def run():
+        # Drop the cached index so every call measures a full scan.
+        tau._motif_index = None
+        return tau.detect_aggregation_motifs()
+
+    return run
+
+
+def bench_ensemble(n_molecules, horizon=50):
+    protein = Protein("Tau", CANONICAL_SEQUENCE)
+    return lambda: PhosphoEnsemble(protein, n_molecules, rng=np.random.default_rng(0)).run(horizon)
+
+
+# name -> (factory, parameter name -> values); the first value of every parameter is the quick setting.
+CASES = {
+    "ribosome": (bench_ribosome, {"length": [441, 4410, 44100]}),
+    "add_ptm": (bench_add_ptm, {"n_residues": [1000, 10000]}),
+    "calculate_weight": (bench_calculate_weight, {"n_residues": [1000, 10000]}),
+    "phosphorylation": (bench_phosphorylation, {"length": [441, 4410, 44100]}),
+    "phospo_over_time": (bench_phospo_over_time, {"horizon": [100, 1000]}),
+    # The step mode keeps the full (sites, horizon) matrix: 10000 x 790 is about 63 MB.
+    "update_state": (bench_update_state, {"horizon": [100, 1000, 10000], "n_sites": [79, 790]}),
+    "detect_motifs": (bench_detect_motifs, {"length": [441, 44100]}),
+    "ensemble": (bench_ensemble, {"n_molecules": [100, 1000, 10000]}),
+}
+
+
+def case_parameters(params, quick=False):
+    """
+    All parameter combinations of a case.
+    Args:
+        params (dict): Parameter name -> values.
+        quick (bool): Only the first value of every parameter.
+    Returns:
+        list: Parameter dicts.
+    """
+    combinations = [{}]
+    for name, values in params.items():
+        values = values[:1] if quick else values
+        combinations = [dict(combination, **{name: value}) for combination in combinations for value in values]
+    return combinations
+
+
+def case_key(name, params):
+    return name + "[" + ",".join(f"{key}={value}" for key, value in params.items()) + "]"
+
+
+def measure(function, repeat=5, min_time=0.2, setup=None):
+    """
+    Time a callable: calls per sample are chosen so a sample takes at least min_time.
+    Args:
+        function (callable): Zero-argument callable.
+        repeat (int): Number of samples.
+        min_time (float): Minimum duration of one sample in seconds.
+        setup (callable, optional): Called before every call, outside the timed region.
+    Returns:
+        dict: min, median and max seconds per call, calls per sample and samples.
+    """
+    timer = timeit.Timer(function)
+
+    def timed(number):
+        if setup is None:
+            return timer.timeit(number)
+        total = 0.0
+        for _ in range(number):
+            setup()
+            start = time.perf_counter()
+            function()
+            total += time.perf_counter() - start
+        return total
+
+    number = 1
+    while True:
+        elapsed = timed(number)
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed * 1.2))
+    samples = [elapsed / number] + [timed(number) / number for _ in range(repeat - 1)]
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "max": max(samples),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def run_suite(names=None, quick=False, repeat=5, min_time=0.2, progress=None):
+    """
+    Run the benchmark cases.
+    Args:
+        names (iterable, optional): Case names to run (default: all); substrings match.
+        quick (bool): Smallest parameter values only.
+        repeat (int): Samples per case.
+        min_time (float): Minimum duration of one sample.
+        progress (callable, optional): Called with the key of every finished case and its timing.
+    Returns:
+        dict: {"meta": machine and version info, "results": case key -> timing and parameters}
+    """
+    results = {}
+    for name, (factory, params) in CASES.items():
+        if names and not any(selected in name for selected in names):
+            continue
+        for combination in case_parameters(params, quick):
+            case = factory(**combination)
+            # A factory returns the timed callable, or (setup, callable) if every call needs fresh state.
+            setup, function = case if isinstance(case, tuple) else (None, case)
+            timing = measure(function, repeat, min_time, setup)
+            timing["params"] = combination
+            key = case_key(name, combination)
+            results[key] = timing
+            if progress is not None:
+                progress(key, timing)
+    return {"meta": machine_info(), "results": results}
+
+
+def machine_info():
+    return {
+        "engine_version": ENGINE_VERSION,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """
+    Compare median timings with a baseline.
+    Args:
+        results (dict): Output of run_suite.
+        baseline (dict): Earlier output of run_suite.
+        threshold (float): Allowed relative slowdown (0.25 = 25 %).
+    Returns:
+        list: (case key, baseline median, current median, ratio, regressed) for every case in both runs.
+    """
+    rows = []
+    for key, timing in results["results"].items():
+        reference = baseline["results"].get(key)
+        if reference is None:
+            continue
+        ratio = timing["median"] / reference["median"]
+        rows.append((key, reference["median"], timing["median"], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the simulation hot paths.")
+    parser.add_argument("cases", nargs="*", help=f"Cases to run (substring match): {', '.join(CASES)}")
+    parser.add_argument("--quick", action="store_true", help="Smallest parameter values only")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per sample")
+    parser.add_argument("--out", default=None, help="Write results as JSON")
+    parser.add_argument("--baseline", default=None, help="Compare against this JSON result file")
+    parser.add_argument("--save-baseline", default=None, help="Write results to this baseline file")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Allowed relative slowdown")
+    args = parser.parse_args(argv)
+
+    def report(key, timing):
+        print(f"{key:<48} {timing['median'] * 1e3:12.4f} ms  (x{timing['number']})", flush=True)
+
+    results = run_suite(args.cases, args.quick, args.repeat, args.min_time, report)
+    for path in (args.out, args.save_baseline):
+        if path:
+            with open(path, "w") as handle:
+                json.dump(results, handle, indent=2)
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as handle:
+        baseline = json.load(handle)
+    rows = compare(results, baseline, args.threshold)
+    print(f"\nAgainst {args.baseline} (threshold +{args.threshold:.0%}):")
+    for key, before, after, ratio, regressed in rows:
+        print(f"{key:<48} {before * 1e3:10.4f} -> {after * 1e3:10.4f} ms  {ratio:6.2f}x{'  REGRESSION' if regressed else ''}")
+    regressions = sum(row[4] for row in rows)
+    print(f"{regressions} regression(s) in {len(rows)} compared case(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,9 +11,12 @@ setup(
     install_requires=[
         'numpy',
         'matplotlib',
-        'seaborn',
-        'pandas',
     ],
+    entry_points={
+        'console_scripts': [
+            'tau-project=tau_project.cli:main',
+        ],
+    },
     tests_require=['pytest'],
     python_requires='>=3.8',
     classifiers=[
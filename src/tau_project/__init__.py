@@ -1 +1,4 @@
-
+"""
+Tau protein simulation package.
+"""
+__version__ = "0.1.0"
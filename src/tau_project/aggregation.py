@@ -0,0 +1,299 @@
+"""
+aggregation.py
+Population-level tau aggregation kinetics (discrete Smoluchowski coagulation with nucleation, elongation and
+fragmentation). Concentrations are tracked per aggregate size class: every size up to a cutoff has its own bin,
+larger sizes share logarithmically spaced bins, so memory is bounded whatever the largest aggregate.
+An aggregate formed between two bin sizes is split over both (fixed-pivot method), conserving number and mass.
+Nucleation and elongation are driven by the phosphorylation output of TauProtein.update_state.
+"""
+import numpy as np
+from .history import HistoryRecorder
+
+# Fragmentation of large aggregates: number of break positions sampled per bin.
+FRAGMENT_QUADRATURE = 64
+
+
+def size_bins(max_size=1e7, exact_max=32, ratio=1.25):
+    """
+    Representative aggregate sizes: 1..exact_max, then geometric steps of ratio up to max_size.
+    Args:
+        max_size (float): Largest represented size.
+        exact_max (int): Largest size with its own bin.
+        ratio (float): Ratio between consecutive logarithmic bins.
+    Returns:
+        np.ndarray: Increasing bin sizes.
+    """
+    exact = np.arange(1, exact_max + 1, dtype=float)
+    if max_size <= exact_max:
+        return exact
+    n_log = int(np.ceil(np.log(max_size / exact_max) / np.log(ratio)))
+    return np.concatenate((exact, exact_max * ratio ** np.arange(1, n_log + 1)))
+
+
+def pivot_split(sizes, values):
+    """
+    Split aggregates of arbitrary size over the two neighbouring bins so number and mass are conserved.
+    Aggregates beyond the last bin are put in the last bin with their mass conserved.
+    Args:
+        sizes (np.ndarray): Bin sizes.
+        values (np.ndarray): Aggregate sizes (>= 1).
+    Returns:
+        tuple: (lower bin, weight in lower bin, upper bin, weight in upper bin) arrays.
+    """
+    values = np.asarray(values, dtype=float)
+    last = len(sizes) - 1
+    lower = np.clip(np.searchsorted(sizes, values, side="right") - 1, 0, last)
+    upper = np.minimum(lower + 1, last)
+    span = sizes[upper] - sizes[lower]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        upper_weight = np.where(span > 0, (values - sizes[lower]) / span, 0.0)
+    lower_weight = 1 - upper_weight
+    beyond = values >= sizes[last]
+    lower_weight = np.where(beyond, values / sizes[last], lower_weight)
+    upper_weight = np.where(beyond, 0.0, upper_weight)
+    return lower, lower_weight, upper, upper_weight
+
+
+def deposit(n_bins, lower, lower_weight, upper, upper_weight, rates):
+    """
+    Scatter aggregate formation rates into bins according to a pivot split.
+    """
+    rates = np.broadcast_to(rates, np.shape(lower)).ravel()
+    return (
+        np.bincount(np.ravel(lower), np.ravel(lower_weight) * rates, minlength=n_bins)
+        + np.bincount(np.ravel(upper), np.ravel(upper_weight) * rates, minlength=n_bins)
+    )
+
+
+def phosphorylation_signal(source):
+    """
+    Average site phosphorylation per timepoint from the output of TauProtein.update_state.
+    Args:
+        source: SiteProbabilities (returned by update_state), a HistoryRecorder or list of dicts, or an array.
+    Returns:
+        np.ndarray: Average phosphorylation probability per timepoint.
+    """
+    if hasattr(source, "matrix"):
+        return source.matrix.mean(axis=0)
+    if isinstance(source, HistoryRecorder):
+        return source.column("avg_prob")
+    if len(source) and isinstance(source[0], dict):
+        return np.array([entry["avg_prob"] for entry in source])
+    return np.asarray(source, dtype=float)
+
+
+class AggregationResult:
+    """
+    Size distributions of an aggregation run, one row per sampled time.
+    """
+
+    def __init__(self, times, sizes, concentrations, avg_prob):
+        """
+        Initialize an AggregationResult.
+        Args:
+            times (np.ndarray): Sample times (minutes).
+            sizes (np.ndarray): Bin sizes.
+            concentrations (np.ndarray): (n_times, n_bins) aggregate counts per bin.
+            avg_prob (np.ndarray): Phosphorylation signal that drove the run.
+        """
+        self.times = times
+        self.sizes = sizes
+        self.concentrations = concentrations
+        self.avg_prob = avg_prob
+
+    def total_mass(self):
+        """
+        Returns:
+            np.ndarray: Monomer-equivalents over time (constant up to rounding).
+        """
+        return self.concentrations @ self.sizes
+
+    def mean_size(self, min_size=2):
+        """
+        Args:
+            min_size (float): Smallest size counted as an aggregate.
+        Returns:
+            np.ndarray: Number-averaged aggregate size over time (0 when there are none).
+        """
+        mask = self.sizes >= min_size
+        number = self.concentrations[:, mask].sum(axis=1)
+        mass = self.concentrations[:, mask] @ self.sizes[mask]
+        return np.divide(mass, number, out=np.zeros_like(mass), where=number > 0)
+
+    def fraction_above(self, min_size):
+        """
+        Args:
+            min_size (float): Size threshold.
+        Returns:
+            np.ndarray: Fraction of the total mass in aggregates of at least min_size, over time.
+        """
+        mask = self.sizes >= min_size
+        return (self.concentrations[:, mask] @ self.sizes[mask]) / self.total_mass()
+
+
+class AggregationKinetics:
+    """
+    Smoluchowski aggregation of a tau monomer population.
+    Rates are intensive: concentrations are aggregate counts, and every bimolecular rate is scaled by the
+    monomer pool size, so the dynamics do not depend on n_monomers.
+    """
+
+    def __init__(
+        self,
+        n_monomers=1e6,
+        nucleation_rate=1e-4,
+        nucleus_size=2,
+        elongation_rate=1.0,
+        fragmentation_rate=1e-5,
+        coagulation_rate=0.1,
+        phospho_sensitivity=4.0,
+        max_size=1e7,
+        exact_max=32,
+        ratio=1.25,
+    ):
+        """
+        Initialize an AggregationKinetics model.
+        Args:
+            n_monomers (float): Monomer pool size (all tau starts as monomer).
+            nucleation_rate (float): Primary nucleation rate constant (per minute).
+            nucleus_size (int): Size of a primary nucleus.
+            elongation_rate (float): Monomer addition rate constant (per minute, at a full monomer pool).
+            fragmentation_rate (float): Breakage rate per bond (per minute).
+            coagulation_rate (float): Aggregate-aggregate coalescence constant (per minute, constant kernel).
+            phospho_sensitivity (float): Nucleation and elongation scale by exp(sensitivity * (avg_prob - 0.5)).
+            max_size (float): Largest represented aggregate size.
+            exact_max (int): Largest size with its own bin.
+            ratio (float): Ratio between consecutive logarithmic bins.
+        Raises:
+            ValueError: If the nucleus does not fit in the exact bins.
+        """
+        if not 2 <= nucleus_size <= exact_max:
+            raise ValueError(f"Nucleus size must be in [2, {exact_max}], got {nucleus_size}")
+        self.n_monomers = float(n_monomers)
+        self.nucleation_rate = nucleation_rate
+        self.nucleus_size = nucleus_size
+        self.elongation_rate = elongation_rate
+        self.fragmentation_rate = fragmentation_rate
+        self.coagulation_rate = coagulation_rate
+        self.phospho_sensitivity = phospho_sensitivity
+        self.sizes = size_bins(max_size, exact_max, ratio)
+        n_bins = len(self.sizes)
+        # Precomputed destinations: monomer addition, pairwise coalescence and fragment distributions.
+        self._growth = pivot_split(self.sizes, self.sizes + 1)
+        self._merge = pivot_split(self.sizes, self.sizes[:, None] + self.sizes[None, :])
+        self._fragments = self._fragment_matrix()
+        self._bonds = np.maximum(self.sizes - 1, 0.0)
+        self._aggregate = np.arange(n_bins) >= 1
+        self.concentrations = np.zeros(n_bins)
+        self.concentrations[0] = self.n_monomers
+        self.time = 0.0
+
+    def _fragment_matrix(self):
+        """
+        Expected aggregates per bin produced by one breakage of an aggregate in each bin (bonds break uniformly).
+        """
+        n_bins = len(self.sizes)
+        matrix = np.zeros((n_bins, n_bins))
+        for i, size in enumerate(self.sizes):
+            if size < 2:
+                continue
+            if size - 1 <= FRAGMENT_QUADRATURE:
+                pieces = np.arange(1, int(round(size)))
+            else:
+                pieces = 1 + (size - 2) * (np.arange(FRAGMENT_QUADRATURE) + 0.5) / FRAGMENT_QUADRATURE
+            weight = 1.0 / len(pieces)
+            matrix[i] += deposit(n_bins, *pivot_split(self.sizes, pieces), weight)
+            matrix[i] += deposit(n_bins, *pivot_split(self.sizes, size - pieces), weight)
+        return matrix
+
+    def derivative(self, concentrations, phospho_factor=1.0):
+        """
+        Rate of change of every bin.
+        Args:
+            concentrations (np.ndarray): Aggregate counts per bin.
+            phospho_factor (float): Multiplier on nucleation and elongation.
+        Returns:
+            np.ndarray: d(concentrations)/dt.
+        """
+        c = concentrations
+        n_bins = len(c)
+        monomer_fraction = c[0] / self.n_monomers
+        d = np.zeros(n_bins)
+        # Primary nucleation: nucleus_size monomers -> one nucleus.
+        nucleation = phospho_factor * self.nucleation_rate * self.n_monomers * monomer_fraction**self.nucleus_size
+        d[0] -= self.nucleus_size * nucleation
+        d[self.nucleus_size - 1] += nucleation
+        # Elongation: aggregate + monomer -> aggregate one larger.
+        growth = np.where(self._aggregate, phospho_factor * self.elongation_rate * monomer_fraction * c, 0.0)
+        d -= growth
+        d[0] -= growth.sum()
+        d += deposit(n_bins, *self._growth, growth)
+        # Fragmentation: uniform breakage of a bond.
+        breakage = self.fragmentation_rate * self._bonds * c
+        d -= breakage
+        d += breakage @ self._fragments
+        # Coagulation between aggregates (constant kernel); each unordered pair event is counted once.
+        aggregates = np.where(self._aggregate, c, 0.0)
+        pairs = (0.5 * self.coagulation_rate / self.n_monomers) * np.outer(aggregates, aggregates)
+        d -= 2 * pairs.sum(axis=1)
+        d += deposit(n_bins, *self._merge, pairs)
+        return d
+
+    def advance(self, duration, phospho_factor=1.0, max_change=0.05, max_dt=1.0):
+        """
+        Integrate with adaptive explicit Euler steps.
+        Args:
+            duration (float): Minutes to advance.
+            phospho_factor (float): Multiplier on nucleation and elongation.
+            max_change (float): Largest relative decrease of any populated bin per step.
+            max_dt (float): Largest step (minutes).
+        Returns:
+            np.ndarray: Concentrations at the end of the interval.
+        """
+        floor = 1e-12 * self.n_monomers
+        remaining = duration
+        while remaining > 0:
+            d = self.derivative(self.concentrations, phospho_factor)
+            shrinking = (d < 0) & (self.concentrations > floor)
+            dt = min(remaining, max_dt)
+            if shrinking.any():
+                dt = min(dt, max_change * np.min(self.concentrations[shrinking] / -d[shrinking]))
+            self.concentrations += dt * d
+            # Bins below the floor can overshoot zero; their mass is negligible.
+            np.maximum(self.concentrations, 0.0, out=self.concentrations)
+            remaining -= dt
+            self.time += dt
+        return self.concentrations
+
+    def run(self, phosphorylation, minutes_per_step=1.0):
+        """
+        Drive the population with a per-timepoint phosphorylation signal.
+        Args:
+            phosphorylation: Output of TauProtein.update_state (SiteProbabilities), its history, or an array.
+            minutes_per_step (float): Minutes between timepoints.
+        Returns:
+            AggregationResult: Size distribution at the start and after every timepoint.
+        """
+        avg_prob = phosphorylation_signal(phosphorylation)
+        rows = [self.concentrations.copy()]
+        times = [self.time]
+        for prob in avg_prob:
+            self.advance(minutes_per_step, np.exp(self.phospho_sensitivity * (prob - 0.5)))
+            rows.append(self.concentrations.copy())
+            times.append(self.time)
+        return AggregationResult(np.array(times), self.sizes, np.array(rows), avg_prob)
+
+
+def simulate_population(tau, environment, timepoints, **kinetics):
+    """
+    Run TauProtein.update_state and feed its phosphorylation into a population aggregation model.
+    Args:
+        tau (TauProtein): Tau molecule whose site kinetics drive the population.
+        environment (Environment): Simulation environment.
+        timepoints (np.ndarray): Timepoints (one minute apart).
+        **kinetics: Keyword arguments for AggregationKinetics.
+    Returns:
+        AggregationResult: Population size distributions over time.
+    """
+    site_probabilities = tau.update_state(environment, timepoints)
+    return AggregationKinetics(**kinetics).run(site_probabilities)
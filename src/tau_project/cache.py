@@ -0,0 +1,192 @@
+"""
+cache.py
+Content-addressed cache of deterministic simulation results.
+A result is keyed by a fingerprint of everything that determines it (model, Environment, isoform, horizon, seed,
+PTM presets and engine version), so a repeated request is served from memory or disk instead of recomputed.
+Runs without a seed are not deterministic and are never cached.
+"""
+import hashlib
+import json
+import os
+from collections import OrderedDict
+import numpy as np
+from .site_engine import ENGINE_VERSION
+from .environment import Environment
+
+# On-disk cache directory of default_cache(); without it the default cache stays in memory.
+CACHE_DIR = os.environ.get("TAU_PROJECT_CACHE")
+MAX_ENTRIES = 32
+MAX_BYTES = 256 * 1024 * 1024
+META_KEY = "__meta__"
+
+
+def fingerprint(model, environment=None, isoform=None, horizon=None, seed=None, PTMs=None, **extra):
+    """
+    Canonical fingerprint of a simulation request.
+    Args:
+        model (str): Simulation kind (e.g. 'tau', 'phospho').
+        environment (Environment or dict, optional): Environment; a dict is read as Environment keyword arguments,
+            so defaults given explicitly or left out give the same fingerprint.
+        isoform (str, optional): Tau isoform.
+        horizon (int, optional): Number of timepoints.
+        seed (int, optional): Seed of the run.
+        PTMs (list, optional): (position, modification) presets.
+        **extra: Further JSON-serializable parameters that change the result.
+    Returns:
+        str: SHA-256 hex digest.
+    """
+    if isinstance(environment, dict):
+        environment = Environment(**environment)
+    request = {
+        "engine_version": ENGINE_VERSION,
+        "model": model,
+        "environment": environment.as_dict() if environment is not None else None,
+        "isoform": isoform,
+        "horizon": int(horizon) if horizon is not None else None,
+        "seed": seed,
+        "PTMs": [[int(position), modification] for position, modification in PTMs or []],
+        "extra": extra,
+    }
+    return hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    In-process LRU of results, backed by an optional on-disk cache that evicts least recently used entries once
+    it exceeds its size limit. A result is a dict of NumPy arrays and JSON-serializable values; cached arrays
+    are read-only.
+    """
+
+    def __init__(self, directory=None, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        """
+        Initialize a ResultCache.
+        Args:
+            directory (str, optional): Directory of the on-disk cache; memory only if omitted.
+            max_entries (int): Results kept in memory.
+            max_bytes (int): Size limit of the on-disk cache.
+        """
+        self.directory = str(directory) if directory is not None else None
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def get(self, key):
+        """
+        Args:
+            key (str): Fingerprint.
+        Returns:
+            dict or None: The cached result, or None on a miss.
+        """
+        value = self.memory.get(key)
+        if value is not None:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return value
+        value = self._load(key) if self.directory is not None else None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        """
+        Cache a result.
+        Args:
+            key (str): Fingerprint.
+            value (dict): Name -> NumPy array or JSON-serializable value.
+        """
+        for item in value.values():
+            if isinstance(item, np.ndarray):
+                item.flags.writeable = False
+        self._remember(key, value)
+        if self.directory is not None:
+            self._save(key, value)
+            self._evict()
+
+    def memoize(self, key, compute):
+        """
+        Return the cached result of key, computing and caching it on a miss.
+        Args:
+            key (str): Fingerprint.
+            compute (callable): Returns the result when called without arguments.
+        Returns:
+            dict: The result.
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """
+        Drop every cached result, in memory and on disk.
+        """
+        self.memory.clear()
+        if self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith(".npz"):
+                    os.remove(os.path.join(self.directory, name))
+
+    def _remember(self, key, value):
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def _save(self, key, value):
+        arrays = {name: item for name, item in value.items() if isinstance(item, np.ndarray)}
+        meta = {name: item for name, item in value.items() if not isinstance(item, np.ndarray)}
+        partial = self._path(key) + ".part.npz"
+        np.savez(partial, **{META_KEY: np.array(json.dumps(meta))}, **arrays)
+        os.replace(partial, self._path(key))
+
+    def _load(self, key):
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                value = json.loads(str(data[META_KEY]))
+                for name in data.files:
+                    if name != META_KEY:
+                        value[name] = data[name]
+                        value[name].flags.writeable = False
+            os.utime(path)  # Disk entries are evicted by last use.
+        except (OSError, ValueError, KeyError):
+            return None
+        return value
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz") and not name.endswith(".part.npz"):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+
+
+_default_cache = None
+
+
+def default_cache():
+    """
+    Returns:
+        ResultCache: Process-wide cache, kept on disk only if the TAU_PROJECT_CACHE variable names a directory.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache(CACHE_DIR)
+    return _default_cache
@@ -4,6 +4,8 @@ from .environment import Environment
 
 # Store the current environment globally
 current_env = None
+# Optional seed of the menu simulations; seeded runs are memoized in the result cache, unseeded runs are not
+current_seed = None
 
 
 def get_environment_from_user():
@@ -35,22 +37,45 @@ def get_environment_from_user():
     )
 
 
-def run_tau_simulation():
-    from .simulation import tau_simulation
+def get_seed_from_user():
+    seed = input("Seed [default: none, a new random run each time]: ").strip()
+    try:
+        return int(seed) if seed else None
+    except ValueError:
+        print("Invalid seed. Runs stay unseeded.")
+        return None
 
+
+def get_current_environment():
     global current_env
     if current_env is None:
         current_env = Environment(
             temperature=39, kinase_level=1.5, oxidative_stress=0.2
         )
-    tau_simulation.run_and_plot_simulation(current_env)
+    return current_env
+
+
+def run_tau_simulation():
+    from .simulation import tau_simulation
+    from .cache import default_cache
+
+    tau_simulation.run_and_plot_simulation(
+        get_current_environment(), seed=current_seed, cache=default_cache()
+    )
 
 
 def show_tau_visualization():
     print("\n[Showing tau protein phosphorylation & aggregation visualization...]")
     from .simulation import tau_simulation
-
-    tau_simulation.run_and_plot_simulation(plot_sites=True, plot_heatmap=True)
+    from .cache import default_cache
+
+    tau_simulation.run_and_plot_simulation(
+        get_current_environment(),
+        plot_sites=True,
+        plot_heatmap=True,
+        seed=current_seed,
+        cache=default_cache(),
+    )
     print("\n[Visualization complete.]")
 
 
@@ -73,8 +98,9 @@ Tau Protein Simulator Chatbot Menu:
 
 
 def set_environment():
-    global current_env
+    global current_env, current_seed
     current_env = get_environment_from_user()
+    current_seed = get_seed_from_user()
     print("\n[Environment updated!]\n")
 
 
@@ -0,0 +1,172 @@
+"""
+checkpoint.py
+Periodic checkpoints for long phospo_over_time and TauProtein.update_state runs.
+A checkpoint is one small .npz file (per-residue PTM codes, current site probabilities, RNG states and a JSON
+state header) replaced atomically; finished trajectory segments are appended to a raw binary file, so each
+checkpoint costs O(segment) rather than O(run). Resuming restores everything and continues bit for bit.
+"""
+import json
+import os
+import random
+import numpy as np
+
+CHECKPOINT_FILE = "checkpoint.npz"
+TRAJECTORY_FILE = "trajectory.f64"
+
+
+def capture_rng_state(rng=None):
+    """
+    Snapshot the random module, the global NumPy RNG and optionally a Generator.
+    Args:
+        rng (np.random.Generator, optional): Generator to include.
+    Returns:
+        tuple: (arrays, state) - arrays for the bulky parts, a JSON-safe dict for the rest.
+    """
+    version, internal, gauss_next = random.getstate()
+    name, keys, position, has_gauss, cached_gaussian = np.random.get_state()
+    arrays = {
+        "random_state": np.array(internal, dtype=np.uint32),
+        "numpy_keys": np.asarray(keys, dtype=np.uint32),
+    }
+    state = {
+        "random_version": version,
+        "random_gauss": gauss_next,
+        "numpy_state": [name, int(position), int(has_gauss), float(cached_gaussian)],
+        "generator_state": rng.bit_generator.state if rng is not None else None,
+    }
+    return arrays, state
+
+
+def restore_rng_state(arrays, state, rng=None):
+    """
+    Restore the RNG states captured by capture_rng_state.
+    Args:
+        arrays (dict): Arrays from capture_rng_state.
+        state (dict): State from capture_rng_state.
+        rng (np.random.Generator, optional): Generator to restore in place.
+    """
+    random.setstate((state["random_version"], tuple(arrays["random_state"].tolist()), state["random_gauss"]))
+    name, position, has_gauss, cached_gaussian = state["numpy_state"]
+    np.random.set_state((name, arrays["numpy_keys"], position, has_gauss, cached_gaussian))
+    if rng is not None and state["generator_state"] is not None:
+        rng.bit_generator.state = state["generator_state"]
+
+
+class Checkpoint:
+    """
+    A loaded checkpoint: the step reached, its arrays and its JSON state.
+    """
+
+    def __init__(self, step, arrays, state):
+        """
+        Initialize a Checkpoint.
+        Args:
+            step (int): Number of completed steps.
+            arrays (dict): Saved arrays.
+            state (dict): Saved JSON state.
+        """
+        self.step = step
+        self.arrays = arrays
+        self.state = state
+
+
+class Checkpointer:
+    """
+    Writes and reads the checkpoint of one run in a directory.
+    """
+
+    def __init__(self, directory, every=5000):
+        """
+        Initialize a Checkpointer.
+        Args:
+            directory (str): Checkpoint directory (created if missing).
+            every (int): Steps between checkpoints.
+        Raises:
+            ValueError: If every is not positive.
+        """
+        if every < 1:
+            raise ValueError(f"Checkpoint interval must be at least 1, got {every}")
+        self.directory = str(directory)
+        self.every = every
+        os.makedirs(self.directory, exist_ok=True)
+
+    @property
+    def checkpoint_path(self):
+        return os.path.join(self.directory, CHECKPOINT_FILE)
+
+    @property
+    def trajectory_path(self):
+        return os.path.join(self.directory, TRAJECTORY_FILE)
+
+    def save(self, step, run, arrays=None, rng=None, **state):
+        """
+        Atomically replace the checkpoint.
+        Args:
+            step (int): Number of completed steps.
+            run (dict): Description of the run; a resume must present the same description.
+            arrays (dict, optional): Arrays to save.
+            rng (np.random.Generator, optional): Generator whose state is saved with the global RNGs.
+            **state: JSON-serializable state.
+        """
+        rng_arrays, rng_state = capture_rng_state(rng)
+        header = dict(state, step=step, run=run, rng=rng_state)
+        payload = dict(arrays or {}, **rng_arrays)
+        payload["header"] = np.frombuffer(json.dumps(header).encode(), dtype=np.uint8)
+        partial = self.checkpoint_path + ".part.npz"
+        np.savez(partial, **payload)
+        os.replace(partial, self.checkpoint_path)
+
+    def load(self, run, rng=None):
+        """
+        Load the checkpoint and restore the RNG states.
+        Args:
+            run (dict): Description of the run being resumed.
+            rng (np.random.Generator, optional): Generator restored in place.
+        Returns:
+            Checkpoint or None: The checkpoint, or None if there is none yet.
+        Raises:
+            ValueError: If the checkpoint belongs to a different run.
+        """
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with np.load(self.checkpoint_path) as data:
+            arrays = {name: data[name] for name in data.files if name != "header"}
+            header = json.loads(data["header"].tobytes().decode())
+        if header["run"] != run:
+            raise ValueError(f"Checkpoint in {self.directory} belongs to a different run: {header['run']}")
+        restore_rng_state(arrays, header["rng"], rng)
+        return Checkpoint(header["step"], arrays, header)
+
+    def append_trajectory(self, block):
+        """
+        Append finished rows to the trajectory file.
+        Args:
+            block (np.ndarray): float64 rows.
+        """
+        with open(self.trajectory_path, "ab") as handle:
+            handle.write(np.ascontiguousarray(block, dtype=np.float64).tobytes())
+
+    def read_trajectory(self, n_rows, row_shape=()):
+        """
+        Read the first n_rows rows, dropping rows written after the checkpoint.
+        Args:
+            n_rows (int): Rows covered by the checkpoint.
+            row_shape (tuple): Shape of one row.
+        Returns:
+            np.ndarray: Rows of shape (n_rows,) + row_shape.
+        """
+        row_size = int(np.prod(row_shape, dtype=np.int64)) * 8
+        if not os.path.exists(self.trajectory_path):
+            open(self.trajectory_path, "wb").close()
+        with open(self.trajectory_path, "r+b") as handle:
+            handle.truncate(n_rows * row_size)
+            data = np.frombuffer(handle.read(), dtype=np.float64)
+        return data.reshape((n_rows,) + tuple(row_shape))
+
+    def clear(self):
+        """
+        Remove the checkpoint and trajectory files.
+        """
+        for path in (self.checkpoint_path, self.trajectory_path):
+            if os.path.exists(path):
+                os.remove(path)
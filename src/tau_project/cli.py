@@ -0,0 +1,210 @@
+"""
+cli.py
+Command-line entry point (installed as `tau-project`) with simulate, sweep, batch, serve, plot and chat
+subcommands.
+Every subcommand imports what it needs when it runs, so `tau-project simulate` never loads matplotlib.
+"""
+import argparse
+import os
+import sys
+
+ENVIRONMENT_DEFAULTS = {
+    "temperature": 39,
+    "kinase_level": 1.5,
+    "phosphatase_level": 1.0,
+    "protease_level": 1.0,
+    "oxidative_stress": 0.2,
+}
+PLOT_KINDS = ("summary", "sites", "heatmap")
+
+
+def simulate(args):
+    """
+    Run TauProtein.update_state once, print a summary and optionally store and plot the results.
+    """
+    import numpy as np
+    from .environment import Environment
+    from .models.tau_protein import TauProtein
+
+    environment = Environment(**{name: getattr(args, name) for name in ENVIRONMENT_DEFAULTS})
+    rng = np.random.default_rng(args.seed) if args.seed is not None else None
+    tau = TauProtein(isoform=args.isoform, rng=rng)
+    timepoints = np.arange(args.timepoints)
+    observer = None
+    if args.profile or args.profile_out:
+        from .instrumentation import Instrumentation
+
+        observer = Instrumentation(every=max(args.timepoints // 100, 1), print_report=args.profile)
+    site_probabilities = tau.update_state(environment, timepoints, observer=observer)
+    if args.profile_out:
+        observer.export(args.profile_out)
+    avg_probs = tau.history.column("avg_prob")
+    print(f"Final average phosphorylation probability: {avg_probs[-1]:.3f}")
+    print(f"Final aggregation state: {tau.aggregation_state}")
+    print(f"Maximum phosphorylation count: {tau.history.column('phospho_count').max()}")
+    if args.store:
+        from .result_store import save_update_state
+
+        save_update_state(args.store, tau, site_probabilities, environment, seed=args.seed)
+        print(f"Results stored in {args.store}")
+    if args.plot:
+        written = render(tau.history, site_probabilities, timepoints, args.plot, PLOT_KINDS)
+        print(f"{len(written)} figures written to {args.plot}")
+    return 0
+
+
+def sweep(args, extra):
+    """
+    Forward to the sweep command line (see simulation/sweep.py).
+    """
+    from .simulation import sweep as sweep_module
+
+    sweep_module.main(extra)
+    return 0
+
+
+def batch(args):
+    """
+    Run a job file with the batch runner (see simulation/batch.py).
+    """
+    from .simulation import batch as batch_module
+
+    argv = [args.jobs, "--out", args.out, "--retries", str(args.retries)]
+    if args.processes is not None:
+        argv += ["--processes", str(args.processes)]
+    if args.max_in_flight is not None:
+        argv += ["--max-in-flight", str(args.max_in_flight)]
+    return batch_module.main(argv)
+
+
+def serve(args):
+    """
+    Run the local HTTP/JSON simulation service (see service.py).
+    """
+    from . import service
+
+    argv = ["--host", args.host, "--port", str(args.port), "--store-dir", args.store_dir]
+    if args.processes is not None:
+        argv += ["--processes", str(args.processes)]
+    if args.cache_dir is not None:
+        argv += ["--cache-dir", args.cache_dir]
+    return service.main(argv)
+
+
+def plot(args):
+    """
+    Write figures for results saved with `simulate --store`.
+    """
+    import numpy as np
+    from .result_store import ResultStore
+    from .site_engine import SiteProbabilities
+
+    store = ResultStore(args.store)
+    history = store.read_history()
+    info = store.meta["arrays"]["site_probabilities"]
+    site_probabilities = SiteProbabilities(info["sites"], store.read("site_probabilities")[...])
+    timepoints = np.arange(site_probabilities.matrix.shape[1])
+    written = render(history, site_probabilities, timepoints, args.out, args.kind)
+    print(f"{len(written)} figures written to {args.out}")
+    return 0
+
+
+def render(history, site_probabilities, timepoints, out_dir, kinds):
+    """
+    Write the requested plots of one run to out_dir.
+    Args:
+        history (HistoryRecorder): Run history.
+        site_probabilities (SiteProbabilities): Sites x timepoints probabilities.
+        timepoints (np.ndarray): Timepoints.
+        out_dir (str): Output directory (created if missing).
+        kinds (iterable): Plots to write, from PLOT_KINDS.
+    Returns:
+        list: Paths of the written figures.
+    """
+    from .plot_utils import plot_phosphorylation_heatmap, plot_site_probabilities, plot_tau_summary
+
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    if "summary" in kinds:
+        written.append(plot_tau_summary(history, path=os.path.join(out_dir, "summary.png")))
+    if "sites" in kinds:
+        written.append(plot_site_probabilities(site_probabilities, timepoints, path=os.path.join(out_dir, "sites.png")))
+    if "heatmap" in kinds:
+        written.append(plot_phosphorylation_heatmap(site_probabilities, timepoints, path=os.path.join(out_dir, "heatmap.png")))
+    return written
+
+
+def chat(args):
+    """
+    Start the interactive chatbot menu.
+    """
+    from .chatbot import main_menu
+
+    main_menu()
+    return 0
+
+
+def build_parser():
+    """
+    Returns:
+        argparse.ArgumentParser: Parser of the tau-project command line.
+    """
+    parser = argparse.ArgumentParser(prog="tau-project", description="Tau protein phosphorylation and aggregation simulator.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("simulate", help="Run one simulation and print a summary")
+    for name, default in ENVIRONMENT_DEFAULTS.items():
+        run.add_argument(f"--{name.replace('_', '-')}", type=float, default=default)
+    run.add_argument("--timepoints", type=int, default=100)
+    run.add_argument("--isoform", default="4R")
+    run.add_argument("--seed", type=int, default=None, help="Seed of the initial site state")
+    run.add_argument("--store", default=None, help="Write the results to this result-store directory")
+    run.add_argument("--plot", default=None, help="Write the plots of the run to this directory")
+    run.add_argument("--profile", action="store_true", help="Print phase timings and counters of the run")
+    run.add_argument("--profile-out", default=None, help="Export the instrumentation data (.json, or .csv samples)")
+
+    commands.add_parser("sweep", help="Parameter sweep (options as in simulation/sweep.py)", add_help=False)
+
+    jobs = commands.add_parser("batch", help="Run a job file of simulations across a worker pool")
+    jobs.add_argument("jobs", help="Job file (.json or .jsonl)")
+    jobs.add_argument("--out", default="batch_results", help="Output directory")
+    jobs.add_argument("--processes", type=int, default=None)
+    jobs.add_argument("--max-in-flight", type=int, default=None, help="Bound on queued plus running jobs")
+    jobs.add_argument("--retries", type=int, default=1)
+
+    server = commands.add_parser("serve", help="Serve simulations over HTTP/JSON on localhost")
+    server.add_argument("--host", default="127.0.0.1")
+    server.add_argument("--port", type=int, default=8765)
+    server.add_argument("--processes", type=int, default=None)
+    server.add_argument("--store-dir", default="service_results", help="Directory for stored results")
+    server.add_argument("--cache-dir", default=None, help="Keep the result cache on disk in this directory")
+
+    draw = commands.add_parser("plot", help="Plot results stored by `simulate --store`")
+    draw.add_argument("store", help="Result-store directory")
+    draw.add_argument("--out", default="figures", help="Directory for the figures")
+    draw.add_argument("--kind", nargs="+", choices=PLOT_KINDS, default=list(PLOT_KINDS))
+
+    commands.add_parser("chat", help="Interactive menu")
+    return parser
+
+
+def main(argv=None):
+    """
+    Entry point of the tau-project command.
+    Args:
+        argv (list, optional): Arguments (default: sys.argv[1:]).
+    Returns:
+        int: Exit status.
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command == "sweep":
+        return sweep(args, extra)
+    if extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    return {"simulate": simulate, "batch": batch, "serve": serve, "plot": plot, "chat": chat}[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,3 +23,18 @@ class Environment:
         self.phosphatase_level = phosphatase_level
         self.protease_level = protease_level
         self.oxidative_stress = oxidative_stress
+
+    def as_dict(self):
+        """
+        Returns:
+            dict: Parameter name -> value, with every value as a float.
+        """
+        return {name: float(value) for name, value in vars(self).items()}
+
+    def fingerprint(self):
+        """
+        Canonical, hashable snapshot of the current parameters (the Environment itself stays mutable).
+        Returns:
+            tuple: Sorted (name, value) pairs.
+        """
+        return tuple(sorted(self.as_dict().items()))
@@ -0,0 +1,251 @@
+"""
+history.py
+Columnar recorder for per-timepoint simulation history (TauProtein.history).
+Rows live in preallocated typed NumPy columns, with the aggregation state stored as a categorical int8.
+Supports decimation (every k-th step, or the min/max rows of each window) and a bounded ring-buffer mode.
+Indexing and iteration still yield one dict per row, so it can be used like the former list of dicts.
+"""
+import numpy as np
+
+COLUMNS = {
+    "age": np.int64,
+    "minute": np.int64,
+    "phospho_count": np.int32,
+    "aggregation_state": np.int8,
+    "avg_prob": np.float64,
+}
+AGGREGATION_STATES = ("monomer", "oligomer", "fibril")
+STATE_CODES = {state: code for code, state in enumerate(AGGREGATION_STATES)}
+INITIAL_CAPACITY = 1024
+
+
+def encode_states(states):
+    """
+    Args:
+        states (array-like): Aggregation state names or int8 codes.
+    Returns:
+        np.ndarray: int8 codes.
+    """
+    states = np.asarray(states)
+    if states.dtype.kind in "iu":
+        return states.astype(np.int8)
+    return np.array([STATE_CODES[state] for state in states.tolist()], dtype=np.int8)
+
+
+def as_columns(history):
+    """
+    Column arrays of a history, from a HistoryRecorder or a list of dicts.
+    Args:
+        history (HistoryRecorder or list): History.
+    Returns:
+        dict: Column name -> array (aggregation_state as int8 codes).
+    """
+    if isinstance(history, HistoryRecorder):
+        return history.columns()
+    columns = {name: np.array([entry.get(name, 0) for entry in history]) for name in COLUMNS if name != "aggregation_state"}
+    columns["aggregation_state"] = encode_states([entry["aggregation_state"] for entry in history])
+    return columns
+
+
+class HistoryRecorder:
+    """
+    Append-only table of history rows with typed columns.
+    """
+
+    def __init__(self, stride=1, window=None, window_key="avg_prob", max_rows=None):
+        """
+        Initialize a HistoryRecorder.
+        Args:
+            stride (int): Keep every stride-th step (steps 0, stride, 2 * stride, ...).
+            window (int, optional): Instead of striding, keep the min and max rows of every window of this many steps.
+            window_key (str): Column whose min/max selects the kept rows of a window.
+            max_rows (int, optional): Ring-buffer mode: keep only the most recent max_rows rows.
+        Raises:
+            ValueError: If the options are inconsistent.
+        """
+        if stride < 1:
+            raise ValueError(f"Stride must be at least 1, got {stride}")
+        if window is not None and (window < 1 or stride != 1):
+            raise ValueError("Window decimation needs a positive window and stride 1")
+        if window_key not in COLUMNS:
+            raise ValueError(f"Unknown column: {window_key}")
+        if max_rows is not None and max_rows < 1:
+            raise ValueError(f"max_rows must be at least 1, got {max_rows}")
+        self.stride = stride
+        self.window = window
+        self.window_key = window_key
+        self.max_rows = max_rows
+        self.clear()
+
+    def clear(self):
+        """
+        Drop all rows.
+        """
+        capacity = self.max_rows if self.max_rows is not None else INITIAL_CAPACITY
+        self._data = {name: np.empty(capacity, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self._size = 0
+        # Ring mode: index of the oldest row once the buffer has wrapped.
+        self._head = 0
+        self._pending = {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self.steps = 0
+
+    def _store(self, rows):
+        n = len(rows["age"])
+        if not n:
+            return
+        if self.max_rows is None:
+            capacity = len(self._data["age"])
+            if self._size + n > capacity:
+                capacity = max(2 * capacity, self._size + n)
+                for name, column in self._data.items():
+                    grown = np.empty(capacity, dtype=column.dtype)
+                    grown[: self._size] = column[: self._size]
+                    self._data[name] = grown
+            for name, column in self._data.items():
+                column[self._size:self._size + n] = rows[name]
+            self._size += n
+            return
+        capacity = self.max_rows
+        if n > capacity:
+            rows = {name: values[-capacity:] for name, values in rows.items()}
+            n = capacity
+        end = (self._head + self._size) % capacity if self._size < capacity else self._head
+        positions = (end + np.arange(n)) % capacity
+        for name, column in self._data.items():
+            column[positions] = rows[name]
+        overflow = max(self._size + n - capacity, 0)
+        self._head = (self._head + overflow) % capacity
+        self._size = min(self._size + n, capacity)
+
+    def _window_rows(self, rows, n_windows):
+        """
+        Min/max row indices of the first n_windows complete windows of rows, in time order.
+        """
+        keys = rows[self.window_key][: n_windows * self.window].reshape(n_windows, self.window)
+        base = np.arange(n_windows)[:, None] * self.window
+        picks = np.sort(np.stack((keys.argmin(axis=1), keys.argmax(axis=1)), axis=1), axis=1) + base
+        keep = np.ones(picks.shape, dtype=bool)
+        keep[:, 1] = picks[:, 1] != picks[:, 0]
+        return picks[keep]
+
+    def extend(self, age, minute, phospho_count, aggregation_state, avg_prob):
+        """
+        Record a block of consecutive steps.
+        Args:
+            age (array-like): Age per step.
+            minute (array-like): Minute per step.
+            phospho_count (array-like): Phosphorylated-site count per step.
+            aggregation_state (array-like or str): Aggregation state names or codes per step (a scalar is broadcast).
+            avg_prob (array-like): Average site probability per step.
+        """
+        n = len(age)
+        rows = {
+            "age": np.asarray(age),
+            "minute": np.asarray(minute),
+            "phospho_count": np.asarray(phospho_count),
+            "aggregation_state": np.broadcast_to(encode_states(np.atleast_1d(aggregation_state)), (n,)),
+            "avg_prob": np.asarray(avg_prob),
+        }
+        if self.window is not None:
+            rows = {name: np.concatenate((self._pending[name], rows[name].astype(COLUMNS[name]))) for name in COLUMNS}
+            n_windows = len(rows["age"]) // self.window
+            picks = self._window_rows(rows, n_windows)
+            self._store({name: values[picks] for name, values in rows.items()})
+            self._pending = {name: values[n_windows * self.window:].copy() for name, values in rows.items()}
+        elif self.stride > 1:
+            picks = np.arange((-self.steps) % self.stride, n, self.stride)
+            self._store({name: values[picks] for name, values in rows.items()})
+        else:
+            self._store(rows)
+        self.steps += n
+
+    def append(self, entry):
+        """
+        Record one step given as a dict with the history keys.
+        Args:
+            entry (dict): Row.
+        """
+        self.extend(*([entry[name]] for name in COLUMNS))
+
+    def column(self, name):
+        """
+        Args:
+            name (str): Column name.
+        Returns:
+            np.ndarray: Column in time order (aggregation_state as int8 codes), including the
+            min/max rows of an incomplete trailing window.
+        """
+        column = self._data[name]
+        if self.max_rows is None or self._head == 0:
+            values = column[: self._size]
+        else:
+            values = np.concatenate((column[self._head:], column[: self._head]))
+        if self.window is not None and len(self._pending["age"]):
+            partial = self._pending
+            # A trailing partial window is reduced as if it were complete.
+            keys = partial[self.window_key]
+            picks = np.unique([keys.argmin(), keys.argmax()])
+            values = np.concatenate((values, partial[name][picks]))
+            if self.max_rows is not None:
+                values = values[-self.max_rows:]
+        return values
+
+    def columns(self):
+        """
+        Returns:
+            dict: Column name -> array in time order.
+        """
+        return {name: self.column(name) for name in COLUMNS}
+
+    def states(self):
+        """
+        Returns:
+            list: Aggregation state names in time order.
+        """
+        return [AGGREGATION_STATES[code] for code in self.column("aggregation_state").tolist()]
+
+    @property
+    def nbytes(self):
+        """
+        Returns:
+            int: Bytes held by the column buffers.
+        """
+        return sum(column.nbytes for column in self._data.values())
+
+    def __len__(self):
+        if self.window is not None and len(self._pending["age"]):
+            return len(self.column("age"))
+        return self._size
+
+    def _row(self, columns, index):
+        entry = {name: columns[name][index].item() for name in COLUMNS}
+        entry["aggregation_state"] = AGGREGATION_STATES[entry["aggregation_state"]]
+        return entry
+
+    def __getitem__(self, index):
+        if isinstance(index, slice) or (self.window is not None and len(self._pending["age"])):
+            # Slices, and rows of a trailing partial window, are read from the assembled columns.
+            columns = self.columns()
+            if isinstance(index, slice):
+                return [self._row(columns, i) for i in range(*index.indices(len(columns["age"])))]
+            if not -len(columns["age"]) <= index < len(columns["age"]):
+                raise IndexError("history index out of range")
+            return self._row(columns, index)
+        if not -self._size <= index < self._size:
+            raise IndexError("history index out of range")
+        position = index % self._size
+        if self.max_rows is not None:
+            position = (self._head + position) % self.max_rows
+        return self._row(self._data, position)
+
+    def __iter__(self):
+        columns = self.columns()
+        for i in range(len(columns["age"])):
+            yield self._row(columns, i)
+
+    def to_dicts(self):
+        """
+        Returns:
+            list: One dict per row (the former history format).
+        """
+        return list(self)
@@ -0,0 +1,180 @@
+"""
+instrumentation.py
+Opt-in instrumentation for the simulation loops: cumulative phase timers, event counters, per-N-step samples and
+callbacks, a printable summary and JSON/CSV export.
+Loops take an optional observer; without one they run their uninstrumented code path.
+"""
+import csv
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+
+class Instrumentation:
+    """
+    Observer collecting timings and counters of simulation runs.
+    Phases are cumulative wall-clock timers (e.g. 'rates', 'draws', 'mutation', 'history'); counters include
+    'steps', 'random_draws' and 'ptm_events'. Every `every` steps a sample of the loop's values is stored and
+    the callbacks are invoked with (step, values, instrumentation).
+    """
+
+    def __init__(self, every=1, callbacks=(), print_report=False):
+        """
+        Initialize an Instrumentation.
+        Args:
+            every (int): Steps between samples and callback invocations.
+            callbacks (iterable): Functions called as callback(step, values, instrumentation).
+            print_report (bool): Print the summary report at the end of every run.
+        Raises:
+            ValueError: If every is not positive.
+        """
+        if every < 1:
+            raise ValueError(f"Sampling interval must be at least 1, got {every}")
+        self.every = every
+        self.callbacks = list(callbacks)
+        self.print_report = print_report
+        self.timers = defaultdict(float)
+        self.counters = defaultdict(int)
+        self.samples = []
+        self.runs = []
+        self.wall_time = 0.0
+        self._started = None
+
+    def begin(self, run):
+        """
+        Mark the start of a run.
+        Args:
+            run (str): Name of the run (e.g. 'update_state').
+        """
+        self.runs.append(run)
+        self._started = time.perf_counter()
+
+    def end(self):
+        """
+        Mark the end of the current run; prints the report if print_report is set.
+        """
+        if self._started is not None:
+            self.wall_time += time.perf_counter() - self._started
+            self._started = None
+        if self.print_report:
+            print(self.report())
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Context manager adding the time spent in its body to a phase timer.
+        Args:
+            name (str): Phase name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timers[name] += time.perf_counter() - start
+
+    def add_time(self, name, seconds):
+        """
+        Args:
+            name (str): Phase name.
+            seconds (float): Time to add.
+        """
+        self.timers[name] += seconds
+
+    def count(self, name, n=1):
+        """
+        Args:
+            name (str): Counter name.
+            n (int): Increment.
+        """
+        self.counters[name] += n
+
+    def step(self, step, **values):
+        """
+        Report a completed step; samples and calls the callbacks every `every` steps.
+        Args:
+            step (int): Number of completed steps.
+            **values: Values of the loop at this step (e.g. avg_prob, phospho_percentage).
+        """
+        if step % self.every:
+            return
+        self.samples.append(dict(step=step, **values))
+        for callback in self.callbacks:
+            callback(step, values, self)
+
+    @property
+    def steps_per_second(self):
+        return self.counters["steps"] / self.wall_time if self.wall_time else 0.0
+
+    def summary(self):
+        """
+        Returns:
+            dict: Runs, wall time, steps per second, phase timers, counters and samples.
+        """
+        return {
+            "runs": list(self.runs),
+            "wall_time": self.wall_time,
+            "steps_per_second": self.steps_per_second,
+            "timers": dict(self.timers),
+            "counters": dict(self.counters),
+            "samples": list(self.samples),
+        }
+
+    def report(self):
+        """
+        Returns:
+            str: Human-readable summary of timers and counters.
+        """
+        lines = [f"Instrumentation: {', '.join(self.runs) or 'no runs'} - {self.wall_time:.4f} s, {self.steps_per_second:,.0f} steps/s"]
+        for name, seconds in sorted(self.timers.items(), key=lambda item: -item[1]):
+            share = seconds / self.wall_time * 100 if self.wall_time else 0.0
+            lines.append(f"  {name:<12} {seconds:10.4f} s  {share:5.1f} %")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"  {name:<12} {value:>12,}")
+        return "\n".join(lines)
+
+    def export(self, path):
+        """
+        Write the data for dashboards: the full summary as JSON, or the samples as CSV if path ends in .csv.
+        Args:
+            path (str): Output file.
+        """
+        path = str(path)
+        if path.endswith(".csv"):
+            fields = sorted({key for sample in self.samples for key in sample}, key=lambda key: (key != "step", key))
+            with open(path, "w", newline="") as handle:
+                writer = csv.DictWriter(handle, fieldnames=fields)
+                writer.writeheader()
+                writer.writerows(self.samples)
+            return
+        with open(path, "w") as handle:
+            json.dump(self.summary(), handle, indent=2)
+
+
+class _Disabled:
+    """
+    Stand-in used when no observer is given: every hook is a no-op.
+    """
+
+    every = None
+
+    def begin(self, run):
+        pass
+
+    def end(self):
+        pass
+
+    def phase(self, name):
+        return nullcontext()
+
+    def add_time(self, name, seconds):
+        pass
+
+    def count(self, name, n=1):
+        pass
+
+    def step(self, step, **values):
+        pass
+
+
+DISABLED = _Disabled()
@@ -5,6 +5,92 @@ Defines the AminoAcid class, which models the properties and behaviors of indivi
 import math
 import re
 
+# PTM states in code order; code 0 means unmodified.
+PTM_TYPES = (None, "Phospho", "Acetyl", "Methyl", "Ubi", "GlcNAc")
+PTM_CODES = {ptm: code for code, ptm in enumerate(PTM_TYPES)}
+# Every spelling accepted by AminoAcid.add_PTM, mapped to the stored PTM state.
+PTM_ALIASES = {
+    "Phosphorylation": "Phospho", "p": "Phospho", "Phospo": "Phospho", "P": "Phospho",
+    "Acetylation": "Acetyl", "a": "Acetyl", "A": "Acetyl", "Acetyl": "Acetyl",
+    "Methylation": "Methyl", "m": "Methyl", "M": "Methyl", "Methyl": "Methyl",
+    "Ubiquitination": "Ubi", "u": "Ubi", "U": "Ubi", "Ubi": "Ubi",
+    "O-GlcNAcylation": "GlcNAc", "O-Glc": "GlcNAc", "GlcNAc": "GlcNAc",
+}
+PTM_NAMES = {
+    "Phospho": "Phosphorylation",
+    "Acetyl": "Acetylation",
+    "Methyl": "Methylation",
+    "Ubi": "Ubiquitination",
+    "GlcNAc": "O-GlcNAcylation",
+}
+# Residues (three-letter codes) that accept each PTM.
+PTM_RESIDUES = {
+    "Phospho": {"Ser", "Thr", "Tyr", "His", "Asp", "Glu", "Arg", "Lys", "Cys"},
+    "Acetyl": {"Lys", "Met"},
+    "Methyl": {"Lys", "Arg", "His"},
+    "Ubi": {"Lys", "Met"},
+    "GlcNAc": {"Ser", "Thr"},
+}
+# R-group suffix that replaces the terminal hydrogen when the PTM is added.
+PTM_SUFFIXES = {
+    "Phospho": "-PO3",
+    "Acetyl": "-COCH3",
+    "Methyl": "-CH3",
+    "Ubi": "-UBI",
+    "GlcNAc": "-GlcNAc",
+}
+NO_PTM_RESIDUES = {"A", "V", "L", "I", "F", "W"}
+# Residues counted as phosphorylation candidates by the stochastic phosphorylation model.
+PHOSPHO_CANDIDATES = {"Ser", "Thr", "Tyr"}
+
+ATOMIC_WEIGHTS = {
+    'C': 12.01,
+    'H': 1.008,
+    'N': 14.01,
+    'O': 16.00,
+    'S': 32.06,
+    'P': 30.97,
+}
+# Weight of the amino acid backbone (everything except the R-group).
+BACKBONE_WEIGHT = 74.06
+# Water released per peptide bond.
+WATER_WEIGHT = 2 * ATOMIC_WEIGHTS['H'] + ATOMIC_WEIGHTS['O']
+# (r_group, PTM) -> (r_group after weighing, weight), filled by AminoAcid.calculate_weight.
+_weight_cache = {}
+
+
+def weigh_r_group(r_group, PTM):
+    """
+    Parse an R-group formula and compute the amino acid weight.
+    Args:
+        r_group (str): R-group formula.
+        PTM (str or None): PTM state; Ubi and GlcNAc use fixed adduct weights.
+    Returns:
+        tuple: (R-group with any fixed-weight adduct removed, weight)
+    Raises:
+        ValueError: If the formula contains an unknown element.
+    """
+    weight = BACKBONE_WEIGHT
+    if PTM == "Ubi":
+        r_group = r_group[:-4]
+        weight += 8565
+    elif PTM == "GlcNAc":
+        r_group = r_group[:-7]
+        weight += 203
+    cleaned = re.sub(r'[^A-Za-z0-9]', '', r_group)
+    pattern = r'([A-Z][a-z]*)(\d*)'
+    counts = {}
+    for (elem, count) in re.findall(pattern, cleaned):
+        count = int(count) if count else 1
+        counts[elem] = counts.get(elem, 0) + count
+    for atom, cnt in counts.items():
+        w = ATOMIC_WEIGHTS.get(atom)
+        if w is None:
+            raise ValueError(f"Unknown element '{atom}' in formula")
+        weight += w * cnt
+    return r_group, weight
+
+
 class AminoAcid:
     """
     Represents an amino acid with its properties and behaviors, including post-translational modifications (PTMs).
@@ -77,37 +163,17 @@ class AminoAcid:
     def calculate_weight(self):
         """
         Calculate the molecular weight of the amino acid.
+        The formula is parsed once per (R-group, PTM) pair; later calls are dictionary lookups.
         Returns:
             float: Molecular weight.
         """
-        atomic_weights = {
-            'C': 12.01,
-            'H': 1.008,
-            'N': 14.01,
-            'O': 16.00,
-            'S': 32.06,
-            'P': 30.97,
-        }
-        weight = 74.06
-        if self.PTM == "Ubi":
-            self.r_group = self.r_group[:-4]
-            weight += 8565
-        elif self.PTM == "GlcNAc":
-            self.r_group = self.r_group[:-7]
-            weight += 203
-        cleaned = re.sub(r'[^A-Za-z0-9]', '', self.r_group)
-        pattern = r'([A-Z][a-z]*)(\d*)'
-        counts = {}
-        for (elem, count) in re.findall(pattern, cleaned):
-            count = int(count) if count else 1
-            counts[elem] = counts.get(elem, 0) + count
-        for atom, cnt in counts.items():
-            w = atomic_weights.get(atom)
-            if w is None:
-                raise ValueError(f"Unknown element '{atom}' in formula")
-            weight += w * cnt
-        self.weight = weight
-        return weight
+        key = (self.r_group, self.PTM)
+        cached = _weight_cache.get(key)
+        if cached is None:
+            cached = weigh_r_group(self.r_group, self.PTM)
+            _weight_cache[key] = cached
+        self.r_group, self.weight = cached
+        return self.weight
 
     def add_PTM(self, modification):
         """
@@ -117,40 +183,16 @@ class AminoAcid:
         Raises:
             Exception: If the modification is not allowed for this amino acid.
         """
-        if self.one_letter in {"A", "V", "L", "I", "F", "W"}:
+        if self.one_letter in NO_PTM_RESIDUES:
             raise Exception("Amino acid does not undergo PTM")
-        if modification in ("Phosphorylation", "p", "Phospo", "P"):
-            if self.three_letter not in {"Ser", "Thr", "Tyr", "His", "Asp", "Glu", "Arg", "Lys", "Cys"}:
-                raise Exception(f"{self.name} does not undergo Phosphorylation")
-            self.r_group = self.r_group[:-1] + "-PO3"
-            self.PTM = "Phospho"
-            self.calculate_weight()
-        elif modification in ("Acetylation", "a", "A", "Acetyl"):
-            if self.three_letter not in {"Lys", "Met"}:
-                raise Exception(f"{self.name} does not undergo Acetylation")
-            self.r_group = self.r_group[:-1] + "-COCH3"
-            self.PTM = "Acetyl"
-            self.calculate_weight()
-        elif modification in ("Methylation", "m", "M", "Methyl"):
-            if self.three_letter not in {"Lys", "Arg", "His"}:
-                raise Exception(f"{self.name} does not undergo Methylation")
-            self.r_group = self.r_group[:-1] + "-CH3"
-            self.PTM = "Methyl"
-            self.calculate_weight()
-        elif modification in ("Ubiquitination", "u", "U", "Ubi"):
-            if self.three_letter not in {"Lys", "Met"}:
-                raise Exception(f"{self.name} does not undergo Ubiquitination")
-            self.r_group = self.r_group[:-1] + "-UBI"
-            self.PTM = "Ubi"
-            self.calculate_weight()
-        elif modification in ("O-GlcNAcylation", "O-Glc", "GlcNAc"):
-            if self.three_letter not in {"Ser", "Thr"}:
-                raise Exception(f"{self.name} does not undergo O-GlcNAcylation")
-            self.r_group = self.r_group[:-1] + "-GlcNAc"
-            self.PTM = "GlcNAc"
-            self.calculate_weight()
-        else:
+        ptm = PTM_ALIASES.get(modification)
+        if ptm is None:
             raise Exception(f"Unknown modification: {modification}")
+        if self.three_letter not in PTM_RESIDUES[ptm]:
+            raise Exception(f"{self.name} does not undergo {PTM_NAMES[ptm]}")
+        self.r_group = self.r_group[:-1] + PTM_SUFFIXES[ptm]
+        self.PTM = ptm
+        self.calculate_weight()
 
     def remove_PTM(self):
         """
@@ -160,18 +202,9 @@ class AminoAcid:
         """
         if not hasattr(self, "PTM") or not self.PTM:
             raise ValueError(f"No PTM to remove from {self.name}")
-        if self.PTM == "Phospho":
-            self.r_group = self.r_group.replace("-PO3", "H")
-        elif self.PTM == "Acetyl":
-            self.r_group = self.r_group.replace("-COCH3", "H")
-        elif self.PTM == "Methyl":
-            self.r_group = self.r_group.replace("-CH3", "H")
-        elif self.PTM == "Ubi":
-            self.r_group = self.r_group.replace("-UBI", "H")
-        elif self.PTM == "GlcNAc":
-            self.r_group = self.r_group.replace("-GlcNAc", "H")
-        else:
+        if self.PTM not in PTM_SUFFIXES:
             raise ValueError(f"Unknown PTM type on {self.name}: {self.PTM}")
+        self.r_group = self.r_group.replace(PTM_SUFFIXES[self.PTM], "H")
         self.PTM = None
         self.calculate_weight()
 
@@ -205,7 +238,241 @@ AminoAcid_data = [
         "volume": 60.1,
         "weight": 75.07,
     },
-    # ... (rest of the amino acids, as in protein.py)
+    {
+        "name": "Alanine",
+        "three_letter": "Ala",
+        "one_letter": "A",
+        "polarity": "nonpolar",
+        "charge": 0,
+        "r_group": "CH3",
+        "codon_list": ["GCT", "GCC", "GCA", "GCG"],
+        "pI": 6.11,
+        "volume": 88.6,
+        "weight": 89.09,
+    },
+    {
+        "name": "Valine",
+        "three_letter": "Val",
+        "one_letter": "V",
+        "polarity": "nonpolar",
+        "charge": 0,
+        "r_group": "C3H7",
+        "codon_list": ["GTT", "GTC", "GTA", "GTG"],
+        "pI": 6.00,
+        "volume": 140.0,
+        "weight": 117.15,
+    },
+    {
+        "name": "Leucine",
+        "three_letter": "Leu",
+        "one_letter": "L",
+        "polarity": "nonpolar",
+        "charge": 0,
+        "r_group": "C4H9",
+        "codon_list": ["TTA", "TTG", "CTT", "CTC", "CTA", "CTG"],
+        "pI": 6.01,
+        "volume": 166.7,
+        "weight": 131.17,
+    },
+    {
+        "name": "Isoleucine",
+        "three_letter": "Ile",
+        "one_letter": "I",
+        "polarity": "nonpolar",
+        "charge": 0,
+        "r_group": "C4H9",
+        "codon_list": ["ATT", "ATC", "ATA"],
+        "pI": 6.05,
+        "volume": 166.7,
+        "weight": 131.17,
+    },
+    {
+        "name": "Methionine",
+        "three_letter": "Met",
+        "one_letter": "M",
+        "polarity": "nonpolar",
+        "charge": 0,
+        "r_group": "CH2CH2SCH3",
+        "codon_list": ["ATG"],
+        "pI": 5.74,
+        "volume": 162.9,
+        "weight": 149.21,
+    },
+    {
+        "name": "Proline",
+        "three_letter": "Pro",
+        "one_letter": "P",
+        "polarity": "nonpolar",
+        "charge": 0,
+        "r_group": "C3H5",
+        "codon_list": ["CCT", "CCC", "CCA", "CCG"],
+        "pI": 6.30,
+        "volume": 112.7,
+        "weight": 115.13,
+    },
+    {
+        "name": "Phenylalanine",
+        "three_letter": "Phe",
+        "one_letter": "F",
+        "polarity": "nonpolar",
+        "charge": 0,
+        "r_group": "CH2C6H5",
+        "codon_list": ["TTT", "TTC"],
+        "pI": 5.49,
+        "volume": 189.9,
+        "weight": 165.19,
+    },
+    {
+        "name": "Tryptophan",
+        "three_letter": "Trp",
+        "one_letter": "W",
+        "polarity": "nonpolar",
+        "charge": 0,
+        "r_group": "CH2C8H6N",
+        "codon_list": ["TGG"],
+        "pI": 5.89,
+        "volume": 227.8,
+        "weight": 204.23,
+    },
+    {
+        "name": "Serine",
+        "three_letter": "Ser",
+        "one_letter": "S",
+        "polarity": "polar",
+        "charge": 0,
+        "r_group": "CH2OH",
+        "codon_list": ["TCT", "TCC", "TCA", "TCG", "AGT", "AGC"],
+        "pI": 5.68,
+        "volume": 89.0,
+        "weight": 105.09,
+    },
+    {
+        "name": "Threonine",
+        "three_letter": "Thr",
+        "one_letter": "T",
+        "polarity": "polar",
+        "charge": 0,
+        "r_group": "CH3CHOH",
+        "codon_list": ["ACT", "ACC", "ACA", "ACG"],
+        "pI": 5.60,
+        "volume": 116.1,
+        "weight": 119.12,
+    },
+    {
+        "name": "Cysteine",
+        "three_letter": "Cys",
+        "one_letter": "C",
+        "polarity": "polar",
+        "charge": 0,
+        "r_group": "CH2SH",
+        "codon_list": ["TGT", "TGC"],
+        "pI": 5.07,
+        "pKa": 8.18,
+        "volume": 108.5,
+        "weight": 121.16,
+    },
+    {
+        "name": "Tyrosine",
+        "three_letter": "Tyr",
+        "one_letter": "Y",
+        "polarity": "polar",
+        "charge": 0,
+        "r_group": "CH2C6H4OH",
+        "codon_list": ["TAT", "TAC"],
+        "pI": 5.66,
+        "pKa": 10.07,
+        "volume": 193.6,
+        "weight": 181.19,
+    },
+    {
+        "name": "Asparagine",
+        "three_letter": "Asn",
+        "one_letter": "N",
+        "polarity": "polar",
+        "charge": 0,
+        "r_group": "CH2CONH2",
+        "codon_list": ["AAT", "AAC"],
+        "pI": 5.41,
+        "volume": 114.1,
+        "weight": 132.12,
+    },
+    {
+        "name": "Glutamine",
+        "three_letter": "Gln",
+        "one_letter": "Q",
+        "polarity": "polar",
+        "charge": 0,
+        "r_group": "CH2CH2CONH2",
+        "codon_list": ["CAA", "CAG"],
+        "pI": 5.65,
+        "volume": 143.8,
+        "weight": 146.15,
+    },
+    {
+        "name": "Aspartic acid",
+        "three_letter": "Asp",
+        "one_letter": "D",
+        "polarity": "polar",
+        "charge": -1,
+        "r_group": "CH2COOH",
+        "codon_list": ["GAT", "GAC"],
+        "pI": 2.77,
+        "pKa": 3.65,
+        "volume": 111.1,
+        "weight": 133.10,
+    },
+    {
+        "name": "Glutamic acid",
+        "three_letter": "Glu",
+        "one_letter": "E",
+        "polarity": "polar",
+        "charge": -1,
+        "r_group": "CH2CH2COOH",
+        "codon_list": ["GAA", "GAG"],
+        "pI": 3.22,
+        "pKa": 4.25,
+        "volume": 138.4,
+        "weight": 147.13,
+    },
+    {
+        "name": "Lysine",
+        "three_letter": "Lys",
+        "one_letter": "K",
+        "polarity": "polar",
+        "charge": 1,
+        "r_group": "CH2CH2CH2CH2NH2",
+        "codon_list": ["AAA", "AAG"],
+        "pI": 9.74,
+        "pKa": 10.53,
+        "volume": 168.6,
+        "weight": 146.19,
+    },
+    {
+        "name": "Arginine",
+        "three_letter": "Arg",
+        "one_letter": "R",
+        "polarity": "polar",
+        "charge": 1,
+        "r_group": "CH2CH2CH2NHCNHNH2",
+        "codon_list": ["CGT", "CGC", "CGA", "CGG", "AGA", "AGG"],
+        "pI": 10.76,
+        "pKa": 12.48,
+        "volume": 173.4,
+        "weight": 174.20,
+    },
+    {
+        "name": "Histidine",
+        "three_letter": "His",
+        "one_letter": "H",
+        "polarity": "polar",
+        "charge": 0,
+        "r_group": "CH2C3H2N2H",
+        "codon_list": ["CAT", "CAC"],
+        "pI": 7.59,
+        "pKa": 6.00,
+        "volume": 153.2,
+        "weight": 155.16,
+    },
 ]
 AminoAcid_library = [
     AminoAcid(
@@ -0,0 +1,175 @@
+"""
+isoforms.py
+The six CNS tau isoforms as exon-skipping views over one canonical 2N4R (441 aa) sequence buffer.
+An isoform is the list of canonical segments it keeps plus precomputed position maps, so residue numbers
+(e.g. S202, T231, S396) translate between isoform and canonical coordinates in O(1). The residue codes of each
+isoform are built once and shared read-only by every molecule; a molecule only owns its PTM codes.
+"""
+import re
+import numpy as np
+from .aa import AminoAcid_library
+from .sequence import ResidueSequence, library_tables
+
+CANONICAL_ISOFORM = "2N4R"
+CANONICAL_SEQUENCE = (
+    "MAEPRQEFEVMEDHAGTYGLGDRKDQGGYTMHQDQEGDTDAGLKESPLQTPTEDGSEEPGSETSDAKSTPTAEDVTAPLVDEGAPGKQAAAQPHTEIPEGTTAEEAGIGDTPSLEDEAAGHVTQ"
+    "ARMVSKSKDGTGSDDKKAKGADGKTKIATPRGAAPPGQKGQANATRIPAKTPPAPKTPPSSGEPPKSGDRSGYSSPGSPGTPGSRSRTPSLPTPPTREPKKVAVVRTPPKSPSSAKSRLQTA"
+    "PVPMPDLKNVKSKIGSTENLKHQPGGGKVQIINKKLDLSNVQSKCGSKDNIKHVPGGGSVQIVYKPVDLSKVTSKCGSLGNIHHKPGGGQVEVKSEKLDFKDRVQSKIGSLDNITHVPGGGNKK"
+    "IETHKLTFRENAKAKTDHGAEIVYKSPVVSGDTSPRHLSNVSSTGSIDMVDSPQLATLADEVSASLAKQGL"
+)
+# Alternatively spliced exons in canonical (2N4R) numbering, first and last residue inclusive.
+EXONS = {
+    "exon2": (45, 73),
+    "exon3": (74, 102),
+    "exon10": (275, 305),
+}
+# Exons each isoform skips (exon 3 is only ever included together with exon 2).
+ISOFORM_EXONS = {
+    "0N3R": ("exon2", "exon3", "exon10"),
+    "1N3R": ("exon3", "exon10"),
+    "2N3R": ("exon10",),
+    "0N4R": ("exon2", "exon3"),
+    "1N4R": ("exon3",),
+    "2N4R": (),
+}
+ISOFORMS = tuple(ISOFORM_EXONS)
+# Shorthands used elsewhere in the package for the longest isoform of each repeat type.
+ALIASES = {"3R": "2N3R", "4R": "2N4R"}
+_SITE = re.compile(r"^([A-Za-z]?)(\d+)$")
+
+_canonical_codes = library_tables(AminoAcid_library).encode(CANONICAL_SEQUENCE)
+_canonical_codes.flags.writeable = False
+_views = {}
+
+
+class IsoformView:
+    """
+    One tau isoform: the canonical segments it keeps and the position maps between both numberings.
+    """
+
+    def __init__(self, name):
+        """
+        Initialize an IsoformView (use isoform(name) to get the shared instance).
+        Args:
+            name (str): Isoform name (see ISOFORMS) or alias ('3R', '4R').
+        Raises:
+            ValueError: If the isoform is unknown.
+        """
+        name = ALIASES.get(name, name)
+        if name not in ISOFORM_EXONS:
+            raise ValueError(f"Unknown tau isoform {name!r} (expected one of {ISOFORMS})")
+        self.name = name
+        self.skipped = ISOFORM_EXONS[name]
+        keep = np.ones(len(_canonical_codes), dtype=bool)
+        for exon in self.skipped:
+            first, last = EXONS[exon]
+            keep[first - 1:last] = False
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], keep.view(np.int8), [0]))))
+        # Kept canonical segments as 0-based half-open (start, stop) pairs.
+        self.segments = list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+        # canonical_positions[i - 1]: canonical number of isoform residue i.
+        self.canonical_positions = np.flatnonzero(keep) + 1
+        # isoform_positions[c]: isoform number of canonical residue c, 0 if it lies in a skipped exon.
+        self.isoform_positions = np.zeros(len(_canonical_codes) + 1, dtype=np.int64)
+        self.isoform_positions[self.canonical_positions] = np.arange(1, len(self.canonical_positions) + 1)
+        if len(self.segments) == 1:
+            self.codes = _canonical_codes
+        else:
+            self.codes = np.concatenate(self.segment_views())
+            self.codes.flags.writeable = False
+
+    def __len__(self):
+        return len(self.canonical_positions)
+
+    def __repr__(self):
+        return f"IsoformView({self.name!r}, {len(self)} aa)"
+
+    def segment_views(self):
+        """
+        Returns:
+            list: Views of the canonical residue-code buffer, one per kept segment.
+        """
+        return [_canonical_codes[start:stop] for start, stop in self.segments]
+
+    def sequence_string(self):
+        """
+        Returns:
+            str: One-letter sequence of the isoform.
+        """
+        return "".join(CANONICAL_SEQUENCE[start:stop] for start, stop in self.segments)
+
+    def residue_sequence(self):
+        """
+        Returns:
+            ResidueSequence: Sequence sharing this isoform's residue codes, with its own unmodified PTM codes.
+        """
+        return ResidueSequence(self.codes)
+
+    def to_canonical(self, position):
+        """
+        Args:
+            position (int): 1-based isoform residue number.
+        Returns:
+            int: Canonical (2N4R) residue number.
+        """
+        return int(self.canonical_positions[position - 1])
+
+    def from_canonical(self, position):
+        """
+        Args:
+            position (int): 1-based canonical residue number.
+        Returns:
+            int or None: Isoform residue number, or None if the residue lies in a skipped exon.
+        """
+        mapped = int(self.isoform_positions[position])
+        return mapped or None
+
+
+def isoform(name):
+    """
+    Args:
+        name (str): Isoform name (see ISOFORMS) or alias ('3R', '4R').
+    Returns:
+        IsoformView: Shared view of the isoform.
+    Raises:
+        ValueError: If the isoform is unknown.
+    """
+    view = _views.get(name)
+    if view is None:
+        view = IsoformView(name)
+        _views[name] = _views[view.name] = view
+    return view
+
+
+def translate_sites(sites, source=CANONICAL_ISOFORM, target=CANONICAL_ISOFORM):
+    """
+    Renumber residue sites from one isoform to another.
+    Args:
+        sites (iterable): Sites as residue numbers or labels such as 'S202'.
+        source (str): Isoform the sites are numbered in.
+        target (str): Isoform to number them in.
+    Returns:
+        list: Sites in target numbering (labels stay labels); None for a site in an exon the target skips.
+    Raises:
+        ValueError: If a label is malformed, out of range or names the wrong residue.
+    """
+    source, target = isoform(source), isoform(target)
+    translated = []
+    for site in sites:
+        match = _SITE.match(str(site))
+        if match is None:
+            raise ValueError(f"Malformed site {site!r}")
+        residue, position = match.group(1).upper(), int(match.group(2))
+        if not 1 <= position <= len(source):
+            raise ValueError(f"Site {site!r} is outside {source.name} (1-{len(source)})")
+        canonical = source.to_canonical(position)
+        if residue and CANONICAL_SEQUENCE[canonical - 1] != residue:
+            raise ValueError(f"Residue {position} of {source.name} is {CANONICAL_SEQUENCE[canonical - 1]}, not {residue}")
+        mapped = target.from_canonical(canonical)
+        if mapped is None:
+            translated.append(None)
+        elif isinstance(site, str):
+            translated.append(f"{residue}{mapped}")
+        else:
+            translated.append(mapped)
+    return translated
@@ -0,0 +1,120 @@
+"""
+motifs.py
+Single-pass multi-motif scanner for aggregation-prone sequence motifs.
+All motifs are compiled into one regular expression of lookahead alternatives, so one scan of the
+sequence reports every (possibly overlapping) hit of every motif. The index of a parent sequence also answers
+for any window of it (e.g. a truncation fragment) without rescanning.
+"""
+import re
+import numpy as np
+
+# PHF6* (exon 10, 4R only) and PHF6 hexapeptides.
+AGGREGATION_MOTIFS = ("VQIINK", "VQIVYK")
+
+
+class MotifIndex:
+    """
+    Per-motif hit positions of a fixed motif set in one sequence string.
+    Counts follow re.findall: hits of one motif do not overlap each other, but different motifs may overlap.
+    """
+
+    def __init__(self, motifs=AGGREGATION_MOTIFS):
+        """
+        Initialize a MotifIndex.
+        Args:
+            motifs (iterable): Motifs (regular expressions, usually plain residue strings).
+        Raises:
+            ValueError: If a motif is empty or given twice.
+        """
+        motifs = tuple(motifs)
+        if any(not motif for motif in motifs):
+            raise ValueError("Motifs must be non-empty")
+        if len(set(motifs)) != len(motifs):
+            raise ValueError(f"Duplicate motifs: {motifs}")
+        self.motifs = motifs
+        # One zero-width lookahead per motif: every start position is tried once for all motifs.
+        self.pattern = re.compile("|".join(f"(?=(?P<m{i}>{motif}))" for i, motif in enumerate(motifs))) if motifs else None
+        self._single = [re.compile(motif) for motif in motifs]
+        self.hits = {motif: np.empty(0, dtype=np.intp) for motif in motifs}
+        self.ends = {motif: np.empty(0, dtype=np.intp) for motif in motifs}
+        self.counts = {motif: 0 for motif in motifs}
+        self.total = 0
+        self.sequence_str = None
+        self.offset = 0
+
+    def scan(self, sequence_str):
+        """
+        Index a sequence. Each lookahead alternative reports the leftmost motif that matches at a position,
+        so positions are rescanned for the remaining motifs only when an earlier alternative matched there.
+        Args:
+            sequence_str (str): One-letter sequence.
+        Returns:
+            MotifIndex: self.
+        """
+        starts = {motif: [] for motif in self.motifs}
+        if self.pattern is not None:
+            for match in self.pattern.finditer(sequence_str):
+                position = match.start()
+                first = int(match.lastgroup[1:])
+                starts[self.motifs[first]].append((position, len(match.group(match.lastgroup))))
+                for motif, single in zip(self.motifs[first + 1:], self._single[first + 1:]):
+                    other = single.match(sequence_str, position)
+                    if other:
+                        starts[motif].append((position, other.end() - position))
+        for motif, found in starts.items():
+            kept = []
+            ends = []
+            end = 0
+            for position, length in found:
+                if position >= end:
+                    kept.append(position)
+                    ends.append(position + length)
+                    end = position + max(length, 1)
+            self.hits[motif] = np.array(kept, dtype=np.intp)
+            self.ends[motif] = np.array(ends, dtype=np.intp)
+            self.counts[motif] = len(kept)
+        self.total = sum(self.counts.values())
+        self.sequence_str = sequence_str
+        self.offset = 0
+        return self
+
+    def window(self, start, stop):
+        """
+        Index of the window [start, stop) of the scanned sequence, derived from this index's hits with a binary
+        search per motif. A motif is only rescanned (on the window alone) if one of its hits straddles an edge of
+        the window: such a hit may hide an overlapping hit of the same motif, or (for variable-length motifs) a
+        shorter match that fits in the window.
+        Args:
+            start (int): First position of the window.
+            stop (int): End of the window (exclusive).
+        Returns:
+            MotifIndex: Index with hit positions relative to start.
+        """
+        index = MotifIndex(self.motifs)
+        for motif in self.motifs:
+            starts, ends = self.hits[motif], self.ends[motif]
+            first = int(np.searchsorted(starts, start))
+            last = int(np.searchsorted(ends, stop, side="right"))
+            straddles_start = first > 0 and ends[first - 1] > start
+            straddles_stop = last < len(starts) and starts[last] < stop
+            if straddles_start or straddles_stop:
+                begin = self.offset + start
+                rescanned = MotifIndex((motif,)).scan(self.sequence_str[begin:begin + stop - start])
+                index.hits[motif], index.ends[motif] = rescanned.hits[motif], rescanned.ends[motif]
+            else:
+                last = max(last, first)
+                index.hits[motif], index.ends[motif] = starts[first:last] - start, ends[first:last] - start
+            index.counts[motif] = len(index.hits[motif])
+        index.total = sum(index.counts.values())
+        index.sequence_str = self.sequence_str
+        index.offset = self.offset + start
+        return index
+
+    def count(self, motif=None):
+        """
+        Args:
+            motif (str, optional): Motif; all motifs if omitted.
+        Returns:
+            int: Number of hits.
+        """
+        return self.total if motif is None else self.counts[motif]
@@ -4,11 +4,14 @@ Defines the base Protein class, which provides basic sequence and translation lo
 """
 import numpy as np
 from typing import Optional
-from .aa import AminoAcid, AminoAcid_data, AminoAcid_library
+from .aa import AminoAcid, AminoAcid_data, AminoAcid_library, PTM_CODES
+from . import translation
+from .sequence import ResidueSequence
 
 class Protein:
     """
     Represents a generic protein and its sequence.
+    The sequence is stored as a ResidueSequence (uint8 residue and PTM codes).
     Implements the Factory pattern for amino acid creation.
     """
 
@@ -36,44 +39,78 @@ class Protein:
             self.length = len(sequence)
             self.ribosome(self.sequence)
 
+    def molecular_weight(self):
+        """
+        Molecular weight of the sequence in its current PTM state.
+        Returns:
+            float: Weight, or the weight given at construction if there is no encoded sequence.
+        """
+        if isinstance(self.sequence, ResidueSequence):
+            return self.sequence.molecular_weight()
+        return self.weight
+
     def bond_AA(self, aa):
         """
         Add an amino acid to the protein sequence.
         Args:
             aa (AminoAcid): Amino acid to add.
         """
-        np.append(self.sequence, aa)
+        if self.sequence is None:
+            self.sequence = ResidueSequence([])
+        code = self.sequence.tables.lookup(aa.one_letter)
+        self.sequence = ResidueSequence(
+            np.append(self.sequence.codes, code),
+            np.append(self.sequence.ptm_codes, PTM_CODES[aa.PTM or None]),
+            self.sequence.library,
+        )
+        self.length = len(self.sequence)
 
-    def translate(self, DNA_seq, AA_lib):
+    def translate(self, DNA_seq, AA_lib=AminoAcid_library, frame=0, to_stop=True):
         """
-        Translate a DNA sequence into a protein sequence using the amino acid library.
+        Translate a DNA sequence into this protein's sequence using the codon table of the amino acid library.
         Args:
-            DNA_seq (str or list): DNA sequence.
+            DNA_seq (str, bytes or list): DNA sequence, or a list of codons.
+            AA_lib (list): Amino acid library.
+            frame (int): Reading frame 0-5 (3-5 read the reverse complement).
+            to_stop (bool): If True, stop at the first stop codon; otherwise stop codons are skipped.
+        """
+        if isinstance(DNA_seq, list):
+            DNA_seq = "".join(DNA_seq)
+        residues = translation.translate(DNA_seq, frame=frame, to_stop=to_stop, library=AA_lib)
+        self.sequence = ResidueSequence(residues[residues != translation.STOP], library=AA_lib)
+        self.length = len(self.sequence)
+
+    @classmethod
+    def from_transcript_file(cls, name, path, frame=0, AA_lib=AminoAcid_library, **kwargs):
+        """
+        Build a protein by stream-translating a nucleotide file up to the first stop codon.
+        Only the chunks needed to reach the stop codon are read.
+        Args:
+            name (str): Name of the protein.
+            path (str): Raw sequence or single-record FASTA file.
+            frame (int): Reading frame 0-5.
             AA_lib (list): Amino acid library.
+            **kwargs: Other Protein constructor arguments.
+        Returns:
+            Protein: Protein with the translated sequence.
         """
-        AA_lib = AA_lib()
-        if DNA_seq is str:
-            split = [DNA_seq[i:i+3] for i in range(0, len(DNA_seq), 3)]
-        else:
-            split = DNA_seq
-        for codon in split:
-            for aa in AA_lib:
-                if codon in self.codon_list:
-                    self.bond_AA(aa)
-                    break
+        parts = []
+        for chunk in translation.translate_file(path, frame=frame, library=AA_lib):
+            orf = translation.cut_at_stop(chunk)
+            parts.append(orf)
+            if len(orf) < len(chunk):
+                break
+        protein = cls(name, **kwargs)
+        protein.sequence = ResidueSequence(np.concatenate(parts) if parts else [], library=AA_lib)
+        protein.length = len(protein.sequence)
+        return protein
 
     def ribosome(self, AA_seq, AA_lib=AminoAcid_library):
         """
-        Convert a sequence of identifiers into AminoAcid objects using the library.
+        Encode a sequence of identifiers as a ResidueSequence using the library.
+        AminoAcid objects are materialized lazily when the sequence is indexed.
         Args:
             AA_seq (str or list): Sequence of identifiers.
             AA_lib (list): Amino acid library.
         """
-        created_seq = np.empty(self.length, dtype=AminoAcid)
-        for i in range(self.length):
-            iden = AA_seq[i]
-            for aa in AA_lib:
-                if aa.is_identifier(iden):
-                    created_seq[i] = aa
-                    break
-        self.sequence = created_seq
+        self.sequence = ResidueSequence.from_identifiers(AA_seq[:self.length], AA_lib)
@@ -0,0 +1,386 @@
+"""
+sequence.py
+Defines ResidueSequence, the compact integer-encoded residue sequence stored by Protein.
+Each residue is a uint8 index into the amino acid library, with a parallel uint8 array of PTM codes.
+AminoAcid objects are only materialized when a caller indexes or iterates the sequence.
+"""
+import copy
+import operator
+import numpy as np
+from .aa import (
+    AminoAcid,
+    AminoAcid_library,
+    PHOSPHO_CANDIDATES,
+    PTM_CODES,
+    PTM_NAMES,
+    PTM_SUFFIXES,
+    PTM_TYPES,
+    WATER_WEIGHT,
+)
+
+PHOSPHO = PTM_CODES["Phospho"]
+# Residue code marking a byte that is not a one-letter code.
+UNKNOWN = 255
+# Per-library lookup tables, keyed by id() of the library list (which is kept alive alongside).
+_library_tables = {}
+
+
+class LibraryTables:
+    """
+    Precomputed per-code lookups for one amino acid library.
+    """
+
+    def __init__(self, library):
+        """
+        Initialize LibraryTables.
+        Args:
+            library (list): Amino acid library; a residue code is an index into it.
+        """
+        self.library = library
+        self.one_letter = np.frombuffer("".join(aa.one_letter for aa in library).encode("ascii"), dtype=np.uint8)
+        self.three_letter = [aa.three_letter for aa in library]
+        # Uppercased one-letter code, three-letter code and full name -> residue code.
+        self.index = {}
+        # 256-entry byte table: ASCII one-letter code (either case) -> residue code, UNKNOWN elsewhere.
+        self.byte_table = np.full(256, UNKNOWN, dtype=np.uint8)
+        for code in reversed(range(len(library))):
+            aa = library[code]
+            for iden in (aa.name, aa.three_letter, aa.one_letter):
+                self.index[iden.upper()] = code
+            for letter in {aa.one_letter.upper(), aa.one_letter.lower()}:
+                if len(letter) == 1 and ord(letter) < 256:
+                    self.byte_table[ord(letter)] = code
+        self.masses = residue_mass_table(library)
+
+    def lookup(self, identifier):
+        """
+        Resolve one identifier in O(1).
+        Args:
+            identifier (str): One-letter code, three-letter code or full name (any case).
+        Returns:
+            int: Residue code.
+        Raises:
+            ValueError: If the identifier is not in the library.
+        """
+        code = self.index.get(identifier.upper())
+        if code is None:
+            raise ValueError(f"Unknown amino acid identifier: {identifier}")
+        return code
+
+    def encode(self, sequence_str):
+        """
+        Translate a one-letter sequence string in one vectorized pass through the byte table.
+        Args:
+            sequence_str (str): One-letter sequence.
+        Returns:
+            np.ndarray: uint8 residue codes.
+        Raises:
+            ValueError: If the string contains a character that is not a one-letter code.
+        """
+        try:
+            raw = np.frombuffer(sequence_str.encode("ascii"), dtype=np.uint8)
+        except UnicodeEncodeError:
+            raw = None
+        codes = self.byte_table[raw] if raw is not None else None
+        if codes is None or (codes == UNKNOWN).any():
+            bad = next(ch for ch in sequence_str if ord(ch) >= 256 or self.byte_table[ord(ch)] == UNKNOWN)
+            raise ValueError(f"Unknown amino acid identifier: {bad}")
+        return codes
+
+    def codes_for(self, three_letters):
+        """
+        Args:
+            three_letters (iterable): Three-letter codes.
+        Returns:
+            np.ndarray: Residue codes of library entries with those three-letter codes.
+        """
+        three_letters = set(three_letters)
+        return np.array([code for code, name in enumerate(self.three_letter) if name in three_letters], dtype=np.uint8)
+
+
+def residue_mass_table(library):
+    """
+    Precompute the weight of every (residue, PTM) pair by applying each PTM to a copy of each library entry.
+    Args:
+        library (list): Amino acid library.
+    Returns:
+        np.ndarray: (len(library), len(PTM_TYPES)) weights; NaN where the residue cannot carry the PTM.
+    """
+    masses = np.full((len(library), len(PTM_TYPES)), np.nan)
+    for code, aa in enumerate(library):
+        masses[code, 0] = aa.weight
+        for ptm_code, ptm in enumerate(PTM_TYPES[1:], start=1):
+            modified = copy.copy(aa)
+            try:
+                modified.add_PTM(PTM_NAMES[ptm])
+            except Exception:
+                continue
+            masses[code, ptm_code] = modified.weight
+    return masses
+
+
+def library_tables(library):
+    """
+    Get (building once) the lookup tables for a library.
+    Args:
+        library (list): Amino acid library.
+    Returns:
+        LibraryTables: Tables for the library.
+    """
+    tables = _library_tables.get(id(library))
+    if tables is None or tables.library is not library:
+        tables = LibraryTables(library)
+        _library_tables[id(library)] = tables
+    return tables
+
+
+class SequenceResidue(AminoAcid):
+    """
+    AminoAcid materialized from one slot of a ResidueSequence.
+    Its PTM is read from and written to the parent's PTM-code array, so add_PTM/remove_PTM persist
+    and never touch the shared library instance.
+    """
+
+    def __init__(self, parent, index):
+        """
+        Initialize a SequenceResidue.
+        Args:
+            parent (ResidueSequence): Sequence that owns the residue.
+            index (int): Non-negative position in the parent.
+        """
+        self.__dict__.update(parent.library[parent.codes[index]].__dict__)
+        self.__dict__.pop("PTM", None)
+        self._parent = parent
+        self._index = index
+        if self.PTM:
+            self.r_group = self.r_group[:-1] + PTM_SUFFIXES[self.PTM]
+            self.calculate_weight()
+
+    def calculate_weight(self):
+        """
+        Look up the weight of this residue in its current PTM state in the precomputed mass table.
+        Returns:
+            float: Molecular weight.
+        """
+        parent = self._parent
+        self.weight = float(parent.tables.masses[parent.codes[self._index], parent.ptm_codes[self._index]])
+        return self.weight
+
+    @property
+    def PTM(self):
+        return PTM_TYPES[self._parent.ptm_codes[self._index]]
+
+    @PTM.setter
+    def PTM(self, value):
+        self._parent.set_ptm(self._index, PTM_CODES[value or None])
+
+
+class ResidueSequence:
+    """
+    Integer-encoded protein sequence: a uint8 residue-code array plus a parallel uint8 PTM-code array.
+    Slicing returns a ResidueSequence that shares (views) both arrays.
+    Per-PTM counts and the phosphorylated Ser/Thr/Tyr count are maintained incrementally by set_ptm and
+    set_ptm_codes. Views of the same buffer share a write counter, so a write through one view makes
+    the others recount on their next query; direct writes to ptm_codes need refresh_counts().
+    """
+
+    def __init__(self, codes, ptm_codes=None, library=AminoAcid_library, _writes=None):
+        """
+        Initialize a ResidueSequence.
+        Args:
+            codes (array-like): Residue codes (indices into library).
+            ptm_codes (array-like, optional): PTM codes (see aa.PTM_TYPES); unmodified if None.
+            library (list): Amino acid library.
+        """
+        self.codes = np.asarray(codes, dtype=np.uint8)
+        if ptm_codes is None:
+            ptm_codes = np.zeros(len(self.codes), dtype=np.uint8)
+        self.ptm_codes = np.asarray(ptm_codes, dtype=np.uint8)
+        self.library = library
+        self.tables = library_tables(library)
+        self._writes = _writes if _writes is not None else [0]
+        self._counted_at = None
+        self._candidate_mask = None
+
+    @classmethod
+    def from_identifiers(cls, identifiers, library=AminoAcid_library):
+        """
+        Encode a sequence of residue identifiers (one-letter, three-letter or full names).
+        Args:
+            identifiers (str or list): Sequence of identifiers.
+            library (list): Amino acid library.
+        Returns:
+            ResidueSequence: Encoded sequence.
+        Raises:
+            ValueError: If an identifier is not in the library.
+        """
+        tables = library_tables(library)
+        if isinstance(identifiers, str):
+            codes = tables.encode(identifiers)
+        else:
+            codes = np.fromiter((tables.lookup(iden) for iden in identifiers), dtype=np.uint8, count=len(identifiers))
+        return cls(codes, library=library)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ResidueSequence(self.codes[index], self.ptm_codes[index], self.library, self._writes)
+        index = operator.index(index)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ResidueSequence index out of range")
+        return SequenceResidue(self, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield SequenceResidue(self, i)
+
+    def one_letter_string(self):
+        """
+        Returns:
+            str: One-letter representation of the sequence.
+        """
+        return self.tables.one_letter[self.codes].tobytes().decode("ascii")
+
+    def residue_mask(self, three_letters):
+        """
+        Args:
+            three_letters (iterable): Three-letter codes to match.
+        Returns:
+            np.ndarray: Boolean mask of residues with one of those codes.
+        """
+        return np.isin(self.codes, self.tables.codes_for(three_letters))
+
+    def candidate_mask(self):
+        """
+        Returns:
+            np.ndarray: Boolean mask of Ser/Thr/Tyr residues (cached; residue codes do not change).
+        """
+        if self._candidate_mask is None:
+            self._candidate_mask = self.residue_mask(PHOSPHO_CANDIDATES)
+            self._n_candidates = int(np.count_nonzero(self._candidate_mask))
+        return self._candidate_mask
+
+    @property
+    def n_candidates(self):
+        """
+        Returns:
+            int: Number of Ser/Thr/Tyr residues.
+        """
+        self.candidate_mask()
+        return self._n_candidates
+
+    def refresh_counts(self):
+        """
+        Recount PTMs from the PTM-code array.
+        """
+        candidates = self.candidate_mask()
+        self._ptm_counts = np.bincount(self.ptm_codes, minlength=len(PTM_TYPES)).tolist()
+        self._residue_mass = float(self.tables.masses[self.codes, self.ptm_codes].sum())
+        self._candidate_phospho = int(np.count_nonzero(candidates & (self.ptm_codes == PHOSPHO)))
+        self._counted_at = self._writes[0]
+
+    def _sync(self):
+        if self._counted_at != self._writes[0]:
+            self.refresh_counts()
+
+    def _wrote(self):
+        self._writes[0] += 1
+        self._counted_at = self._writes[0]
+
+    def ptm_counts(self):
+        """
+        Returns:
+            np.ndarray: Number of residues carrying each PTM code.
+        """
+        self._sync()
+        return np.array(self._ptm_counts)
+
+    def ptm_count(self, ptm):
+        """
+        Args:
+            ptm (str or None): PTM state (see aa.PTM_TYPES).
+        Returns:
+            int: Number of residues in that state.
+        """
+        self._sync()
+        return self._ptm_counts[PTM_CODES[ptm]]
+
+    def candidate_phospho_count(self):
+        """
+        Returns:
+            int: Number of phosphorylated Ser/Thr/Tyr residues.
+        """
+        self._sync()
+        return self._candidate_phospho
+
+    def set_ptm(self, index, code):
+        """
+        Set the PTM code of one residue, updating the counters in O(1).
+        Args:
+            index (int): Non-negative residue position.
+            code (int): PTM code.
+        """
+        self._sync()
+        old = int(self.ptm_codes[index])
+        if old == code:
+            return
+        self.ptm_codes[index] = code
+        masses = self.tables.masses[self.codes[index]]
+        self._residue_mass += masses[code] - masses[old]
+        self._ptm_counts[old] -= 1
+        self._ptm_counts[code] += 1
+        if self._candidate_mask[index]:
+            self._candidate_phospho += (code == PHOSPHO) - (old == PHOSPHO)
+        self._wrote()
+
+    def set_ptm_codes(self, indices, code):
+        """
+        Set the PTM code of several residues, updating the counters in O(len(indices)).
+        Args:
+            indices (np.ndarray): Distinct residue positions.
+            code (int): PTM code.
+        """
+        self._sync()
+        old = self.ptm_codes[indices]
+        self.ptm_codes[indices] = code
+        residues = self.codes[indices]
+        self._residue_mass += float(self.tables.masses[residues, code].sum() - self.tables.masses[residues, old].sum())
+        for old_code, count in enumerate(np.bincount(old, minlength=len(PTM_TYPES)).tolist()):
+            self._ptm_counts[old_code] -= count
+        self._ptm_counts[code] += len(indices)
+        candidates = self._candidate_mask[indices]
+        self._candidate_phospho += (code == PHOSPHO) * int(np.count_nonzero(candidates)) - int(
+            np.count_nonzero(candidates & (old == PHOSPHO))
+        )
+        self._wrote()
+
+    def molecular_weight(self):
+        """
+        Molecular weight of the chain in its current PTM state, maintained incrementally as PTMs change.
+        Returns:
+            float: Sum of residue weights minus one water per peptide bond.
+        """
+        self._sync()
+        return self._residue_mass - WATER_WEIGHT * max(len(self) - 1, 0)
+
+    def proteoform_masses(self, ptm_codes):
+        """
+        Molecular weights of many proteoforms of this sequence at once.
+        Args:
+            ptm_codes (np.ndarray): (N, L) PTM codes, e.g. PhosphoEnsemble.ptm_codes.
+        Returns:
+            np.ndarray: Weight of each proteoform.
+        """
+        ptm_codes = np.asarray(ptm_codes)
+        return self.tables.masses[self.codes, ptm_codes].sum(axis=-1) - WATER_WEIGHT * max(len(self) - 1, 0)
+
+    def copy(self):
+        """
+        Returns:
+            ResidueSequence: Copy with its own residue and PTM arrays.
+        """
+        return ResidueSequence(self.codes.copy(), self.ptm_codes.copy(), self.library)
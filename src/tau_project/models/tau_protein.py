@@ -2,17 +2,25 @@
 tau_protein.py
 Defines the TauProtein class, which models tau protein isoforms and their molecular transitions (phosphorylation, aggregation, truncation, etc.).
 """
-import random
 import math
 import numpy as np
 from typing import Optional
 from .protein import Protein
+from .sequence import ResidueSequence
 from .truncation import ProteinTruncator
 from .aa import AminoAcid
-import re
+from .motifs import AGGREGATION_MOTIFS, MotifIndex
+from .isoforms import isoform as isoform_view
 from ..environment import Environment as env
+from ..site_engine import SiteStateEngine, probability_at
+from ..history import HistoryRecorder
+from ..rng import draw_source
+from ..instrumentation import DISABLED
 from collections import defaultdict
 
+# Identifiers of the abstract phosphorylation sites tracked by update_state.
+SITE_IDS = range(1, 80)
+
 class TauProtein(Protein):
     """
     Represents a tau protein isoform and its molecular transitions.
@@ -20,7 +28,8 @@ class TauProtein(Protein):
     Demonstrates the Strategy pattern for simulation logic.
     """
     def __init__(self, name="Tau", isoform="4R", sequence: Optional[np.array]=None,
-                 weight=None, length=None, organism=None, location=None, expression_level=None):
+                 weight=None, length=None, organism=None, location=None, expression_level=None, rng=None,
+                 initial_probabilities=None):
         """
         Initialize a TauProtein instance.
         Args:
@@ -32,8 +41,14 @@ class TauProtein(Protein):
             organism (str, optional): Source organism.
             location (str, optional): Cellular location.
             expression_level (float, optional): Expression level.
+            rng (np.random.Generator, optional): Random generator for every stochastic step of this molecule;
+                the global random and np.random modules are used if omitted.
+            initial_probabilities (array-like, optional): Initial probability of every site, numbered from 1 (the
+                SITE_IDS for 79 values); drawn at random if omitted (without touching any RNG if given).
         """
         super().__init__(name, sequence, weight, length, organism, location, expression_level)
+        self.rng = rng
+        self._random = draw_source(rng)
         self.S202_T205_phosphorylation = False
         self.T231_phosphorylation = False
         self.S396_S404_phosphorylation = False
@@ -43,11 +58,22 @@ class TauProtein(Protein):
         self.aggregation_level = 0.0
         self.microtubule_binding = 1.0
         self.isoform = isoform
-        self.phosphorylation_sites = {i: np.array([np.random.rand()]) for i in range(1, 80)}
+        if initial_probabilities is not None:
+            self.phosphorylation_sites = {i: np.array([p]) for i, p in enumerate(np.asarray(initial_probabilities, dtype=float), start=1)}
+        elif rng is None:
+            self.phosphorylation_sites = {i: np.array([np.random.rand()]) for i in SITE_IDS}
+        else:
+            self.phosphorylation_sites = {i: np.array([p]) for i, p in zip(SITE_IDS, rng.random(len(SITE_IDS)))}
         self.aggregation_state = "monomer"
         self.truncated_site = None
+        self.fragment = None
         self.soluble = True
         self.history = []
+        self.site_state = None
+        self.aggregation_motifs = AGGREGATION_MOTIFS
+        self._motif_index = None
+        self._motif_sequence = None
+        self._motif_key = None
         self.age = 0
         self.is_truncated = False
         self.pathological = False
@@ -55,6 +81,26 @@ class TauProtein(Protein):
         if self.sequence is None:
             self.sequence = []
 
+    @classmethod
+    def from_isoform(cls, isoform="2N4R", **kwargs):
+        """
+        Build a tau molecule whose sequence is a view of one of the six CNS isoforms.
+        The residue codes are shared with every other molecule of the isoform; only the PTM codes are per molecule.
+        Args:
+            isoform (str): Isoform name ('0N3R' ... '2N4R', or the aliases '3R' and '4R').
+            **kwargs: Other TauProtein constructor arguments.
+        Returns:
+            TauProtein: Molecule with the isoform's sequence.
+        Raises:
+            ValueError: If the isoform is unknown.
+        """
+        view = isoform_view(isoform)
+        tau = cls(isoform=view.name, **kwargs)
+        tau.isoform_view = view
+        tau.sequence = view.residue_sequence()
+        tau.length = len(view)
+        return tau
+
     def define_isoform(self, exon):
         """
         Define the tau isoform based on exon information.
@@ -76,22 +122,22 @@ class TauProtein(Protein):
             site (str): Site identifier.
         """
         if site == "S202_T205":
-            self.S202_T205_phosphorylation = random.random() < self.phosphorylation_rate
+            self.S202_T205_phosphorylation = self._random.random() < self.phosphorylation_rate
             self.phosphorylation_sites[site] = self.S202_T205_phosphorylation
         elif site == "T231":
             if self.S202_T205_phosphorylation:
-                self.T231_phosphorylation = random.random() < (self.phosphorylation_rate * 1.5)
+                self.T231_phosphorylation = self._random.random() < (self.phosphorylation_rate * 1.5)
             else:
-                self.T231_phosphorylation = random.random() < self.phosphorylation_rate
+                self.T231_phosphorylation = self._random.random() < self.phosphorylation_rate
             self.phosphorylation_sites[site] = self.T231_phosphorylation
         elif site == "S396_S404":
             if self.T231_phosphorylation:
-                self.S396_S404_phosphorylation = random.random() < (self.phosphorylation_rate * 1.5)
+                self.S396_S404_phosphorylation = self._random.random() < (self.phosphorylation_rate * 1.5)
             else:
-                self.S396_S404_phosphorylation = random.random() < self.phosphorylation_rate
+                self.S396_S404_phosphorylation = self._random.random() < self.phosphorylation_rate
             self.phosphorylation_sites[site] = self.S396_S404_phosphorylation
         else:
-            self.phosphorylation_sites[site] = random.random() < self.phosphorylation_rate
+            self.phosphorylation_sites[site] = self._random.random() < self.phosphorylation_rate
 
     def dephosphorylate(self, site):
         """
@@ -100,19 +146,19 @@ class TauProtein(Protein):
             site (str): Site identifier.
         """
         if site == "S202_T205":
-            if random.random() < self.phosphatase_activity:
+            if self._random.random() < self.phosphatase_activity:
                 self.S202_T205_phosphorylation = False
                 self.phosphorylation_sites[site] = False
         elif site == "T231":
-            if random.random() < self.phosphatase_activity:
+            if self._random.random() < self.phosphatase_activity:
                 self.T231_phosphorylation = False
                 self.phosphorylation_sites[site] = False
         elif site == "S396_S404":
-            if random.random() < self.phosphatase_activity:
+            if self._random.random() < self.phosphatase_activity:
                 self.S396_S404_phosphorylation = False
                 self.phosphorylation_sites[site] = False
         else:
-            if random.random() < self.phosphatase_activity:
+            if self._random.random() < self.phosphatase_activity:
                 self.phosphorylation_sites[site] = False
 
     def simulate_phosphorylation(self, condition, temperature=None):
@@ -176,18 +222,41 @@ class TauProtein(Protein):
         """
         return sum(1 for p in self.phosphorylation_sites.values() if p > 0.5)
 
+    def motif_index(self):
+        """
+        Motif hits of the current sequence, scanned once and cached until the sequence changes.
+        Returns:
+            MotifIndex: Per-motif hit positions and counts.
+        """
+        index = self._motif_index
+        key = (len(self.sequence), tuple(self.aggregation_motifs))
+        if index is None or self._motif_sequence is not self.sequence or self._motif_key != key:
+            if isinstance(self.sequence, ResidueSequence):
+                sequence_str = self.sequence.one_letter_string()
+            else:
+                sequence_str = ''.join(aa.one_letter for aa in self.sequence if hasattr(aa, 'one_letter'))
+            index = MotifIndex(self.aggregation_motifs).scan(sequence_str)
+            self._motif_index = index
+            self._motif_sequence = self.sequence
+            self._motif_key = key
+        return index
+
+    def add_aggregation_motifs(self, *motifs):
+        """
+        Add user-supplied aggregation motifs (e.g. PHF6-like hexapeptides) to the scanned set.
+        Args:
+            *motifs (str): Motifs to add.
+        """
+        self.aggregation_motifs = tuple(self.aggregation_motifs) + tuple(m for m in motifs if m not in self.aggregation_motifs)
+        self._motif_index = None
+
     def detect_aggregation_motifs(self):
         """
         Detect aggregation-prone motifs in the tau sequence.
         Returns:
             int: Number of detected motifs.
         """
-        sequence_str = ''.join(aa.one_letter for aa in self.sequence if hasattr(aa, 'one_letter'))
-        motifs = ['VQIINK', 'VQIVYK']
-        count = 0
-        for motif in motifs:
-            count += len(re.findall(motif, sequence_str))
-        return count
+        return self.motif_index().count()
 
     def compute_aggregation_score(self):
         """
@@ -202,7 +271,7 @@ class TauProtein(Protein):
         score += motif_count * 2
         if self.is_truncated:
             score += 2
-        if self.isoform == '4R':
+        if self.isoform.endswith('4R'):
             score += 1
         return score
 
@@ -218,19 +287,14 @@ class TauProtein(Protein):
         else:
             self.aggregation_state = 'monomer'
 
-    def update_state(self, environment, timepoints: np.array):
+    def effective_constants(self, environment):
         """
-        Main orchestrator: updates tau protein state over a series of timepoints by checking temperature, kinase, phosphatase, protease, and oxidative stress effects.
-        Populates self.history with a dict for each timepoint.
+        Combine the environment checks into the per-step phosphorylation and dephosphorylation constants.
         Args:
             environment (Environment): Simulation environment.
-            timepoints (np.array): Array of timepoints.
         Returns:
-            dict: Site probabilities over time.
+            tuple: (k_p, k_d)
         """
-        from collections import defaultdict
-        self.history = []  # Reset history at the start
-        site_probabilities = {site: [float(self.phosphorylation_sites[site][0])] for site in self.phosphorylation_sites}
         temp_effect = self.check_temp(environment)
         kinase_effect = self.check_kinase(environment)
         phosphatase_effect = self.check_phosphatase(environment)
@@ -238,31 +302,137 @@ class TauProtein(Protein):
         oxidative_effect = self.check_oxidative_stress(environment)
         k_p = temp_effect * kinase_effect * oxidative_effect
         k_d = phosphatase_effect * protease_effect
-        for i, time in enumerate(timepoints):
-            for site in site_probabilities:
-                prev = site_probabilities[site][-1]
-                if i == 0:
-                    continue  # already initialized
-                P_new = prev + (k_p * (1 - prev) - k_d * prev)
-                if P_new < 0:
-                    P_new = 0.0
-                elif P_new > 1:
-                    P_new = 1.0
-                site_probabilities[site].append(P_new)
-            probs_now = [site_probabilities[site][i] for site in site_probabilities]
-            phospho_count = sum(p > 0.5 for p in probs_now)
-            avg_prob = float(np.mean(probs_now))
+        return k_p, k_d
+
+    def site_probability(self, environment, site, t):
+        """
+        Probability of a single site at timepoint index t, without materializing any trajectory.
+        Args:
+            environment (Environment): Simulation environment.
+            site: Site identifier (key of self.phosphorylation_sites).
+            t (int): Timepoint index.
+        Returns:
+            float: Site probability at t.
+        """
+        k_p, k_d = self.effective_constants(environment)
+        initial = float(np.asarray(self.phosphorylation_sites[site]).flat[0])
+        return probability_at(initial, k_p, k_d, t)
+
+    def update_state(self, environment, timepoints: np.array, mode="step", history=None, checkpoint=None, observer=None):
+        """
+        Main orchestrator: updates tau protein state over a series of timepoints by checking temperature, kinase, phosphatase, protease, and oxidative stress effects.
+        Populates self.history with a row for each timepoint.
+        Args:
+            environment (Environment): Simulation environment.
+            timepoints (np.array): Array of timepoints.
+            mode (str): 'step' or 'analytic' (closed form, stepping only where clamping applies).
+            history (HistoryRecorder, optional): Recorder to fill (e.g. decimated or ring-buffered); cleared first.
+            checkpoint (Checkpointer, optional): Checkpoint every checkpoint.every timepoints and resume from
+                its latest checkpoint; the result is identical to an uninterrupted run.
+            observer (Instrumentation, optional): Receives phase timings ('rates', 'engine', 'aggregation',
+                'history'), counters and a sample every observer.every timepoints.
+        Returns:
+            SiteProbabilities: Site probabilities over time (mapping of site -> trajectory).
+        """
+        instrument = observer if observer is not None else DISABLED
+        instrument.begin("update_state")
+        self.history = history if history is not None else HistoryRecorder()
+        self.history.clear()  # Reset history at the start
+        with instrument.phase("rates"):
+            k_p, k_d = self.effective_constants(environment)
+            engine = SiteStateEngine.from_sites(self.phosphorylation_sites, k_p, k_d)
+        with instrument.phase("engine"):
+            if checkpoint is not None:
+                site_probabilities = self._run_checkpointed(engine, timepoints, mode, checkpoint, observer)
+            elif observer is not None:
+                site_probabilities = self._run_observed(engine, timepoints, mode, observer)
+            else:
+                site_probabilities = engine.run(len(timepoints), mode=mode)
+        self.site_state = engine
+        with instrument.phase("aggregation"):
+            # The aggregation score depends only on state that is constant during the run.
             self.update_aggregation_state()
-            entry = {
-                'age': int(time),
-                'minute': int(time),
-                'phospho_count': phospho_count,
-                'aggregation_state': self.aggregation_state,
-                'avg_prob': avg_prob
-            }
-            self.history.append(entry)
+        with instrument.phase("history"):
+            timepoints = np.asarray(timepoints).astype(np.int64)
+            self.history.extend(
+                age=timepoints,
+                minute=timepoints,
+                phospho_count=engine.phospho_counts(),
+                aggregation_state=self.aggregation_state,
+                avg_prob=engine.average_probabilities(),
+            )
+        instrument.count("steps", len(timepoints))
+        instrument.count("site_updates", len(timepoints) * len(engine.sites))
+        instrument.end()
         return site_probabilities
 
+    def _run_observed(self, engine, timepoints, mode, observer):
+        """
+        Fill the engine's probability matrix in segments of observer.every timepoints, reporting each segment.
+        """
+        n_timepoints = max(len(timepoints), 1)
+        probs = np.empty((len(engine.sites), n_timepoints), dtype=float, order="F")
+        for start in range(0, n_timepoints, observer.every):
+            stop = min(start + observer.every, n_timepoints)
+            engine.fill(probs, start, stop, mode)
+            self._report(observer, probs, start, stop)
+        engine.probabilities = probs
+        return engine.view()
+
+    @staticmethod
+    def _report(observer, probs, start, stop):
+        """
+        Report observer samples for the filled timepoints (start, stop] of a probability matrix.
+        """
+        first = (start // observer.every + 1) * observer.every
+        for step in range(first, stop + 1, observer.every):
+            column = probs[:, step - 1]
+            observer.step(step, avg_prob=float(column.mean()), phospho_count=int(np.count_nonzero(column > 0.5)))
+
+    def _run_checkpointed(self, engine, timepoints, mode, checkpoint, observer=None):
+        """
+        Fill the engine's probability matrix segment by segment, checkpointing after each segment and reporting
+        observer samples as in _run_observed (including those of a restored trajectory).
+        """
+        n_timepoints = max(len(timepoints), 1)
+        n_sites = len(engine.sites)
+        run = {
+            "kind": "update_state",
+            "timepoints": n_timepoints,
+            "sites": n_sites,
+            "k_p": engine.k_p,
+            "k_d": engine.k_d,
+            "mode": mode,
+            "initial": engine.initial.tolist(),
+        }
+        probs = np.empty((n_sites, n_timepoints), dtype=float, order="F")
+        start = 0
+        saved = checkpoint.load(run)
+        if saved is None:
+            checkpoint.clear()
+        else:
+            start = saved.step
+            # Rows of the trajectory file are timepoint columns of the matrix.
+            probs[:, :start] = checkpoint.read_trajectory(start, (n_sites,)).T
+            if observer is not None:
+                self._report(observer, probs, 0, start)
+        while start < n_timepoints:
+            stop = min(start + checkpoint.every, n_timepoints)
+            engine.fill(probs, start, stop, mode)
+            if observer is not None:
+                self._report(observer, probs, start, stop)
+            checkpoint.append_trajectory(probs[:, start:stop].T)
+            checkpoint.save(
+                stop,
+                run,
+                arrays={"probabilities": probs[:, stop - 1]},
+                age=int(timepoints[stop - 1]) if len(timepoints) else 0,
+                aggregation_state=self.aggregation_state,
+            )
+            start = stop
+        engine.probabilities = probs
+        return engine.view()
+
     def check_temp(self, environment):
         """
         Check the effect of temperature on the simulation.
@@ -341,17 +511,24 @@ class TauProtein(Protein):
 
     def truncate(self, site):
         """
-        Truncate the tau protein sequence at a given site.
+        Truncate the tau protein sequence at a given site (e.g., 'D421').
+        The sequence becomes a view of the N-terminal fragment, and its motif index is derived from the index of
+        the full sequence instead of rescanning.
         Args:
             site (str): Truncation site (e.g., 'D421').
         Raises:
             ValueError: If no sequence is present.
         """
         if self.sequence is not None:
-            truncated_seq, trunc_aa = ProteinTruncator.truncate(self.sequence, site)
-            self.sequence = truncated_seq
+            [fragment] = ProteinTruncator.truncate_batch(self.sequence, [site])
+            index = self.motif_index().window(fragment.offset, fragment.stop)
+            self.sequence = fragment.view()
+            self._motif_index = index
+            self._motif_sequence = self.sequence
+            self._motif_key = (len(self.sequence), tuple(self.aggregation_motifs))
+            self.fragment = fragment
             self.truncated_site = site
             self.is_truncated = True
-            self.truncation_aa = trunc_aa
+            self.truncation_aa = fragment.cleavage_residue()
         else:
             raise ValueError("No sequence to truncate.")
@@ -0,0 +1,239 @@
+"""
+translation.py
+Vectorized DNA -> protein translation through a precomputed 64-entry codon table.
+Handles all six reading frames and stop codons, and streams large nucleotide files (raw or single-record FASTA)
+in fixed-size chunks so they never have to be loaded into memory whole.
+"""
+import os
+import numpy as np
+from .aa import AminoAcid_library
+from .sequence import UNKNOWN
+
+# Residue code emitted for a stop codon.
+STOP = 254
+STOP_CODONS = ("TAA", "TAG", "TGA")
+# Nucleotide byte table: A/C/G/T(U) in either case -> 0..3, whitespace -> SKIP, anything else -> INVALID.
+SKIP = 4
+INVALID = 255
+NUCLEOTIDE_TABLE = np.full(256, INVALID, dtype=np.uint8)
+for _code, _bases in enumerate(("Aa", "Cc", "Gg", "TtUu")):
+    for _base in _bases:
+        NUCLEOTIDE_TABLE[ord(_base)] = _code
+for _space in b" \t\r\n":
+    NUCLEOTIDE_TABLE[_space] = SKIP
+CHUNK_SIZE = 1 << 20
+
+# Per-library codon tables, keyed by id() of the library list (which is kept alive alongside).
+_codon_tables = {}
+
+
+def codon_table(library=AminoAcid_library):
+    """
+    Build (once per library) the 64-entry codon table.
+    A codon b0 b1 b2 (each 0..3 for A, C, G, T) has index 16 * b0 + 4 * b1 + b2.
+    Args:
+        library (list): Amino acid library; entries are residue codes (indices into it).
+    Returns:
+        np.ndarray: uint8 table of residue codes, STOP for stop codons, UNKNOWN for unassigned codons.
+    """
+    cached = _codon_tables.get(id(library))
+    if cached is not None and cached[0] is library:
+        return cached[1]
+    table = np.full(64, UNKNOWN, dtype=np.uint8)
+    for code, aa in enumerate(library):
+        for codon in aa.codon_list:
+            table[codon_index(codon)] = code
+    for codon in STOP_CODONS:
+        table[codon_index(codon)] = STOP
+    _codon_tables[id(library)] = (library, table)
+    return table
+
+
+def codon_index(codon):
+    """
+    Args:
+        codon (str): Three-letter DNA or RNA codon.
+    Returns:
+        int: Index into the codon table.
+    """
+    b0, b1, b2 = encode_nucleotides(codon)
+    return 16 * int(b0) + 4 * int(b1) + int(b2)
+
+
+def encode_nucleotides(dna):
+    """
+    Encode a nucleotide buffer as 0..3 codes, dropping whitespace.
+    Args:
+        dna (str, bytes or np.ndarray): Nucleotide sequence (ASCII).
+    Returns:
+        np.ndarray: uint8 nucleotide codes.
+    Raises:
+        ValueError: If the buffer contains a character that is not a nucleotide or whitespace.
+    """
+    if isinstance(dna, str):
+        dna = dna.encode("ascii", errors="replace")
+    raw = np.frombuffer(dna, dtype=np.uint8) if isinstance(dna, (bytes, bytearray, memoryview)) else dna
+    codes = NUCLEOTIDE_TABLE[raw]
+    codes = codes[codes != SKIP]
+    if (codes == INVALID).any():
+        bad = raw[np.flatnonzero(NUCLEOTIDE_TABLE[raw] == INVALID)[0]]
+        raise ValueError(f"Invalid nucleotide: {chr(bad)!r}")
+    return codes
+
+
+def reverse_complement(codes):
+    """
+    Args:
+        codes (np.ndarray): Nucleotide codes.
+    Returns:
+        np.ndarray: Reverse complement (A<->T, C<->G) as nucleotide codes.
+    """
+    return 3 - codes[::-1]
+
+
+def translate_codes(codes, table):
+    """
+    Translate nucleotide codes (already in frame) three bytes at a time; a trailing partial codon is ignored.
+    Args:
+        codes (np.ndarray): Nucleotide codes.
+        table (np.ndarray): Codon table from codon_table().
+    Returns:
+        np.ndarray: uint8 residue codes, with STOP at stop codons.
+    """
+    codons = codes[: len(codes) // 3 * 3].reshape(-1, 3)
+    return table[codons[:, 0] * 16 + codons[:, 1] * 4 + codons[:, 2]]
+
+
+def translate(dna, frame=0, to_stop=False, library=AminoAcid_library):
+    """
+    Translate a DNA/RNA sequence in one of six reading frames.
+    Args:
+        dna (str, bytes or np.ndarray): Nucleotide sequence.
+        frame (int): 0-2 read the forward strand from offset 0-2; 3-5 read the reverse complement from offset 0-2.
+        to_stop (bool): If True, stop before the first stop codon.
+        library (list): Amino acid library.
+    Returns:
+        np.ndarray: uint8 residue codes (STOP marks stop codons unless to_stop is True).
+    Raises:
+        ValueError: If the frame is not in 0-5.
+    """
+    if frame not in range(6):
+        raise ValueError(f"Reading frame must be 0-5, got {frame}")
+    codes = encode_nucleotides(dna)
+    if frame >= 3:
+        codes = reverse_complement(codes)
+    residues = translate_codes(codes[frame % 3:], codon_table(library))
+    return cut_at_stop(residues) if to_stop else residues
+
+
+def six_frame_translation(dna, library=AminoAcid_library):
+    """
+    Args:
+        dna (str, bytes or np.ndarray): Nucleotide sequence.
+        library (list): Amino acid library.
+    Returns:
+        dict: Frame (0-5) -> uint8 residue codes with STOP markers.
+    """
+    forward = encode_nucleotides(dna)
+    strands = (forward, reverse_complement(forward))
+    table = codon_table(library)
+    return {frame: translate_codes(strands[frame // 3][frame % 3:], table) for frame in range(6)}
+
+
+def cut_at_stop(residues):
+    """
+    Args:
+        residues (np.ndarray): Residue codes, possibly containing STOP.
+    Returns:
+        np.ndarray: Residues before the first STOP (a view).
+    """
+    stops = np.flatnonzero(residues == STOP)
+    return residues[: stops[0]] if len(stops) else residues
+
+
+def split_at_stops(residues):
+    """
+    Args:
+        residues (np.ndarray): Residue codes, possibly containing STOP.
+    Returns:
+        list: Views of the stretches between stop codons (possibly empty).
+    """
+    parts = np.split(residues, np.flatnonzero(residues == STOP))
+    return parts[:1] + [part[1:] for part in parts[1:]]
+
+
+def _fasta_data_start(handle):
+    """
+    Offset of the first sequence byte: past the header line of a single-record FASTA file, else 0.
+    """
+    handle.seek(0)
+    if handle.read(1) != b">":
+        return 0
+    handle.seek(0)
+    handle.readline()
+    return handle.tell()
+
+
+def _checked(raw):
+    """
+    Reject a second FASTA header inside the sequence data.
+    """
+    if b">" in raw:
+        raise ValueError("Multi-record FASTA is not supported; split records before translating")
+    return raw
+
+
+def stream_nucleotides(path, reverse=False, chunk_size=CHUNK_SIZE):
+    """
+    Read a nucleotide file in fixed-size chunks.
+    Args:
+        path (str): Raw sequence or single-record FASTA file.
+        reverse (bool): If True, yield the reverse complement, reading the file back to front.
+        chunk_size (int): Bytes read per chunk.
+    Yields:
+        np.ndarray: Nucleotide codes.
+    """
+    with open(path, "rb") as handle:
+        start = _fasta_data_start(handle)
+        end = handle.seek(0, os.SEEK_END)
+        if not reverse:
+            handle.seek(start)
+            while raw := handle.read(chunk_size):
+                yield encode_nucleotides(_checked(raw))
+            return
+        position = end
+        while position > start:
+            size = min(chunk_size, position - start)
+            position -= size
+            handle.seek(position)
+            yield reverse_complement(encode_nucleotides(_checked(handle.read(size))))
+
+
+def translate_file(path, frame=0, library=AminoAcid_library, chunk_size=CHUNK_SIZE):
+    """
+    Stream-translate a nucleotide file in one reading frame.
+    Args:
+        path (str): Raw sequence or single-record FASTA file.
+        frame (int): Reading frame 0-5 (see translate).
+        library (list): Amino acid library.
+        chunk_size (int): Bytes read per chunk.
+    Yields:
+        np.ndarray: uint8 residue codes with STOP markers, chunk by chunk.
+    Raises:
+        ValueError: If the frame is not in 0-5.
+    """
+    if frame not in range(6):
+        raise ValueError(f"Reading frame must be 0-5, got {frame}")
+    table = codon_table(library)
+    skip = frame % 3
+    carry = np.empty(0, dtype=np.uint8)
+    for chunk in stream_nucleotides(path, reverse=frame >= 3, chunk_size=chunk_size):
+        if skip:
+            dropped = min(skip, len(chunk))
+            chunk = chunk[dropped:]
+            skip -= dropped
+        codes = np.concatenate((carry, chunk))
+        usable = len(codes) // 3 * 3
+        carry = codes[usable:]
+        if usable:
+            yield translate_codes(codes[:usable], table)
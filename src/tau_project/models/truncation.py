@@ -1,46 +1,199 @@
 """
 truncation.py
 Provides the ProteinTruncator class for truncating protein sequences at specific sites.
+Truncation products are Fragment views (offset, length) into the parent sequence; a batch of cleavage sites
+(e.g. the caspase/calpain sites D13, D402, D421) is validated and cut in one call, and motif counts of all
+fragments come from one scan of the parent.
 Implements the Static Method pattern for utility functionality.
 """
-from .aa import AminoAcid
+import re
+import numpy as np
+from .aa import AminoAcid_library
+from .motifs import AGGREGATION_MOTIFS, MotifIndex
+from .sequence import ResidueSequence, library_tables
+
+_SITE = re.compile(r"^([A-Za-z])(\d+)$")
+
+
+def _sequence_string(sequence):
+    if isinstance(sequence, str):
+        return sequence
+    if isinstance(sequence, ResidueSequence):
+        return sequence.one_letter_string()
+    return "".join(aa.one_letter for aa in sequence)
+
+
+class Fragment:
+    """
+    Zero-copy view of residues [offset, offset + length) of a parent sequence.
+    """
+
+    def __init__(self, parent, offset, length, site=None):
+        """
+        Initialize a Fragment.
+        Args:
+            parent (str, list or ResidueSequence): Parent sequence.
+            offset (int): 0-based start in the parent.
+            length (int): Number of residues.
+            site (str, optional): Cleavage site that ends the fragment (None for a C-terminal fragment).
+        """
+        self.parent = parent
+        self.offset = offset
+        self.length = length
+        self.site = site
+
+    @property
+    def stop(self):
+        return self.offset + self.length
+
+    def __len__(self):
+        return self.length
+
+    def __repr__(self):
+        return f"Fragment({self.offset + 1}-{self.stop}, site={self.site!r})"
+
+    def view(self):
+        """
+        Returns:
+            Sequence of the fragment; for a ResidueSequence parent a view sharing the parent's arrays.
+        """
+        return self.parent[self.offset:self.stop]
+
+    def one_letter_string(self):
+        """
+        Returns:
+            str: One-letter sequence of the fragment.
+        """
+        parent = self.parent
+        if isinstance(parent, ResidueSequence):
+            return parent.tables.one_letter[parent.codes[self.offset:self.stop]].tobytes().decode("ascii")
+        return _sequence_string(parent[self.offset:self.stop])
+
+    def cleavage_residue(self):
+        """
+        Returns:
+            AminoAcid: Last residue of the fragment (the residue at the cleavage site).
+        """
+        residue = self.parent[self.stop - 1]
+        if isinstance(residue, str):
+            return AminoAcid_library[library_tables(AminoAcid_library).lookup(residue)]
+        return residue
+
 
 class ProteinTruncator:
     """
     Provides static methods for truncating protein sequences at specific sites.
     Demonstrates the Static Method pattern.
     """
+    @staticmethod
+    def parse_sites(sequence, sites):
+        """
+        Parse cleavage sites and check their residues against the sequence (one gather for a ResidueSequence).
+        Args:
+            sequence (str, list or ResidueSequence): Protein sequence.
+            sites (iterable): Sites such as 'D421' (residue and 1-based position).
+        Returns:
+            np.ndarray: 1-based positions, in site order.
+        Raises:
+            ValueError: If a site is malformed, out of range or its residue does not match.
+            TypeError: If the sequence is not a string, list or ResidueSequence.
+        """
+        if not isinstance(sequence, (str, list, ResidueSequence)):
+            raise TypeError("Sequence must be a string, list of AminoAcid objects or ResidueSequence.")
+        sites = list(sites)
+        parsed = [_SITE.match(site) for site in sites]
+        for site, match in zip(sites, parsed):
+            if match is None:
+                raise ValueError(f"Malformed truncation site {site!r}")
+        positions = np.array([int(match.group(2)) for match in parsed], dtype=np.intp)
+        expected = "".join(match.group(1) for match in parsed)
+        bad = np.flatnonzero((positions < 1) | (positions > len(sequence)))
+        if len(bad):
+            raise ValueError(f"Truncation site {sites[bad[0]]} is outside the sequence (1-{len(sequence)})")
+        if isinstance(sequence, ResidueSequence):
+            found = sequence.tables.one_letter[sequence.codes[positions - 1]].tobytes().decode("ascii")
+        elif isinstance(sequence, str):
+            found = "".join(sequence[position - 1] for position in positions.tolist())
+        else:
+            found = "".join(sequence[position - 1].one_letter for position in positions.tolist())
+        for site, position, want, have in zip(sites, positions.tolist(), expected, found):
+            if want != have:
+                raise ValueError(f"Residue at position {position} is not {want}")
+        return positions
+
+    @staticmethod
+    def truncate_batch(sequence, sites):
+        """
+        Truncate a sequence at each of several sites, keeping the N-terminal part as ProteinTruncator.truncate does.
+        Args:
+            sequence (str, list or ResidueSequence): Protein sequence.
+            sites (iterable): Truncation sites, e.g. ['D13', 'D402', 'D421'].
+        Returns:
+            list: One Fragment (residues 1..position) per site, in site order.
+        Raises:
+            ValueError: If a site is malformed, out of range or its residue does not match.
+            TypeError: If the sequence is not a string, list or ResidueSequence.
+        """
+        sites = list(sites)
+        positions = ProteinTruncator.parse_sites(sequence, sites)
+        return [Fragment(sequence, 0, position, site) for site, position in zip(sites, positions.tolist())]
+
+    @staticmethod
+    def fragments(sequence, sites):
+        """
+        Cleave a sequence at all given sites at once.
+        Args:
+            sequence (str, list or ResidueSequence): Protein sequence.
+            sites (iterable): Cleavage sites (cut after the named residue); duplicates are ignored.
+        Returns:
+            list: Fragments from N- to C-terminus; the last one has site None unless a site is the final residue.
+        Raises:
+            ValueError: If a site is malformed, out of range or its residue does not match.
+            TypeError: If the sequence is not a string, list or ResidueSequence.
+        """
+        sites = list(sites)
+        positions = ProteinTruncator.parse_sites(sequence, sites)
+        cuts = {}
+        for site, position in zip(sites, positions.tolist()):
+            cuts.setdefault(position, site)
+        fragments = []
+        start = 0
+        for position in sorted(cuts):
+            fragments.append(Fragment(sequence, start, position - start, cuts[position]))
+            start = position
+        if start < len(sequence):
+            fragments.append(Fragment(sequence, start, len(sequence) - start))
+        return fragments
+
+    @staticmethod
+    def motif_counts(fragments, motifs=AGGREGATION_MOTIFS, index=None):
+        """
+        Aggregation-motif counts of fragments of one parent sequence, from a single scan of the parent.
+        Args:
+            fragments (list): Fragments sharing one parent.
+            motifs (iterable): Motifs to count.
+            index (MotifIndex, optional): Existing index of the parent with these motifs.
+        Returns:
+            np.ndarray: Motif count of every fragment.
+        """
+        if not fragments:
+            return np.zeros(0, dtype=np.intp)
+        if index is None:
+            index = MotifIndex(motifs).scan(_sequence_string(fragments[0].parent))
+        return np.array([index.window(fragment.offset, fragment.stop).count() for fragment in fragments], dtype=np.intp)
+
     @staticmethod
     def truncate(sequence, site):
         """
         Truncate a protein sequence at the given site (e.g., 'D421').
         Args:
-            sequence (str or list): Protein sequence as a string or list of AminoAcid objects.
+            sequence (str, list or ResidueSequence): Protein sequence as a string, list of AminoAcid objects or ResidueSequence.
             site (str): Truncation site, e.g., 'D421' (residue and position).
         Returns:
-            tuple: (truncated sequence, AminoAcid at truncation site)
+            tuple: (truncated sequence, AminoAcid at truncation site); a ResidueSequence is truncated to a view.
         Raises:
             ValueError: If the residue at the site does not match.
-            TypeError: If the sequence is not a string or list.
-        """
-        residue = site[0]
-        pos = int(site[1:])
-        if isinstance(sequence, str):
-            if sequence[pos-1] != residue:
-                raise ValueError(f"Residue at position {pos} is not {residue}")
-            trunc_aa = AminoAcid(
-                name="Aspartic acid" if residue == 'D' else f"Residue {residue}",
-                three_letter="Asp" if residue == 'D' else "",
-                one_letter=residue,
-                polarity="polar" if residue == 'D' else "",
-                charge="-1" if residue == 'D' else "",
-                r_group="CH2COOH" if residue == 'D' else "",
-                codon_list=["GAU", "GAC"] if residue == 'D' else []
-            )
-            return sequence[:pos], trunc_aa
-        elif isinstance(sequence, list):
-            if sequence[pos-1].one_letter != residue:
-                raise ValueError(f"Residue at position {pos} is not {residue}")
-            return sequence[:pos], sequence[pos-1]
-        else:
-            raise TypeError("Sequence must be a string or list of AminoAcid objects.")
+            TypeError: If the sequence is not a string, list or ResidueSequence.
+        """
+        [fragment] = ProteinTruncator.truncate_batch(sequence, [site])
+        return fragment.view(), fragment.cleavage_residue()
@@ -0,0 +1,335 @@
+"""
+phospho_ssa.py
+Event-driven (continuous-time) version of the phospo_over_time phosphorylation kinetics.
+Each residue's phosphorylation and dephosphorylation is a reaction channel. The exact mode (Gillespie direct
+method) jumps straight to the next event; the tau-leaping mode fires many events per leap for high-rate regimes.
+Per-step probabilities p of the discrete model become hazard rates -log(1 - p), so an isolated residue flips
+within one time unit with the same probability as in one discrete step.
+"""
+import math
+import numpy as np
+from .models.sequence import ResidueSequence
+from .phospho_utils import PHOSPHO, constants_from_codes, ptm_state, resolve_PTMs
+
+MODES = ("exact", "tau_leap")
+# Largest per-step probability converted to a hazard rate (p = 1 would be an infinite rate).
+MAX_STEP_PROBABILITY = 1 - 1e-12
+# Tau-leaping falls back to exact events when a leap would hold fewer expected events than this.
+MIN_LEAP_EVENTS = 10.0
+DRAW_BLOCK = 4096
+
+
+def hazard(probability):
+    """
+    Args:
+        probability (float): Per-step flip probability (clamped to [0, MAX_STEP_PROBABILITY]).
+    Returns:
+        float: Rate whose flip probability over one time unit is that probability.
+    """
+    return -math.log1p(-min(max(probability, 0.0), MAX_STEP_PROBABILITY))
+
+
+class EventLog:
+    """
+    Phosphorylation events of one trajectory: event times, residue positions and +1/-1 changes.
+    Any time grid can be read off the log after the run.
+    """
+
+    def __init__(self, initial_codes, candidates, times, residues, deltas, t_end):
+        """
+        Initialize an EventLog.
+        Args:
+            initial_codes (np.ndarray): uint8 PTM codes at t = 0.
+            candidates (np.ndarray): Boolean mask of Ser/Thr/Tyr residues.
+            times (np.ndarray): Non-decreasing event times.
+            residues (np.ndarray): Residue position per event.
+            deltas (np.ndarray): +1 (phosphorylated) or -1 (dephosphorylated) per event.
+            t_end (float): End of the simulated interval.
+        """
+        self.initial_codes = initial_codes
+        self.candidates = candidates
+        self.times = np.asarray(times, dtype=float)
+        self.residues = np.asarray(residues, dtype=np.intp)
+        self.deltas = np.asarray(deltas, dtype=np.int8)
+        self.t_end = t_end
+
+    def __len__(self):
+        return len(self.times)
+
+    def _running(self, deltas, grid):
+        cumulative = np.concatenate(([0], np.cumsum(deltas, dtype=np.int64)))
+        return cumulative[np.searchsorted(self.times, grid, side="right")]
+
+    def phospho_count(self, grid):
+        """
+        Args:
+            grid (np.ndarray): Times to sample.
+        Returns:
+            np.ndarray: Number of phosphorylated residues at each time.
+        """
+        initial = np.count_nonzero(self.initial_codes == PHOSPHO)
+        return initial + self._running(self.deltas, grid)
+
+    def possible(self, grid):
+        """
+        Denominator of the phosphorylation percentage: Ser/Thr/Tyr residues plus other phosphorylated residues.
+        Args:
+            grid (np.ndarray): Times to sample.
+        Returns:
+            np.ndarray: Count at each time.
+        """
+        other = ~self.candidates
+        initial = np.count_nonzero(self.candidates) + np.count_nonzero(other & (self.initial_codes == PHOSPHO))
+        return initial + self._running(np.where(other[self.residues], self.deltas, 0), grid)
+
+    def resample(self, grid):
+        """
+        Args:
+            grid (np.ndarray): Times to sample.
+        Returns:
+            np.ndarray: Phosphorylated-residue percentage at each time, as returned by phospo_over_time.
+        """
+        grid = np.asarray(grid, dtype=float)
+        return self.phospho_count(grid) / self.possible(grid) * 100
+
+    def state_at(self, t):
+        """
+        Args:
+            t (float): Time.
+        Returns:
+            np.ndarray: uint8 PTM codes at time t.
+        """
+        codes = self.initial_codes.copy()
+        stop = np.searchsorted(self.times, t, side="right")
+        residues = self.residues[:stop][::-1]
+        deltas = self.deltas[:stop][::-1]
+        # The last event of each residue decides its state.
+        touched, last = np.unique(residues, return_index=True)
+        codes[touched] = np.where(deltas[last] > 0, PHOSPHO, 0)
+        return codes
+
+
+class PhosphoSSA:
+    """
+    Stochastic simulation of phosphorylation with constant phosphorylation/dephosphorylation constants.
+    Residues of one class are exchangeable, so channel propensities are summed per class and the firing
+    residue is drawn uniformly within its class, which is exact for per-residue channels.
+    """
+
+    def __init__(self, protein, phospho_k=None, dephospho_k=None, list_of_PTMs=None, rng=None):
+        """
+        Initialize a PhosphoSSA.
+        Args:
+            protein (Protein): Protein whose current PTM state is the initial state (not modified).
+            phospho_k (float, optional): Phosphorylation constant; drawn once with constants_from_codes if omitted.
+            dephospho_k (float, optional): Dephosphorylation constant; drawn with phospho_k if omitted.
+            list_of_PTMs (list, optional): (position, modification) presets applied to the initial state.
+            rng (np.random.Generator, optional): Random generator.
+        """
+        codes, candidates = ptm_state(protein)
+        positions, preset_codes = resolve_PTMs(protein, list_of_PTMs)
+        codes[positions] = preset_codes
+        if phospho_k is None or dephospho_k is None:
+            phospho_k, dephospho_k = constants_from_codes(codes, rng)
+        self.phospho_k = phospho_k
+        self.dephospho_k = dephospho_k
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.initial_codes = codes
+        self.candidates = candidates
+        self.dephospho_rate = hazard(dephospho_k)
+        self._reset(as_list=True)
+
+    def _reset(self, as_list):
+        phospho = self.initial_codes == PHOSPHO
+        # order[:n] are phosphorylated residues, order[n:n + m] unphosphorylated Ser/Thr/Tyr.
+        # Single swaps are cheaper on a list; leaps rebuild it with array operations.
+        self.order = np.concatenate((np.flatnonzero(phospho), np.flatnonzero(self.candidates & ~phospho)))
+        if as_list:
+            self.order = self.order.tolist()
+        self.n = int(np.count_nonzero(phospho))
+        self.m = len(self.order) - self.n
+        self.n_possible = int(np.count_nonzero(self.candidates)) + int(np.count_nonzero(phospho & ~self.candidates))
+        self.times = []
+        self.residues = []
+        self.deltas = []
+        self.t = 0.0
+
+    def phospho_rate(self):
+        """
+        Returns:
+            float: Current per-residue phosphorylation rate (it depends on the phosphorylated count).
+        """
+        if not self.n_possible:
+            return 0.0
+        dP = self.phospho_k * (1 - (self.n / self.n_possible)) - self.dephospho_k * self.n
+        return hazard(dP)
+
+    def _draws(self):
+        while True:
+            exponentials = self.rng.standard_exponential(DRAW_BLOCK).tolist()
+            uniforms = self.rng.random(DRAW_BLOCK).tolist()
+            yield from zip(exponentials, uniforms)
+
+    def _dephosphorylate(self, slot):
+        order = self.order
+        residue = order[slot]
+        last = self.n - 1
+        order[slot], order[last] = order[last], residue
+        self.n = last
+        if self.candidates[residue]:
+            self.m += 1
+        else:
+            # Drop it from the active set: swap it past the unphosphorylated block.
+            end = last + self.m
+            order[last], order[end] = order[end], residue
+            self.n_possible -= 1
+        return residue
+
+    def _phosphorylate(self, slot):
+        order = self.order
+        residue = order[slot]
+        order[slot], order[self.n] = order[self.n], residue
+        self.n += 1
+        self.m -= 1
+        return residue
+
+    def _exact_event(self, t_end, draw):
+        """
+        Fire one Gillespie event, or return False if none happens before t_end.
+        """
+        dephospho_total = self.n * self.dephospho_rate
+        phospho_rate = self.phospho_rate()
+        total = dephospho_total + self.m * phospho_rate
+        if total <= 0:
+            return False
+        exponential, uniform = draw
+        t = self.t + exponential / total
+        if t > t_end:
+            return False
+        self.t = t
+        # The uniform that picks the channel class also picks the residue within it.
+        u = uniform * total
+        if u < dephospho_total:
+            residue = self._dephosphorylate(min(int(u / self.dephospho_rate), self.n - 1))
+            delta = -1
+        else:
+            slot = self.n + min(int((u - dephospho_total) / phospho_rate), self.m - 1)
+            residue = self._phosphorylate(slot)
+            delta = 1
+        self.times.append(t)
+        self.residues.append(residue)
+        self.deltas.append(delta)
+        return True
+
+    def _leap_size(self, phospho_total, dephospho_total, epsilon):
+        """
+        Cao-Gillespie-Petzold leap: bound the expected change and its spread in both populations by epsilon.
+        """
+        drift = abs(phospho_total - dephospho_total)
+        spread = phospho_total + dephospho_total
+        tau = math.inf
+        for population in (self.n, self.m):
+            bound = max(epsilon * population, 1.0)
+            if drift > 0:
+                tau = min(tau, bound / drift)
+            tau = min(tau, bound * bound / spread)
+        return tau
+
+    def _leap(self, tau):
+        rng = self.rng
+        phospho_rate = self.phospho_rate()
+        removed = rng.binomial(self.n, -math.expm1(-self.dephospho_rate * tau))
+        added = rng.binomial(self.m, -math.expm1(-phospho_rate * tau))
+        order = self.order
+        n, m = self.n, self.m
+        removed_slots = rng.choice(n, removed, replace=False)
+        added_slots = n + rng.choice(m, added, replace=False)
+        kept = np.ones(len(order), dtype=bool)
+        kept[removed_slots] = False
+        kept[added_slots] = False
+        gone = order[removed_slots]
+        new = order[added_slots]
+        back = gone[self.candidates[gone]]
+        dropped = gone[~self.candidates[gone]]
+        self.order = np.concatenate(
+            (order[:n][kept[:n]], new, back, order[n:n + m][kept[n:n + m]], dropped, order[n + m:])
+        )
+        self.n = n - removed + added
+        self.m = m + len(back) - added
+        self.n_possible -= len(dropped)
+        self.t += tau
+        self.times.extend([self.t] * (removed + added))
+        self.residues.extend(gone.tolist() + new.tolist())
+        self.deltas.extend([-1] * removed + [1] * added)
+
+    def run(self, t_end, mode="exact", epsilon=0.03):
+        """
+        Simulate from t = 0 to t_end.
+        Args:
+            t_end (float): End time (one time unit corresponds to one step of phospo_over_time).
+            mode (str): 'exact' or 'tau_leap'.
+            epsilon (float): Tau-leaping error control (relative change per leap).
+        Returns:
+            EventLog: Events of the trajectory.
+        Raises:
+            ValueError: If the mode is unknown.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode: {mode!r} (expected one of {MODES})")
+        self._reset(as_list=mode == "exact")
+        draws = self._draws()
+        if mode == "exact":
+            while self._exact_event(t_end, next(draws)):
+                pass
+        else:
+            while self.t < t_end:
+                dephospho_total = self.n * self.dephospho_rate
+                phospho_total = self.m * self.phospho_rate()
+                total = dephospho_total + phospho_total
+                if total <= 0:
+                    break
+                tau = min(self._leap_size(phospho_total, dephospho_total, epsilon), t_end - self.t)
+                if tau * total < MIN_LEAP_EVENTS:
+                    if not self._exact_event(t_end, next(draws)):
+                        break
+                else:
+                    self._leap(tau)
+        return EventLog(self.initial_codes, self.candidates, self.times, self.residues, self.deltas, t_end)
+
+
+def write_state(protein, codes):
+    """
+    Write a PTM-code array back to a protein, touching only residues whose phosphorylation changed.
+    Args:
+        protein (Protein): Protein to update.
+        codes (np.ndarray): uint8 PTM codes.
+    """
+    current, _ = ptm_state(protein)
+    changed = np.flatnonzero(current != codes)
+    if isinstance(protein.sequence, ResidueSequence):
+        protein.sequence.set_ptm_codes(changed[codes[changed] == PHOSPHO], PHOSPHO)
+        protein.sequence.set_ptm_codes(changed[codes[changed] != PHOSPHO], 0)
+        return
+    for index in changed.tolist():
+        if codes[index] == PHOSPHO:
+            protein.sequence[index].add_PTM("Phosphorylation")
+        else:
+            protein.sequence[index].remove_PTM()
+
+
+def phospo_over_time_ssa(protein, time, list_of_PTMs=None, mode="exact", rng=None):
+    """
+    Event-driven counterpart of phospo_over_time: simulate up to t = time and sample after every time unit.
+    Constants are drawn once rather than every step. The protein is left in its final state.
+    Args:
+        protein (Protein): Protein to simulate.
+        time (int): Number of time units T.
+        list_of_PTMs (list, optional): (position, modification) presets.
+        mode (str): 'exact' or 'tau_leap'.
+        rng (np.random.Generator, optional): Random generator.
+    Returns:
+        np.ndarray: Phosphorylation percentage at t = 1..T.
+    """
+    log = PhosphoSSA(protein, list_of_PTMs=list_of_PTMs, rng=rng).run(time, mode=mode)
+    write_state(protein, log.state_at(time))
+    return log.resample(np.arange(1, time + 1))
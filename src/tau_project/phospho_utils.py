@@ -3,9 +3,15 @@ phospho_utils.py
 Utility functions for phosphorylation and dephosphorylation logic, shared across the project.
 """
 import random
+from time import perf_counter
+
 import numpy as np
+from .models.sequence import ResidueSequence
+from .rng import draw_source, generator_source
+from .instrumentation import DISABLED
+from .models.aa import PHOSPHO_CANDIDATES, PTM_ALIASES, PTM_CODES, PTM_NAMES, PTM_RESIDUES, PTM_TYPES
 
-def phosphorylation_constants(protein, list_of_PTMs=None):
+def phosphorylation_constants(protein, list_of_PTMs=None, rng=None):
     initial_phospo_constant = 0.005
     initial_dephospo_constant = 0.02
     acetyl_constant_ranges = [2, 5, 0.8, 1]
@@ -22,30 +28,40 @@ def phosphorylation_constants(protein, list_of_PTMs=None):
     if list_of_PTMs is not None:
         for residue in list_of_PTMs:
             protein.sequence[residue[0] - 1].add_PTM(residue[1])
-    for aa in protein.sequence:
-        match aa.PTM:
-            case "Phospho":
-                phospho_residues += 1
-                possible_phopho += 1
-            case "Acetyl":
-                acetyl_counts += 1
-            case "Methyl":
-                methyl_counts += 1
-            case "Ubi":
-                ubi_counts += 1
-            case "GlcNAc":
-                glyco_counts += 1
-            case __ if aa.three_letter in {"Ser", "Thr", "Tyr"}:
-                possible_phopho += 1
+    if isinstance(protein.sequence, ResidueSequence):
+        acetyl_counts = protein.sequence.ptm_count("Acetyl")
+        methyl_counts = protein.sequence.ptm_count("Methyl")
+        ubi_counts = protein.sequence.ptm_count("Ubi")
+        glyco_counts = protein.sequence.ptm_count("GlcNAc")
+    else:
+        for aa in protein.sequence:
+            match aa.PTM:
+                case "Phospho":
+                    phospho_residues += 1
+                    possible_phopho += 1
+                case "Acetyl":
+                    acetyl_counts += 1
+                case "Methyl":
+                    methyl_counts += 1
+                case "Ubi":
+                    ubi_counts += 1
+                case "GlcNAc":
+                    glyco_counts += 1
+                case __ if aa.three_letter in {"Ser", "Thr", "Tyr"}:
+                    possible_phopho += 1
 
-    aK = random.uniform(acetyl_constant_ranges[0], acetyl_constant_ranges[1])
-    adK = random.uniform(acetyl_constant_ranges[2], acetyl_constant_ranges[3])
-    mK = random.uniform(methyl_constant_ranges[0], methyl_constant_ranges[1])
-    mdK = random.uniform(methyl_constant_ranges[2], methyl_constant_ranges[3])
-    uK = random.uniform(ubi_constant_ranges[0], ubi_constant_ranges[1])
-    udK = random.uniform(ubi_constant_ranges[2], ubi_constant_ranges[3])
-    gK = random.uniform(glyco_constant_ranges[0], glyco_constant_ranges[1])
-    gdK = random.uniform(glyco_constant_ranges[2], glyco_constant_ranges[3])
+    if rng is not None:
+        # One bulk draw, in the same order as the scalar draws below.
+        aK, adK, mK, mdK, uK, udK, gK, gdK = rng.uniform(CONSTANT_LOWS, CONSTANT_HIGHS).tolist()
+    else:
+        aK = random.uniform(acetyl_constant_ranges[0], acetyl_constant_ranges[1])
+        adK = random.uniform(acetyl_constant_ranges[2], acetyl_constant_ranges[3])
+        mK = random.uniform(methyl_constant_ranges[0], methyl_constant_ranges[1])
+        mdK = random.uniform(methyl_constant_ranges[2], methyl_constant_ranges[3])
+        uK = random.uniform(ubi_constant_ranges[0], ubi_constant_ranges[1])
+        udK = random.uniform(ubi_constant_ranges[2], ubi_constant_ranges[3])
+        gK = random.uniform(glyco_constant_ranges[0], glyco_constant_ranges[1])
+        gdK = random.uniform(glyco_constant_ranges[2], glyco_constant_ranges[3])
 
     pK = (
         initial_phospo_constant
@@ -64,7 +80,9 @@ def phosphorylation_constants(protein, list_of_PTMs=None):
 
     return pK, dpK
 
-def phosphorylation(protein, phospho_k, dephospho_k):
+def phosphorylation(protein, phospho_k, dephospho_k, rng=None, observer=None):
+    if isinstance(protein.sequence, ResidueSequence):
+        return counted_phosphorylation(protein.sequence, phospho_k, dephospho_k, rng, observer)
     phospho_residues = 0
     possible_phopho = 0
     for aa in protein.sequence:
@@ -79,30 +97,372 @@ def phosphorylation(protein, phospho_k, dephospho_k):
         - dephospho_k * phospho_residues
     )
 
+    # At most one draw per residue, so with a Generator the step costs a single bulk call.
+    draw = draw_source(rng, len(protein.sequence)).random
     phospho_residues = 0
     possible_phopho = 0
+    events = 0
     for aa in protein.sequence:
         match aa.PTM:
             case "Phospho":
-                if random.random() < dephospho_k:
+                if draw() < dephospho_k:
                     aa.remove_PTM()
                     possible_phopho += 1
+                    events += 1
                 else:
                     phospho_residues += 1
                     possible_phopho += 1
             case __ if aa.three_letter in {"Ser", "Thr", "Tyr"}:
-                if random.random() < dP:
+                if draw() < dP:
                     aa.add_PTM("Phosphorylation")
                     phospho_residues += 1
                     possible_phopho += 1
+                    events += 1
                 else:
                     possible_phopho += 1
 
+    if observer is not None:
+        # Every phosphorylated or Ser/Thr/Tyr residue takes exactly one draw.
+        observer.count("random_draws", possible_phopho)
+        observer.count("ptm_events", events)
     return phospho_residues / possible_phopho * 100
 
-def phospo_over_time(protein, time, list_of_PTMs=None):
+def phospo_over_time(protein, time, list_of_PTMs=None, checkpoint=None, rng=None, observer=None):
     p_percentage = np.zeros(time)
-    for i in range(time):
-        pK, dpK = phosphorylation_constants(protein, list_of_PTMs)
-        p_percentage[i] = phosphorylation(protein, pK, dpK)
-    return p_percentage 
\ No newline at end of file
+    start = 0
+    if checkpoint is not None:
+        # Resume from the latest checkpoint of this run, if any.
+        run = {
+            "kind": "phospo_over_time",
+            "time": time,
+            "length": len(protein.sequence),
+            "PTMs": [list(ptm) for ptm in list_of_PTMs or []],
+        }
+        saved = checkpoint.load(run, rng)
+        if saved is None:
+            checkpoint.clear()
+        else:
+            start = saved.step
+            p_percentage[:start] = checkpoint.read_trajectory(start)
+            set_ptm_state(protein, saved.arrays["ptm_codes"])
+    if observer is not None:
+        observer.begin("phospo_over_time")
+    for i in range(start, time):
+        if observer is not None:
+            p_percentage[i] = observed_step(protein, list_of_PTMs, rng, observer)
+        elif rng is None:
+            pK, dpK = phosphorylation_constants(protein, list_of_PTMs)
+            p_percentage[i] = phosphorylation(protein, pK, dpK)
+        else:
+            pK, dpK = phosphorylation_constants(protein, list_of_PTMs, rng)
+            p_percentage[i] = phosphorylation(protein, pK, dpK, rng)
+        if checkpoint is not None and ((i + 1) % checkpoint.every == 0 or i + 1 == time):
+            with (observer if observer is not None else DISABLED).phase("checkpoint"):
+                checkpoint.append_trajectory(p_percentage[start:i + 1])
+                checkpoint.save(i + 1, run, arrays={"ptm_codes": ptm_state(protein)[0]}, rng=rng)
+            start = i + 1
+        if observer is not None:
+            observer.step(i + 1, phospho_percentage=float(p_percentage[i]))
+    if observer is not None:
+        observer.end()
+    return p_percentage 
+
+
+def observed_step(protein, list_of_PTMs, rng, observer):
+    """
+    One phospo_over_time step with its phases timed and its counters updated.
+    Args:
+        protein (Protein): Protein to update.
+        list_of_PTMs (list): (position, modification) presets.
+        rng (np.random.Generator, optional): Random generator.
+        observer (Instrumentation): Observer.
+    Returns:
+        float: Phosphorylated-residue percentage after the step.
+    """
+    start = perf_counter()
+    pK, dpK = phosphorylation_constants(protein, list_of_PTMs, rng)
+    middle = perf_counter()
+    percentage = phosphorylation(protein, pK, dpK, rng, observer)
+    observer.add_time("rates", middle - start)
+    if not isinstance(protein.sequence, ResidueSequence):
+        # Draws and PTM writes are interleaved in the per-residue loop, so it is timed as one phase.
+        observer.add_time("mutation", perf_counter() - middle)
+    observer.count("random_draws", len(CONSTANT_LOWS))
+    observer.count("steps")
+    return percentage
+
+# Bounds of the uniform draws in phosphorylation_constants, in draw order:
+# aK, adK, mK, mdK, uK, udK, gK, gdK.
+CONSTANT_LOWS = np.array([2, 0.8, 0.5, 1, 0.5, 1.2, 0.1, 1.5])
+CONSTANT_HIGHS = np.array([5, 1, 0.9, 1, 1, 2, 0.3, 2.5])
+PHOSPHO = PTM_CODES["Phospho"]
+
+
+def constants_from_codes(codes, rng=None):
+    """
+    phosphorylation_constants for a PTM-code array instead of a protein, so no residue is modified.
+    Draws the same values as phosphorylation_constants for the same rng (or global random state).
+    Args:
+        codes (np.ndarray): uint8 PTM codes, presets already applied.
+        rng (np.random.Generator, optional): Random generator; the global random module is used if omitted.
+    Returns:
+        tuple: (pK, dpK)
+    """
+    if rng is not None:
+        draws = rng.uniform(CONSTANT_LOWS, CONSTANT_HIGHS).tolist()
+    else:
+        draws = [random.uniform(low, high) for low, high in zip(CONSTANT_LOWS.tolist(), CONSTANT_HIGHS.tolist())]
+    aK, adK, mK, mdK, uK, udK, gK, gdK = draws
+    acetyl_counts, methyl_counts, ubi_counts, glyco_counts = (
+        int(np.count_nonzero(codes == PTM_CODES[name])) for name in ("Acetyl", "Methyl", "Ubi", "GlcNAc")
+    )
+    pK = 0.005 * (aK**acetyl_counts) * (mK**methyl_counts) * (uK**ubi_counts) * (gK**glyco_counts)
+    dpK = 0.02 * (adK**acetyl_counts) * (mdK**methyl_counts) * (udK**ubi_counts) * (gdK**glyco_counts)
+    return pK, dpK
+
+
+def counted_phosphorylation(sequence, phospho_k, dephospho_k, rng=None, observer=None):
+    """
+    phosphorylation() for a ResidueSequence, driven by its incremental PTM counters.
+    The number of residues that flip is drawn from a binomial per direction and only those residues are
+    located and rewritten, so a step in which nothing changes never scans the sequence.
+    Args:
+        sequence (ResidueSequence): Sequence to update in place.
+        phospho_k (float): Phosphorylation constant.
+        dephospho_k (float): Dephosphorylation constant.
+        rng (np.random.Generator, optional): Random generator; None seeds one from the global random module.
+        observer (Instrumentation, optional): Receives 'draws' and 'mutation' timings and event counters.
+    Returns:
+        float: Phosphorylated-residue percentage after the step.
+    """
+    if observer is not None:
+        start = perf_counter()
+    rng = generator_source(rng)
+    phospho_residues = sequence.ptm_count("Phospho")
+    candidate_phospho = sequence.candidate_phospho_count()
+    possible_phopho = sequence.n_candidates + phospho_residues - candidate_phospho
+    dP = phospho_k * (1 - (phospho_residues / possible_phopho)) - dephospho_k * phospho_residues
+    n_removed = rng.binomial(phospho_residues, min(max(dephospho_k, 0.0), 1.0))
+    n_added = rng.binomial(sequence.n_candidates - candidate_phospho, min(max(dP, 0.0), 1.0))
+    # Both draws see the state at the start of the step, so locate residues before writing any.
+    if n_added:
+        unphosphorylated = np.flatnonzero(sequence.candidate_mask() & (sequence.ptm_codes != PHOSPHO))
+        added = rng.choice(unphosphorylated, n_added, replace=False)
+    if n_removed:
+        phosphorylated = np.flatnonzero(sequence.ptm_codes == PHOSPHO)
+        removed = rng.choice(phosphorylated, n_removed, replace=False)
+    if observer is not None:
+        middle = perf_counter()
+    if n_removed:
+        sequence.set_ptm_codes(removed, 0)
+    if n_added:
+        sequence.set_ptm_codes(added, PHOSPHO)
+    if observer is not None:
+        observer.add_time("draws", middle - start)
+        observer.add_time("mutation", perf_counter() - middle)
+        # Two binomial variates plus one selection per flipped residue.
+        observer.count("random_draws", 2 + n_added + n_removed)
+        observer.count("ptm_events", n_added + n_removed)
+    return (phospho_residues - n_removed + n_added) / possible_phopho * 100
+
+
+def phospho_step(state, candidates, phospho_k, dephospho_k, draws):
+    """
+    Vectorized phosphorylation step over rows of PTM codes, with the semantics of phosphorylation().
+    Args:
+        state (np.ndarray): (n, L) uint8 PTM codes, updated in place.
+        candidates (np.ndarray): Boolean mask of Ser/Thr/Tyr columns, shape (L,).
+        phospho_k (np.ndarray): Phosphorylation constant per row.
+        dephospho_k (np.ndarray): Dephosphorylation constant per row.
+        draws (np.ndarray): Uniform [0, 1) draws, shape (n, L).
+    Returns:
+        np.ndarray: Phosphorylated-residue percentage per row.
+    """
+    phospho = state == PHOSPHO
+    phospho_residues = np.count_nonzero(phospho, axis=1)
+    possible_phopho = np.count_nonzero(candidates) + np.count_nonzero(phospho[:, ~candidates], axis=1)
+    dP = phospho_k * (1 - (phospho_residues / possible_phopho)) - dephospho_k * phospho_residues
+    removed = phospho & (draws < dephospho_k[:, None])
+    added = ~phospho & candidates & (draws < dP[:, None])
+    state[removed] = 0
+    state[added] = PHOSPHO
+    phospho_residues += np.count_nonzero(added, axis=1) - np.count_nonzero(removed, axis=1)
+    return phospho_residues / possible_phopho * 100
+
+
+def ptm_state(protein):
+    """
+    Read the per-residue PTM state of a protein.
+    Args:
+        protein (Protein): Protein whose sequence holds AminoAcid-like residues.
+    Returns:
+        tuple: (uint8 PTM codes, bool mask of Ser/Thr/Tyr residues)
+    """
+    if isinstance(protein.sequence, ResidueSequence):
+        return protein.sequence.ptm_codes.copy(), protein.sequence.candidate_mask()
+    codes = np.array([PTM_CODES[aa.PTM or None] for aa in protein.sequence], dtype=np.uint8)
+    candidates = np.array([aa.three_letter in PHOSPHO_CANDIDATES for aa in protein.sequence], dtype=bool)
+    return codes, candidates
+
+
+def set_ptm_state(protein, codes):
+    """
+    Write per-residue PTM codes back to a protein, touching only residues whose PTM differs.
+    Args:
+        protein (Protein): Protein to update.
+        codes (np.ndarray): uint8 PTM codes, one per residue.
+    """
+    current, _ = ptm_state(protein)
+    changed = np.flatnonzero(current != codes)
+    if isinstance(protein.sequence, ResidueSequence):
+        for code in np.unique(codes[changed]).tolist():
+            protein.sequence.set_ptm_codes(changed[codes[changed] == code], code)
+        return
+    for index in changed.tolist():
+        aa = protein.sequence[index]
+        if aa.PTM:
+            aa.remove_PTM()
+        if codes[index]:
+            aa.add_PTM(PTM_NAMES[PTM_TYPES[codes[index]]])
+
+
+def resolve_PTMs(protein, list_of_PTMs):
+    """
+    Validate (position, modification) presets against the residues of a protein.
+    Args:
+        protein (Protein): Protein the presets refer to.
+        list_of_PTMs (list): (1-based position, modification) pairs.
+    Returns:
+        tuple: (0-based positions, uint8 PTM codes)
+    Raises:
+        Exception: If a preset is not allowed for its residue, as in AminoAcid.add_PTM.
+    """
+    positions = []
+    codes = []
+    for position, modification in list_of_PTMs or []:
+        aa = protein.sequence[position - 1]
+        ptm = PTM_ALIASES.get(modification)
+        if ptm is None:
+            raise Exception(f"Unknown modification: {modification}")
+        if aa.three_letter not in PTM_RESIDUES[ptm]:
+            raise Exception(f"{aa.three_letter} at {position} does not undergo {PTM_NAMES[ptm]}")
+        positions.append(position - 1)
+        codes.append(PTM_CODES[ptm])
+    return np.array(positions, dtype=np.intp), np.array(codes, dtype=np.uint8)
+
+
+class PhosphoEnsemble:
+    """
+    Batched version of phospo_over_time for N independent copies of one protein.
+    Only columns that can change (Ser/Thr/Tyr, phosphorylated residues and PTM presets) are stored
+    per molecule, as an (N, n_active) uint8 array of PTM codes; every other residue is shared.
+    Each step draws all of its random numbers, constants and residue flips, with one Generator call per molecule chunk.
+    """
+
+    def __init__(self, protein, n_molecules, list_of_PTMs=None, rng=None, chunk_size=65536):
+        """
+        Initialize a PhosphoEnsemble.
+        Args:
+            protein (Protein): Template protein; its current PTM state seeds every molecule.
+            n_molecules (int): Number of molecules N.
+            list_of_PTMs (list, optional): (position, modification) presets re-applied every step.
+            rng (np.random.Generator, optional): Random generator.
+            chunk_size (int): Molecules per vectorized block, bounding temporary memory.
+        Raises:
+            ValueError: If the protein has no phosphorylatable residues.
+        """
+        template, candidates = ptm_state(protein)
+        preset_positions, preset_codes = resolve_PTMs(protein, list_of_PTMs)
+        active = candidates | (template == PHOSPHO)
+        active[preset_positions] = True
+        if not candidates.any() and not (template == PHOSPHO).any():
+            raise ValueError("Protein has no phosphorylatable residues")
+        self.n_molecules = n_molecules
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.chunk_size = chunk_size
+        self.template = template
+        self.columns = np.flatnonzero(active)
+        self.candidates = candidates[self.columns]
+        column_of = {column: i for i, column in enumerate(self.columns)}
+        self.preset_columns = np.array([column_of[p] for p in preset_positions], dtype=np.intp)
+        self.preset_codes = preset_codes
+        # PTM counts of the residues that never change, per code.
+        self.fixed_counts = np.bincount(np.delete(template, self.columns), minlength=len(PTM_TYPES))
+        self.state = np.repeat(template[self.columns][None, :], n_molecules, axis=0)
+
+    @property
+    def ptm_codes(self):
+        """
+        Returns:
+            np.ndarray: Full (N, L) uint8 PTM-code matrix.
+        """
+        full = np.repeat(self.template[None, :], self.n_molecules, axis=0)
+        full[:, self.columns] = self.state
+        return full
+
+    def constants(self, state, draws):
+        """
+        Vectorized phosphorylation_constants for a block of molecules.
+        Args:
+            state (np.ndarray): (n, n_active) PTM codes; presets are applied in place.
+            draws (np.ndarray): Uniform [0, 1) draws, shape (n, len(CONSTANT_LOWS)), scaled to the constant ranges.
+        Returns:
+            tuple: (pK, dpK) arrays of shape (n,)
+        """
+        if len(self.preset_columns):
+            state[:, self.preset_columns] = self.preset_codes
+        counts = [
+            self.fixed_counts[code] + np.count_nonzero(state == code, axis=1)
+            for code in (PTM_CODES["Acetyl"], PTM_CODES["Methyl"], PTM_CODES["Ubi"], PTM_CODES["GlcNAc"])
+        ]
+        aK, adK, mK, mdK, uK, udK, gK, gdK = (CONSTANT_LOWS + (CONSTANT_HIGHS - CONSTANT_LOWS) * draws).T
+        acetyl_counts, methyl_counts, ubi_counts, glyco_counts = counts
+        pK = 0.005 * (aK**acetyl_counts) * (mK**methyl_counts) * (uK**ubi_counts) * (gK**glyco_counts)
+        dpK = 0.02 * (adK**acetyl_counts) * (mdK**methyl_counts) * (udK**ubi_counts) * (gdK**glyco_counts)
+        return pK, dpK
+
+    def phosphorylation(self, state, phospho_k, dephospho_k, draws):
+        """
+        Vectorized phosphorylation step for a block of molecules.
+        Args:
+            state (np.ndarray): (n, n_active) PTM codes, updated in place.
+            phospho_k (np.ndarray): Phosphorylation constant per molecule.
+            dephospho_k (np.ndarray): Dephosphorylation constant per molecule.
+            draws (np.ndarray): Uniform [0, 1) draws, shape (n, n_active).
+        Returns:
+            np.ndarray: Phosphorylated-residue percentage per molecule.
+        """
+        return phospho_step(state, self.candidates, phospho_k, dephospho_k, draws)
+
+    def run(self, time):
+        """
+        Advance every molecule for a number of steps.
+        Args:
+            time (int): Number of steps T.
+        Returns:
+            np.ndarray: Phosphorylation percentage, shape (N, T).
+        """
+        p_percentage = np.zeros((self.n_molecules, time))
+        for start in range(0, self.n_molecules, self.chunk_size):
+            block = self.state[start:start + self.chunk_size]
+            for i in range(time):
+                # One draw per step: the constants' columns, then one per active residue.
+                draws = self.rng.random((len(block), len(CONSTANT_LOWS) + block.shape[1]))
+                pK, dpK = self.constants(block, draws[:, :len(CONSTANT_LOWS)])
+                p_percentage[start:start + len(block), i] = self.phosphorylation(block, pK, dpK, draws[:, len(CONSTANT_LOWS):])
+        return p_percentage
+
+
+def phospo_over_time_ensemble(protein, time, n_molecules, list_of_PTMs=None, rng=None):
+    """
+    Run phospo_over_time for N independent copies of a protein at once.
+    Args:
+        protein (Protein): Template protein (not modified).
+        time (int): Number of steps T.
+        n_molecules (int): Number of molecules N.
+        list_of_PTMs (list, optional): (position, modification) presets.
+        rng (np.random.Generator, optional): Random generator.
+    Returns:
+        np.ndarray: Phosphorylation percentage, shape (N, T).
+    """
+    return PhosphoEnsemble(protein, n_molecules, list_of_PTMs, rng).run(time)
@@ -1,26 +1,139 @@
-import matplotlib.pyplot as plt
+"""
+plot_utils.py
+Plots of simulation results, shown interactively or written to files.
+matplotlib is imported on the first plot rather than with this module, so simulation-only runs and worker
+processes never load it.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
-import seaborn as sns
-import pandas as pd
+from .history import AGGREGATION_STATES, as_columns
+
+# Largest number of points drawn per line and of cells per heatmap axis; longer data is reduced first.
+MAX_POINTS = 4000
+MAX_CELLS = 1000
+
+
+def minmax_downsample(x, y, max_points=MAX_POINTS):
+    """
+    Reduce a line series to at most max_points points, keeping the minimum and maximum of every bucket
+    (in their original order), so spikes and extremes survive the reduction.
+    Args:
+        x (np.ndarray): x values.
+        y (np.ndarray): y values, same length as x.
+        max_points (int, optional): Point budget; None keeps every point.
+    Returns:
+        tuple: (x, y) of the reduced series.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    if max_points is None or n <= max_points or max_points < 4:
+        return x, y
+    n_buckets = max_points // 2
+    starts = np.linspace(0, n, n_buckets + 1).astype(np.intp)[:-1]
+    # reduceat gives each bucket's extremes; the positions of those extremes are recovered by comparison.
+    lows = np.minimum.reduceat(y, starts)
+    highs = np.maximum.reduceat(y, starts)
+    bucket = np.repeat(np.arange(n_buckets), np.diff(np.append(starts, n)))
+    positions = np.arange(n)
+    first_low = np.full(n_buckets, n)
+    first_high = np.full(n_buckets, n)
+    np.minimum.at(first_low, bucket[y == lows[bucket]], positions[y == lows[bucket]])
+    np.minimum.at(first_high, bucket[y == highs[bucket]], positions[y == highs[bucket]])
+    keep = np.unique(np.concatenate((first_low, first_high)))
+    return x[keep], y[keep]
+
+
+def block_average(matrix, max_rows=MAX_CELLS, max_cols=MAX_CELLS):
+    """
+    Average a 2-D matrix over contiguous blocks so it has at most max_rows x max_cols cells.
+    Args:
+        matrix (np.ndarray): Matrix to reduce (e.g. sites x timepoints).
+        max_rows (int): Row budget.
+        max_cols (int): Column budget.
+    Returns:
+        tuple: (reduced matrix, row block starts, column block starts)
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    row_starts = _block_starts(matrix.shape[0], max_rows)
+    col_starts = _block_starts(matrix.shape[1], max_cols)
+    row_sizes = np.diff(np.append(row_starts, matrix.shape[0]))
+    col_sizes = np.diff(np.append(col_starts, matrix.shape[1]))
+    sums = np.add.reduceat(np.add.reduceat(matrix, row_starts, axis=0), col_starts, axis=1)
+    return sums / np.outer(row_sizes, col_sizes), row_starts, col_starts
+
+
+def _block_starts(n, budget):
+    if n <= budget:
+        return np.arange(n)
+    return np.linspace(0, n, budget + 1).astype(np.intp)[:-1]
+
+
+def _site_matrix(site_probabilities):
+    """
+    Sites and (sites x time) matrix of a SiteProbabilities view or a dict of per-site series.
+    """
+    if hasattr(site_probabilities, "matrix"):
+        return list(site_probabilities.sites), np.asarray(site_probabilities.matrix)
+    sites = list(site_probabilities)
+    return sites, np.array([np.asarray(site_probabilities[site], dtype=float) for site in sites])
+
+
+def _new_figure(figsize, path):
+    """
+    A pyplot figure for interactive use, or a standalone Figure (no GUI backend, no pyplot state) when
+    the plot goes to a file.
+    """
+    if path is None:
+        import matplotlib.pyplot as plt
+
+        return plt.figure(figsize=figsize)
+    from matplotlib.figure import Figure
+
+    return Figure(figsize=figsize)
+
+
+def _finish(fig, path, dpi=100):
+    """
+    Show the figure, or write it to path.
+    Returns:
+        str or None: path, if the figure was written.
+    """
+    fig.tight_layout()
+    if path is None:
+        import matplotlib.pyplot as plt
 
-def plot_tau_summary(history):
+        plt.show()
+        return None
+    fig.savefig(path, dpi=dpi)
+    return str(path)
+
+
+def plot_tau_summary(history, path=None, max_points=MAX_POINTS):
     """
     Plots phosphorylation count (P > 0.5), average phosphorylation probability, and aggregation state over time.
+    Accepts a HistoryRecorder (its columns are plotted directly) or a list of dicts.
+    Args:
+        history (HistoryRecorder or list): History to plot.
+        path (str, optional): Output file; the figure is shown interactively if omitted.
+        max_points (int, optional): Point budget per line (min/max downsampling); None plots every point.
+    Returns:
+        str or None: path, if the figure was written.
     """
-    times = [entry["minute"] for entry in history]
-    phospho_counts = [entry["phospho_count"] for entry in history]
-    avg_probs = [entry.get("avg_prob", 0) for entry in history]
-    aggregation_states = [entry["aggregation_state"] for entry in history]
-    agg_state_numeric = {"monomer": 0, "oligomer": 1, "fibril": 2}
-    aggregation_numeric = [agg_state_numeric[state] for state in aggregation_states]
+    columns = as_columns(history)
+    times = columns["minute"]
+    phospho_counts = columns["phospho_count"]
+    avg_probs = columns["avg_prob"]
+    aggregation_numeric = columns["aggregation_state"]
 
-    fig, ax1 = plt.subplots(figsize=(10, 6))
+    fig = _new_figure((10, 6), path)
+    ax1 = fig.add_subplot()
     ax1.set_xlabel("Time Step")
     ax1.set_ylabel("Phosphorylation Count (P > 0.5)", color="tab:blue")
-    ax1.plot(times, phospho_counts, color="tab:blue", label="Phosphorylation Count")
+    ax1.plot(*minmax_downsample(times, phospho_counts, max_points), color="tab:blue", label="Phosphorylation Count")
     ax1.plot(
-        times,
-        avg_probs,
+        *minmax_downsample(times, avg_probs, max_points),
         color="tab:orange",
         label="Average Phosphorylation Probability",
     )
@@ -29,8 +142,7 @@ def plot_tau_summary(history):
     ax2 = ax1.twinx()
     ax2.set_ylabel("Aggregation State", color="tab:green")
     ax2.step(
-        times,
-        aggregation_numeric,
+        *minmax_downsample(times, aggregation_numeric, max_points),
         color="tab:green",
         where="post",
         label="Aggregation State",
@@ -43,39 +155,92 @@ def plot_tau_summary(history):
     lines2, labels2 = ax2.get_legend_handles_labels()
     ax1.legend(lines1 + lines2, labels1 + labels2, loc="upper left")
 
-    plt.title("Tau Phosphorylation and Aggregation Over Time")
-    fig.tight_layout()
-    plt.show()
+    ax1.set_title("Tau Phosphorylation and Aggregation Over Time")
+    written = _finish(fig, path)
 
-    print(f"Final average phosphorylation probability: {avg_probs[-1]:.3f}")
-    print(f"Final aggregation state: {aggregation_states[-1]}")
-    print(
-        f"Maximum phosphorylation count: {max(phospho_counts)} out of {max(phospho_counts) if phospho_counts else 0} sites"
-    )
+    if path is None:
+        print(f"Final average phosphorylation probability: {avg_probs[-1]:.3f}")
+        print(f"Final aggregation state: {AGGREGATION_STATES[aggregation_numeric[-1]]}")
+        print(
+            f"Maximum phosphorylation count: {phospho_counts.max()} out of {phospho_counts.max() if len(phospho_counts) else 0} sites"
+        )
+    return written
 
-def plot_site_probabilities(site_probabilities, timepoints):
+def plot_site_probabilities(site_probabilities, timepoints, path=None, max_points=MAX_POINTS):
     """
     Plots the probability trajectory for each phosphorylation site as a line plot.
+    Args:
+        site_probabilities (SiteProbabilities or dict): Site -> probability series.
+        timepoints (array-like): Time of every sample.
+        path (str, optional): Output file; the figure is shown interactively if omitted.
+        max_points (int, optional): Point budget per line (min/max downsampling); None plots every point.
+    Returns:
+        str or None: path, if the figure was written.
     """
-    plt.figure(figsize=(12, 6))
-    for site, probs in site_probabilities.items():
-        plt.plot(timepoints, probs, label=f"Site {site}")
-    plt.xlabel("Time Step")
-    plt.ylabel("Phosphorylation Probability")
-    plt.title("Site-specific Phosphorylation Probability Over Time")
-    plt.legend(bbox_to_anchor=(1.05, 1), loc="upper left", fontsize="small", ncol=2)
-    plt.tight_layout()
-    plt.show()
+    sites, matrix = _site_matrix(site_probabilities)
+    timepoints = np.asarray(timepoints)
+    fig = _new_figure((12, 6), path)
+    ax = fig.add_subplot()
+    for site, probs in zip(sites, matrix):
+        ax.plot(*minmax_downsample(timepoints, probs, max_points), label=f"Site {site}")
+    ax.set_xlabel("Time Step")
+    ax.set_ylabel("Phosphorylation Probability")
+    ax.set_title("Site-specific Phosphorylation Probability Over Time")
+    ax.legend(bbox_to_anchor=(1.05, 1), loc="upper left", fontsize="small", ncol=2)
+    return _finish(fig, path)
 
-def plot_phosphorylation_heatmap(site_probabilities, timepoints):
+def plot_phosphorylation_heatmap(site_probabilities, timepoints, path=None, max_cells=MAX_CELLS):
     """
     Plots a heatmap of phosphorylation probabilities for all sites over time.
+    The matrix is block-averaged down to at most max_cells columns (and rows) before it is drawn as a single
+    rasterized image.
+    Args:
+        site_probabilities (SiteProbabilities or dict): Site -> probability series.
+        timepoints (array-like): Time of every sample.
+        path (str, optional): Output file; the figure is shown interactively if omitted.
+        max_cells (int): Cell budget per axis.
+    Returns:
+        str or None: path, if the figure was written.
+    """
+    sites, matrix = _site_matrix(site_probabilities)
+    timepoints = np.asarray(timepoints)
+    cells, row_starts, col_starts = block_average(matrix, max_cells, max_cells)
+    fig = _new_figure((14, 6), path)
+    ax = fig.add_subplot()
+    image = ax.imshow(
+        cells,
+        aspect="auto",
+        interpolation="nearest",
+        cmap="viridis",
+        vmin=0.0,
+        vmax=1.0,
+        rasterized=True,
+        extent=(timepoints[0], timepoints[-1], len(sites) - 0.5, -0.5) if len(timepoints) else None,
+    )
+    fig.colorbar(image, ax=ax, label="Phosphorylation Probability")
+    if len(row_starts) == len(sites):
+        step = max(1, len(sites) // 40)
+        ax.set_yticks(np.arange(0, len(sites), step))
+        ax.set_yticklabels([str(site) for site in sites[::step]])
+    ax.set_xlabel("Time Step")
+    ax.set_ylabel("Site")
+    ax.set_title("Phosphorylation Probability Heatmap (Sites x Time)")
+    return _finish(fig, path)
+
+
+def render_batch(jobs, processes=1):
+    """
+    Render many figures to files, optionally across worker processes.
+    Args:
+        jobs (iterable): (function, args, kwargs) triples; function must be picklable (module-level) and
+            write its figure to a file, e.g. one of the plot functions above with a path.
+        processes (int): Worker processes; 1 renders in this process.
+    Returns:
+        list: Return value of every job, in job order.
     """
-    df = pd.DataFrame(site_probabilities, index=timepoints)
-    plt.figure(figsize=(14, 6))
-    sns.heatmap(df.T, cmap="viridis", cbar_kws={"label": "Phosphorylation Probability"})
-    plt.xlabel("Time Step")
-    plt.ylabel("Site")
-    plt.title("Phosphorylation Probability Heatmap (Sites x Time)")
-    plt.tight_layout()
-    plt.show() 
\ No newline at end of file
+    jobs = list(jobs)
+    if processes <= 1 or len(jobs) <= 1:
+        return [function(*args, **kwargs) for function, args, kwargs in jobs]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(function, *args, **kwargs) for function, args, kwargs in jobs]
+        return [future.result() for future in futures]
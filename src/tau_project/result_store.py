@@ -0,0 +1,335 @@
+"""
+result_store.py
+Chunked on-disk store for simulation results (site probability matrices, history columns, phosphorylation
+trajectories, sweep tables). Each array is split along its last (time) axis into fixed-size .npy chunks next to a
+small JSON metadata header. Reads memory-map the chunks, so slicing a stored array only touches the chunks and
+bytes it needs.
+"""
+import json
+import os
+import numpy as np
+from .site_engine import ENGINE_VERSION
+from .history import HistoryRecorder, as_columns
+
+META_FILE = "meta.json"
+FORMAT_VERSION = 1
+CHUNK_SIZE = 65536
+
+
+def _plain(values):
+    """
+    JSON-safe copy of a flat dict (NumPy scalars become Python numbers).
+    """
+    return {key: value.item() if isinstance(value, np.generic) else value for key, value in values.items()}
+
+
+def _atomic_save(path, array):
+    partial = path + ".part.npy"
+    np.save(partial, array)
+    os.replace(partial, path)
+
+
+class ChunkedArray:
+    """
+    Lazy read-only view of a stored array; indexing loads only the chunks it covers, via np.memmap.
+    """
+
+    def __init__(self, directory, dtype, shape, chunk_size):
+        """
+        Initialize a ChunkedArray.
+        Args:
+            directory (str): Directory holding the chunk files.
+            dtype (np.dtype): Element type.
+            shape (tuple): Full shape; chunks split the last axis.
+            chunk_size (int): Length of every chunk along the last axis (the last chunk may be shorter).
+        """
+        self.directory = directory
+        self.dtype = np.dtype(dtype)
+        self.shape = tuple(shape)
+        self.chunk_size = chunk_size
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def n_chunks(self):
+        return -(-self.shape[-1] // self.chunk_size)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def chunk(self, index):
+        """
+        Args:
+            index (int): Chunk number.
+        Returns:
+            np.memmap: Read-only memory map of the chunk.
+        """
+        return np.load(os.path.join(self.directory, f"chunk_{index:05d}.npy"), mmap_mode="r")
+
+    def __getitem__(self, key):
+        key = key if isinstance(key, tuple) else (key,)
+        if Ellipsis in key:
+            position = key.index(Ellipsis)
+            fill = (slice(None),) * (self.ndim - len(key) + 1)
+            key = key[:position] + fill + key[position + 1:]
+        key = key + (slice(None),) * (self.ndim - len(key))
+        leading, last = key[:-1], key[-1]
+        length = self.shape[-1]
+        if isinstance(last, (int, np.integer)):
+            last = int(last) + length if last < 0 else int(last)
+            if not 0 <= last < length:
+                raise IndexError("index out of range for the last axis")
+            chunk, offset = divmod(last, self.chunk_size)
+            return np.array(self.chunk(chunk)[leading + (offset,)])
+        wanted = np.arange(*last.indices(length))
+        if not len(wanted):
+            return np.empty(self.shape[:-1] + (0,), dtype=self.dtype)[leading + (slice(None),)]
+        chunks = wanted // self.chunk_size
+        parts = []
+        # wanted is monotonic, so it splits into one run per chunk touched.
+        for run in np.split(wanted, np.flatnonzero(np.diff(chunks)) + 1):
+            chunk = int(run[0] // self.chunk_size)
+            offsets = run - chunk * self.chunk_size
+            if last.step in (None, 1):
+                local = slice(int(offsets[0]), int(offsets[-1]) + 1)
+            else:
+                local = offsets
+            parts.append(np.array(self.chunk(chunk)[leading + (local,)]))
+        return np.concatenate(parts, axis=-1)
+
+    def __array__(self, dtype=None, copy=None):
+        array = self[...]
+        return array.astype(dtype) if dtype is not None else array
+
+
+class ResultStore:
+    """
+    A directory of chunked arrays plus a metadata header (environment, seed, isoform, engine version).
+    """
+
+    def __init__(self, path):
+        """
+        Open an existing store.
+        Args:
+            path (str): Store directory.
+        Raises:
+            ValueError: If the directory is not a result store or uses a newer format.
+        """
+        self.path = str(path)
+        meta_path = os.path.join(self.path, META_FILE)
+        if not os.path.exists(meta_path):
+            raise ValueError(f"{self.path} is not a result store (no {META_FILE})")
+        with open(meta_path) as handle:
+            self.meta = json.load(handle)
+        if self.meta.get("format", 0) > FORMAT_VERSION:
+            raise ValueError(f"Result store format {self.meta['format']} is newer than supported ({FORMAT_VERSION})")
+
+    @classmethod
+    def create(cls, path, environment=None, seed=None, isoform=None, chunk_size=CHUNK_SIZE, **extra):
+        """
+        Create an empty store.
+        Args:
+            path (str): Store directory (created; must not already hold a store).
+            environment (Environment, optional): Simulation environment, recorded by its attributes.
+            seed (int, optional): Seed of the run.
+            isoform (str, optional): Tau isoform.
+            chunk_size (int): Default chunk length along the last axis.
+            **extra: Further JSON-serializable metadata.
+        Returns:
+            ResultStore: The new store.
+        Raises:
+            ValueError: If a store already exists at path.
+        """
+        path = str(path)
+        if os.path.exists(os.path.join(path, META_FILE)):
+            raise ValueError(f"A result store already exists at {path}")
+        os.makedirs(path, exist_ok=True)
+        meta = {
+            "format": FORMAT_VERSION,
+            "engine_version": ENGINE_VERSION,
+            "environment": _plain(vars(environment)) if environment is not None else None,
+            "seed": seed,
+            "isoform": isoform,
+            "chunk_size": chunk_size,
+            "arrays": {},
+        }
+        meta.update(extra)
+        store = cls.__new__(cls)
+        store.path = path
+        store.meta = meta
+        store._write_meta()
+        return store
+
+    def _write_meta(self):
+        meta_path = os.path.join(self.path, META_FILE)
+        with open(meta_path + ".part", "w") as handle:
+            json.dump(self.meta, handle, indent=2)
+        os.replace(meta_path + ".part", meta_path)
+
+    def names(self):
+        """
+        Returns:
+            list: Names of the stored arrays.
+        """
+        return list(self.meta["arrays"])
+
+    def __contains__(self, name):
+        return name in self.meta["arrays"]
+
+    def append(self, name, block, chunk_size=None):
+        """
+        Append data along the last axis of an array (creating it on first use).
+        Only a trailing partial chunk is ever rewritten.
+        Args:
+            name (str): Array name (may contain '/' to group arrays).
+            block (np.ndarray): Data; all but the last axis must match earlier appends.
+            chunk_size (int, optional): Chunk length for a new array (default: the store's).
+        Raises:
+            ValueError: If the block does not match the stored shape or dtype.
+        """
+        block = np.asarray(block)
+        if block.ndim == 0:
+            block = block[None]
+        info = self.meta["arrays"].get(name)
+        directory = os.path.join(self.path, name)
+        if info is None:
+            info = {
+                "dtype": block.dtype.str,
+                "shape": list(block.shape[:-1]) + [0],
+                "chunk_size": chunk_size or self.meta["chunk_size"],
+            }
+            os.makedirs(directory, exist_ok=True)
+        elif list(block.shape[:-1]) != info["shape"][:-1] or block.dtype.str != info["dtype"]:
+            raise ValueError(f"Block {block.dtype}{block.shape} does not match stored {name!r} {info['dtype']}{info['shape']}")
+        size = info["chunk_size"]
+        length = info["shape"][-1]
+        chunk, filled = divmod(length, size)
+        written = 0
+        total = block.shape[-1]
+        while written < total:
+            take = min(size - filled, total - written)
+            piece = block[..., written:written + take]
+            chunk_path = os.path.join(directory, f"chunk_{chunk:05d}.npy")
+            if filled:
+                piece = np.concatenate((np.load(chunk_path), piece), axis=-1)
+            _atomic_save(chunk_path, np.ascontiguousarray(piece))
+            written += take
+            chunk += 1
+            filled = 0
+        info["shape"][-1] = length + total
+        self.meta["arrays"][name] = info
+        self._write_meta()
+
+    def write(self, name, array, chunk_size=None):
+        """
+        Store a whole array (replacing an existing one of the same name).
+        Args:
+            name (str): Array name.
+            array (np.ndarray): Data.
+            chunk_size (int, optional): Chunk length along the last axis.
+        """
+        if name in self.meta["arrays"]:
+            directory = os.path.join(self.path, name)
+            for file_name in os.listdir(directory):
+                if file_name.startswith("chunk_"):
+                    os.remove(os.path.join(directory, file_name))
+            del self.meta["arrays"][name]
+        self.append(name, array, chunk_size)
+
+    def read(self, name):
+        """
+        Args:
+            name (str): Array name.
+        Returns:
+            ChunkedArray: Lazy view of the array.
+        Raises:
+            KeyError: If there is no such array.
+        """
+        info = self.meta["arrays"][name]
+        return ChunkedArray(os.path.join(self.path, name), info["dtype"], info["shape"], info["chunk_size"])
+
+    def __getitem__(self, name):
+        return self.read(name)
+
+    def write_site_probabilities(self, site_probabilities, name="site_probabilities"):
+        """
+        Store the SiteProbabilities returned by TauProtein.update_state (matrix plus site order).
+        Args:
+            site_probabilities (SiteProbabilities): Sites x timepoints view.
+            name (str): Array name.
+        """
+        self.write(name, site_probabilities.matrix)
+        self.meta["arrays"][name]["sites"] = [site if isinstance(site, (int, str)) else str(site) for site in site_probabilities.sites]
+        self._write_meta()
+
+    def site_series(self, site, name="site_probabilities"):
+        """
+        Load one site's time series, touching only its row in every chunk.
+        Args:
+            site: Site identifier.
+            name (str): Array name.
+        Returns:
+            np.ndarray: Probability trajectory of the site.
+        """
+        row = self.meta["arrays"][name]["sites"].index(site)
+        return self.read(name)[row]
+
+    def write_table(self, table, prefix):
+        """
+        Store a columnar table (dict of equal-length 1-D arrays, e.g. a sweep result) as one array per column.
+        Args:
+            table (dict): Column name -> array.
+            prefix (str): Name prefix of the column arrays.
+        """
+        for column, values in table.items():
+            self.write(f"{prefix}/{column}", values)
+
+    def read_table(self, prefix):
+        """
+        Args:
+            prefix (str): Name prefix used by write_table.
+        Returns:
+            dict: Column name -> lazy ChunkedArray.
+        """
+        return {name[len(prefix) + 1:]: self.read(name) for name in self.names() if name.startswith(prefix + "/")}
+
+    def write_history(self, history, prefix="history"):
+        """
+        Store history columns (HistoryRecorder or list of dicts) as one array per column.
+        Args:
+            history (HistoryRecorder or list): History.
+            prefix (str): Name prefix of the column arrays.
+        """
+        self.write_table(as_columns(history), prefix)
+
+    def read_history(self, prefix="history"):
+        """
+        Args:
+            prefix (str): Name prefix used by write_history.
+        Returns:
+            HistoryRecorder: History rebuilt from the stored columns.
+        """
+        history = HistoryRecorder()
+        history.extend(**{column: values[...] for column, values in self.read_table(prefix).items()})
+        return history
+
+
+def save_update_state(path, tau, site_probabilities, environment, seed=None, chunk_size=CHUNK_SIZE):
+    """
+    Store the results of TauProtein.update_state: site probabilities and history.
+    Args:
+        path (str): New store directory.
+        tau (TauProtein): Simulated tau (for isoform and history).
+        site_probabilities (SiteProbabilities): Return value of update_state.
+        environment (Environment): Simulation environment.
+        seed (int, optional): Seed of the run.
+        chunk_size (int): Chunk length along the time axis.
+    Returns:
+        ResultStore: The written store.
+    """
+    store = ResultStore.create(path, environment=environment, seed=seed, isoform=tau.isoform, chunk_size=chunk_size)
+    store.write_site_probabilities(site_probabilities)
+    store.write_history(tau.history)
+    return store
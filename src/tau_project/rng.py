@@ -0,0 +1,92 @@
+"""
+rng.py
+Random-number helpers: buffered scalar draws from a numpy Generator and independent seeded child streams.
+"""
+import random
+import numpy as np
+
+BUFFER_SIZE = 4096
+
+
+class RandomBuffer:
+    """
+    Scalar draws served from blocks of bulk Generator draws.
+    Exposes random() and uniform() like the random module, so either can be used as a draw source.
+    """
+
+    def __init__(self, rng, size=BUFFER_SIZE):
+        """
+        Initialize a RandomBuffer.
+        Args:
+            rng (np.random.Generator): Generator to draw blocks from.
+            size (int): Draws per block.
+        """
+        self.rng = rng
+        self.size = size
+        self._block = []
+        self._position = 0
+
+    def random(self):
+        """
+        Returns:
+            float: Next uniform draw in [0, 1).
+        """
+        if self._position == len(self._block):
+            self._block = self.rng.random(self.size).tolist()
+            self._position = 0
+        value = self._block[self._position]
+        self._position += 1
+        return value
+
+    def uniform(self, low, high):
+        """
+        Args:
+            low (float): Lower bound.
+            high (float): Upper bound.
+        Returns:
+            float: Uniform draw in [low, high).
+        """
+        return low + (high - low) * self.random()
+
+
+def draw_source(rng=None, size=BUFFER_SIZE):
+    """
+    Scalar draw source for a stochastic path.
+    Args:
+        rng (np.random.Generator or RandomBuffer, optional): Generator; None keeps the global random module.
+        size (int): Block size of a new RandomBuffer.
+    Returns:
+        RandomBuffer or module: Object with random() and uniform().
+    """
+    if rng is None:
+        return random
+    if isinstance(rng, RandomBuffer):
+        return rng
+    return RandomBuffer(rng, size)
+
+
+def generator_source(rng=None):
+    """
+    Bulk draw source (binomial, choice) for a stochastic path.
+    Args:
+        rng (np.random.Generator, optional): Generator; None derives a fresh one from the global random module,
+            so random.seed() alone reproduces the path, as it does for the scalar draws of draw_source().
+    Returns:
+        np.random.Generator: Generator to draw from.
+    """
+    if rng is not None:
+        return rng
+    return np.random.Generator(np.random.PCG64(random.getrandbits(64)))
+
+
+def spawn_generators(seed, n):
+    """
+    Independent Generators for n replicates, spawned from one SeedSequence.
+    Args:
+        seed (int or np.random.SeedSequence, optional): Root seed.
+        n (int): Number of streams.
+    Returns:
+        list: n Generators.
+    """
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    return [np.random.default_rng(child) for child in root.spawn(n)]
@@ -0,0 +1,365 @@
+"""
+service.py
+Local asyncio HTTP/JSON simulation service.
+Requests are queued and executed on a process pool without blocking the event loop. Identical requests that
+are queued or running share one job, seeded requests already answered are served from the result cache, and a
+full queue is answered with 503 (backpressure). Only the standard library is used and the service binds to
+localhost by default.
+
+Endpoints:
+    POST /simulate   body: a job spec as in simulation/batch.py (model 'tau' is a run_and_plot_simulation-style
+                     run, 'phospho' a run_and_plot_disease_simulation-style run, 'ssa' its event-driven form)
+                     plus optional "store": true (write a result store and return its path) and
+                     "wait": false (answer 202 with the job id instead of waiting for the result).
+    GET  /jobs/<id>  status and, once finished, the result of a job.
+    GET  /health     queue length, running jobs and capacity.
+"""
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import signal
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import ResultCache, fingerprint
+from .simulation.batch import execute_job, normalize_jobs, run_replicate
+from .rng import spawn_generators
+
+HOST = "127.0.0.1"
+PORT = 8765
+QUEUE_SIZE = 64
+KEEP_FINISHED = 1024
+MAX_BODY = 1 << 20
+REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class ServiceBusy(Exception):
+    """
+    Raised when a request arrives while the job queue is full.
+    """
+
+
+def _ignore_interrupt():
+    # Ctrl+C reaches the whole process group; the service shuts the workers down itself.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def job_fingerprint(job):
+    """
+    Args:
+        job (dict): Normalized job spec.
+    Returns:
+        str: Cache key of the job's inline result.
+    """
+    return fingerprint(job["model"], job["environment"], job["isoform"], job["horizon"], job["seed"], job["PTMs"],
+                       sequence=job["sequence"], mode=job["mode"], replicates=int(job["replicates"]))
+
+
+def run_request(job, store_dir=None):
+    """
+    Execute one normalized job (in a worker process).
+    Args:
+        job (dict): Normalized job spec.
+        store_dir (str, optional): If given, write a result store there and return its path instead of the data.
+    Returns:
+        dict: Summary and trajectories, or summary and result-store path.
+    """
+    if store_dir is not None:
+        summary = execute_job(job, store_dir)
+        summary.pop("job")
+        return {"summary": summary, "store": os.path.abspath(os.path.join(store_dir, job["name"]))}
+    trajectories = []
+    states = []
+    for rng in spawn_generators(job["seed"], job["replicates"]):
+        result = run_replicate(job, rng)
+        trajectories.append([float(value) for value in result["trajectory"]])
+        if "aggregation_state" in result:
+            states.append(result["aggregation_state"])
+    finals = [trajectory[-1] for trajectory in trajectories]
+    summary = {"model": job["model"], "replicates": job["replicates"], "final_mean": sum(finals) / len(finals)}
+    if states:
+        summary["aggregation_states"] = states
+    return {"summary": summary, "trajectories": trajectories}
+
+
+class Job:
+    """
+    A queued, running or finished service request.
+    """
+
+    def __init__(self, job_id, key, spec, store, future):
+        self.id = job_id
+        self.key = key
+        self.spec = spec
+        self.store = store
+        self.future = future
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.cache_key = None
+
+    def describe(self):
+        """
+        Returns:
+            dict: JSON-serializable job status (with the result or error once finished).
+        """
+        payload = {"job": self.id, "status": self.status}
+        if self.result is not None:
+            payload["result"] = self.result
+        if self.error is not None:
+            payload["error"] = self.error
+        return payload
+
+
+class SimulationService:
+    """
+    Job queue, dispatcher tasks and HTTP front end of the simulation service.
+    """
+
+    def __init__(self, processes=2, queue_size=QUEUE_SIZE, store_dir="service_results", executor=None, cache=None):
+        """
+        Initialize a SimulationService.
+        Args:
+            processes (int): Worker processes (and dispatcher tasks).
+            queue_size (int): Maximum number of queued jobs; further requests get 503.
+            store_dir (str): Directory for result stores of requests with "store": true.
+            executor (concurrent.futures.Executor, optional): Executor to use instead of a new process pool.
+            cache (ResultCache, optional): Cache of inline results; an in-memory one is used if omitted.
+        """
+        self.processes = processes
+        self.store_dir = store_dir
+        self.executor = executor
+        self.cache = cache if cache is not None else ResultCache()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.jobs = OrderedDict()
+        self.in_flight = {}
+        self.running = 0
+        self.executed = 0
+        self._ids = itertools.count(1)
+        self._dispatchers = []
+        self._server = None
+        self._own_executor = executor is None
+
+    def prepare(self, payload):
+        """
+        Validate a request body and derive its coalescing key.
+        Args:
+            payload (dict): Request body.
+        Returns:
+            tuple: (normalized job spec, store flag, key)
+        Raises:
+            ValueError: If the request is invalid.
+        """
+        if not isinstance(payload, dict):
+            raise ValueError("Request body must be a JSON object")
+        spec = {key: value for key, value in payload.items() if key not in ("store", "wait")}
+        spec.setdefault("name", "request")
+        [job] = normalize_jobs([spec])
+        store = bool(payload.get("store", False))
+        key = json.dumps({"job": {k: v for k, v in job.items() if k != "name"}, "store": store}, sort_keys=True)
+        return job, store, key
+
+    def submit(self, payload):
+        """
+        Queue a request, join the identical request already queued or running, or answer it from the cache.
+        Args:
+            payload (dict): Request body.
+        Returns:
+            Job: The job serving the request.
+        Raises:
+            ValueError: If the request is invalid.
+            ServiceBusy: If the queue is full.
+        """
+        spec, store, key = self.prepare(payload)
+        job = self.in_flight.get(key)
+        if job is not None:
+            return job
+        cache_key = job_fingerprint(spec) if not store and spec["seed"] is not None else None
+        cached = self.cache.get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            job = Job(f"{next(self._ids):06d}", key, spec, store, asyncio.get_running_loop().create_future())
+            job.status, job.result = "done", cached
+            job.future.set_result(job)
+            self._remember(job)
+            return job
+        if self.queue.full():
+            raise ServiceBusy(f"Queue is full ({self.queue.maxsize} jobs)")
+        job_id = f"{next(self._ids):06d}"
+        # Stores are named by request content, so a new service never overwrites a different request's store.
+        spec["name"] = "request-" + hashlib.sha1(key.encode()).hexdigest()[:16]
+        job = Job(job_id, key, spec, store, asyncio.get_running_loop().create_future())
+        job.cache_key = cache_key
+        self.queue.put_nowait(job)
+        self.in_flight[key] = job
+        self._remember(job)
+        return job
+
+    def _remember(self, job):
+        self.jobs[job.id] = job
+        while len(self.jobs) > KEEP_FINISHED and next(iter(self.jobs.values())).status in ("done", "failed"):
+            self.jobs.popitem(last=False)
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            job.status = "running"
+            self.running += 1
+            try:
+                store_dir = self.store_dir if job.store else None
+                job.result = await loop.run_in_executor(self.executor, run_request, job.spec, store_dir)
+                job.status = "done"
+                if job.cache_key is not None:
+                    self.cache.put(job.cache_key, job.result)
+            except Exception as error:
+                job.error = f"{type(error).__name__}: {error}"
+                job.status = "failed"
+            finally:
+                self.running -= 1
+                self.executed += 1
+                self.in_flight.pop(job.key, None)
+                job.future.set_result(job)
+                self.queue.task_done()
+
+    async def start(self, host=HOST, port=PORT):
+        """
+        Start the worker pool, the dispatchers and the HTTP server.
+        Args:
+            host (str): Interface to bind (localhost by default).
+            port (int): Port; 0 picks a free one.
+        Returns:
+            int: The bound port.
+        """
+        if self.executor is None:
+            # Forked workers would inherit open client sockets and keep those connections from closing.
+            self.executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context("spawn"),
+                                                initializer=_ignore_interrupt)
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.processes)]
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """
+        Stop accepting connections, cancel the dispatchers and shut the worker pool down.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        if self._own_executor and self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def health(self):
+        """
+        Returns:
+            dict: Queue length, running jobs, executed jobs, capacity and cache hits.
+        """
+        return {"queued": self.queue.qsize(), "running": self.running, "executed": self.executed, "capacity": self.queue.maxsize,
+                "cache_hits": self.cache.hits}
+
+    async def route(self, method, path, body):
+        """
+        Answer one request.
+        Args:
+            method (str): HTTP method.
+            path (str): Request path.
+            body (bytes): Request body.
+        Returns:
+            tuple: (status code, JSON-serializable payload)
+        """
+        if path == "/health":
+            return 200, self.health()
+        if path.startswith("/jobs/"):
+            job = self.jobs.get(path[len("/jobs/"):])
+            return (200, job.describe()) if job is not None else (404, {"error": "Unknown job"})
+        if path != "/simulate":
+            return 404, {"error": f"Unknown path {path}"}
+        if method != "POST":
+            return 405, {"error": "Use POST"}
+        try:
+            payload = json.loads(body or b"{}")
+            job = self.submit(payload)
+        except ServiceBusy as error:
+            return 503, {"error": str(error)}
+        except ValueError as error:
+            return 400, {"error": str(error)}
+        if payload.get("wait", True) is False:
+            return 202, job.describe()
+        await asyncio.shield(job.future)
+        return (200 if job.status == "done" else 500), job.describe()
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            try:
+                length = int(headers.get("content-length", 0))
+            except ValueError:
+                length = -1
+            if len(request_line) < 2:
+                status, payload = 400, {"error": "Malformed request"}
+            elif length < 0:
+                status, payload = 400, {"error": "Invalid Content-Length"}
+            elif length > MAX_BODY:
+                status, payload = 413, {"error": "Request body too large"}
+            else:
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await self.route(request_line[0].upper(), request_line[1].split("?")[0], body)
+            data = json.dumps(payload).encode()
+            head = f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\nContent-Type: application/json\r\nContent-Length: {len(data)}\r\nConnection: close\r\n"
+            if status == 503:
+                head += "Retry-After: 1\r\n"
+            writer.write(head.encode() + b"\r\n" + data)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host=HOST, port=PORT, processes=2, queue_size=QUEUE_SIZE, store_dir="service_results", cache_dir=None):
+    """
+    Run the service until cancelled.
+    """
+    service = SimulationService(processes, queue_size, store_dir, cache=ResultCache(cache_dir))
+    bound = await service.start(host, port)
+    print(f"Simulation service listening on http://{host}:{bound}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.stop()
+
+
+def main(argv=None):
+    """
+    Command-line entry point: python -m src.tau_project.service --port 8765
+    """
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON simulation service.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    parser.add_argument("--store-dir", default="service_results")
+    parser.add_argument("--cache-dir", default=None, help="Keep the result cache on disk in this directory")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.processes, args.queue_size, args.store_dir, args.cache_dir))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""
+batch.py
+Non-interactive batch runner: reads a job file of simulation specs and runs them across a worker pool with a
+bounded number of jobs in flight. Each job's outputs are written to its own result store as soon as it
+finishes; failed jobs are retried and then skipped, and all failures are collected in an error report.
+Rerunning a batch with the same output directory skips jobs that already finished.
+
+Job file: JSON (a list of specs, or {"defaults": {...}, "jobs": [...]}) or JSON Lines (one spec per line).
+Spec fields:
+    name         unique job name (default: job-<index>)
+    model        'tau' (TauProtein.update_state), 'phospho' (phospo_over_time) or 'ssa' (phospo_over_time_ssa)
+    environment  Environment keyword arguments (tau model)
+    isoform      tau isoform: '0N3R' ... '2N4R', or '3R'/'4R' for 2N3R/2N4R (default '4R')
+    horizon      timepoints / time steps (default 100)
+    sequence     protein sequence for the phospho and ssa models (default: the sequence of the isoform)
+    PTMs         [[position, modification], ...] presets (phospho and ssa models)
+    mode         'exact' or 'tau_leap' (ssa model)
+    replicates   number of independent replicates (default 1)
+    seed         root seed of the replicate streams (default 0)
+    outputs      any of 'trajectory', 'site_probabilities', 'history', 'plot' (default ['trajectory'])
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+from ..environment import Environment
+from ..models.isoforms import isoform
+from ..rng import spawn_generators
+
+MODELS = ("tau", "phospho", "ssa")
+OUTPUTS = ("trajectory", "site_probabilities", "history", "plot")
+SPEC_DEFAULTS = {
+    "model": "tau",
+    "environment": {},
+    "isoform": "4R",
+    "horizon": 100,
+    "sequence": None,
+    "PTMs": [],
+    "mode": "exact",
+    "replicates": 1,
+    "seed": 0,
+    "outputs": ["trajectory"],
+}
+# Accepted JSON types of every spec field; no field takes a boolean.
+SPEC_TYPES = {
+    "name": str,
+    "model": str,
+    "environment": dict,
+    "isoform": str,
+    "horizon": int,
+    "sequence": (str, type(None)),
+    "PTMs": list,
+    "mode": str,
+    "replicates": int,
+    "seed": (int, type(None)),
+    "outputs": list,
+}
+SUMMARY_FILE = "summary.json"
+LOG_FILE = "jobs.jsonl"
+ERROR_FILE = "errors.json"
+
+
+def load_jobs(path):
+    """
+    Read and validate a job file.
+    Args:
+        path (str): JSON or JSON Lines job file.
+    Returns:
+        list: Normalized job specs.
+    Raises:
+        ValueError: If the file or a spec is invalid.
+    """
+    with open(path) as handle:
+        text = handle.read()
+    if str(path).endswith(".jsonl"):
+        content = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        content = json.loads(text)
+    defaults = {}
+    if isinstance(content, dict):
+        defaults = content.get("defaults", {})
+        content = content.get("jobs")
+    if not isinstance(content, list):
+        raise ValueError(f"{path}: expected a list of jobs or an object with a 'jobs' list")
+    return normalize_jobs(content, defaults)
+
+
+def _check_types(job):
+    """
+    Check the JSON types of a spec's fields, including the PTM pairs and output names.
+    Raises:
+        ValueError: If a field has the wrong type.
+    """
+    for field, expected in SPEC_TYPES.items():
+        value = job[field]
+        if not isinstance(value, expected) or isinstance(value, bool):
+            raise ValueError(f"Job {job['name']}: field {field!r} has the wrong type ({type(value).__name__})")
+    for ptm in job["PTMs"]:
+        if (
+            not isinstance(ptm, (list, tuple))
+            or len(ptm) != 2
+            or not isinstance(ptm[0], int)
+            or isinstance(ptm[0], bool)
+            or not isinstance(ptm[1], str)
+        ):
+            raise ValueError(f"Job {job['name']}: PTMs must be [position, modification] pairs, got {ptm!r}")
+    if not all(isinstance(output, str) for output in job["outputs"]):
+        raise ValueError(f"Job {job['name']}: outputs must be names")
+
+
+def normalize_jobs(specs, defaults=None):
+    """
+    Fill in defaults and validate a list of job specs.
+    Args:
+        specs (list): Job spec dicts.
+        defaults (dict, optional): Values applied to every spec before its own fields.
+    Returns:
+        list: Normalized job specs.
+    Raises:
+        ValueError: If a spec has unknown fields, wrongly typed or invalid values, or job names repeat.
+    """
+    jobs = []
+    for index, spec in enumerate(specs):
+        if not isinstance(spec, dict):
+            raise ValueError(f"Job {index}: a spec must be an object, got {type(spec).__name__}")
+        job = dict(SPEC_DEFAULTS, name=f"job-{index}")
+        job.update(defaults or {})
+        job.update(spec)
+        unknown = set(job) - set(SPEC_DEFAULTS) - {"name"}
+        if unknown:
+            raise ValueError(f"Job {job['name']}: unknown fields {sorted(unknown)}")
+        _check_types(job)
+        if job["model"] not in MODELS:
+            raise ValueError(f"Job {job['name']}: unknown model {job['model']!r} (expected one of {MODELS})")
+        bad_outputs = set(job["outputs"]) - set(OUTPUTS)
+        if bad_outputs:
+            raise ValueError(f"Job {job['name']}: unknown outputs {sorted(bad_outputs)}")
+        if job["model"] != "tau" and set(job["outputs"]) & {"site_probabilities", "history", "plot"}:
+            raise ValueError(f"Job {job['name']}: site_probabilities, history and plot outputs need the tau model")
+        if job["replicates"] < 1 or job["horizon"] < 1:
+            raise ValueError(f"Job {job['name']}: replicates and horizon must be positive")
+        try:
+            Environment(**job["environment"])
+        except TypeError as error:
+            raise ValueError(f"Job {job['name']}: invalid environment: {error}") from error
+        try:
+            isoform(job["isoform"])
+        except ValueError as error:
+            raise ValueError(f"Job {job['name']}: {error}") from error
+        job["PTMs"] = [list(ptm) for ptm in job["PTMs"]]
+        jobs.append(job)
+    names = [job["name"] for job in jobs]
+    if len(set(names)) != len(names):
+        raise ValueError("Job names must be unique")
+    return jobs
+
+
+def run_replicate(job, rng):
+    """
+    Run one replicate of a job.
+    Args:
+        job (dict): Normalized job spec.
+        rng (np.random.Generator): Replicate stream.
+    Returns:
+        dict: Output name -> array or object for this replicate.
+    """
+    if job["model"] == "tau":
+        from ..models.tau_protein import TauProtein
+
+        tau = TauProtein(isoform=job["isoform"], rng=rng)
+        site_probabilities = tau.update_state(Environment(**job["environment"]), np.arange(job["horizon"]))
+        return {
+            "trajectory": tau.history.column("avg_prob"),
+            "site_probabilities": site_probabilities,
+            "history": tau.history,
+            "aggregation_state": tau.aggregation_state,
+        }
+    from ..models.protein import Protein
+
+    protein = Protein("Tau", job["sequence"] or isoform(job["isoform"]).sequence_string())
+    if job["model"] == "phospho":
+        from ..phospho_utils import phospo_over_time
+
+        trajectory = phospo_over_time(protein, job["horizon"], job["PTMs"] or None, rng=rng)
+    else:
+        from ..phospho_ssa import phospo_over_time_ssa
+
+        trajectory = phospo_over_time_ssa(protein, job["horizon"], job["PTMs"] or None, job["mode"], rng)
+    return {"trajectory": trajectory}
+
+
+def execute_job(job, out_dir):
+    """
+    Run all replicates of a job and write its result store; the summary file is written last and marks the
+    job as finished.
+    Args:
+        job (dict): Normalized job spec.
+        out_dir (str): Batch output directory.
+    Returns:
+        dict: Job summary.
+    """
+    from ..result_store import ResultStore
+
+    job_dir = os.path.join(out_dir, job["name"])
+    if os.path.exists(job_dir):
+        shutil.rmtree(job_dir)  # Leftovers of an interrupted or failed attempt.
+    start = time.perf_counter()
+    environment = Environment(**job["environment"])
+    store = ResultStore.create(job_dir, environment=environment, seed=job["seed"], isoform=job["isoform"], job=job)
+    trajectories = []
+    states = []
+    for replicate, rng in enumerate(spawn_generators(job["seed"], job["replicates"])):
+        result = run_replicate(job, rng)
+        trajectories.append(result["trajectory"])
+        prefix = f"replicate_{replicate:03d}"
+        if "site_probabilities" in job["outputs"]:
+            store.write_site_probabilities(result["site_probabilities"], name=f"{prefix}/site_probabilities")
+        if "history" in job["outputs"]:
+            store.write_history(result["history"], prefix=f"{prefix}/history")
+        if "plot" in job["outputs"]:
+            from ..plot_utils import plot_tau_summary
+
+            plot_tau_summary(result["history"], path=os.path.join(job_dir, f"{prefix}_summary.png"))
+        if "aggregation_state" in result:
+            states.append(result["aggregation_state"])
+    trajectories = np.array(trajectories)
+    if "trajectory" in job["outputs"]:
+        store.write("trajectory", trajectories)
+    final = trajectories[:, -1]
+    summary = {
+        "name": job["name"],
+        "model": job["model"],
+        "replicates": job["replicates"],
+        "final_mean": float(final.mean()),
+        "final_std": float(final.std()),
+        "seconds": time.perf_counter() - start,
+        "job": job,
+    }
+    if states:
+        summary["aggregation_states"] = states
+    _write_json(os.path.join(job_dir, SUMMARY_FILE), summary)
+    return summary
+
+
+def _write_json(path, data):
+    with open(path + ".part", "w") as handle:
+        json.dump(data, handle, indent=2)
+    os.replace(path + ".part", path)
+
+
+def finished_summary(job, out_dir):
+    """
+    Returns:
+        dict or None: Summary of an earlier run of exactly this job, if it finished.
+    """
+    path = os.path.join(out_dir, job["name"], SUMMARY_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as handle:
+        summary = json.load(handle)
+    return summary if summary.get("job") == job else None
+
+
+def run_batch(jobs, out_dir, processes=1, max_in_flight=None, retries=1, progress=None):
+    """
+    Run jobs across a worker pool, streaming each job's outputs to out_dir as it finishes.
+    Args:
+        jobs (list): Normalized job specs (see load_jobs).
+        out_dir (str): Output directory; one result store per job plus jobs.jsonl and errors.json.
+        processes (int): Worker processes; 1 runs the jobs in this process.
+        max_in_flight (int, optional): Jobs submitted but not finished at any time (default 2 x processes).
+        retries (int): Extra attempts for a failing job before it is skipped.
+        progress (callable, optional): Called with each finished job's log record.
+    Returns:
+        dict: {"completed": [names], "skipped": [names already finished], "failed": {name: error}}
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    report = {"completed": [], "skipped": [], "failed": {}}
+    queue = []
+    for job in jobs:
+        if finished_summary(job, out_dir) is not None:
+            report["skipped"].append(job["name"])
+        else:
+            queue.append(job)
+    queue.reverse()  # pop() then takes jobs in file order.
+    attempts = {}
+    log_path = os.path.join(out_dir, LOG_FILE)
+
+    def record(job, summary=None, error=None):
+        attempts[job["name"]] = attempts.get(job["name"], 0) + 1
+        if error is not None and attempts[job["name"]] <= retries:
+            queue.append(job)
+            return
+        entry = {"name": job["name"], "status": "failed" if error else "completed", "attempts": attempts[job["name"]]}
+        if error is None:
+            report["completed"].append(job["name"])
+            entry["seconds"] = summary["seconds"]
+        else:
+            report["failed"][job["name"]] = error
+            entry["error"] = error.strip().splitlines()[-1]
+        with open(log_path, "a") as handle:
+            handle.write(json.dumps(entry) + "\n")
+        if progress is not None:
+            progress(entry)
+
+    if processes <= 1:
+        while queue:
+            job = queue.pop()
+            try:
+                summary = execute_job(job, out_dir)
+            except Exception:
+                record(job, error=traceback.format_exc())
+            else:
+                record(job, summary)
+    else:
+        limit = max_in_flight or 2 * processes
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            running = {}
+            while queue or running:
+                while queue and len(running) < limit:
+                    job = queue.pop()
+                    running[pool.submit(execute_job, job, out_dir)] = job
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = running.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        record(job, future.result())
+                    else:
+                        record(job, error="".join(traceback.format_exception(type(error), error, error.__traceback__)))
+    _write_json(os.path.join(out_dir, ERROR_FILE), report["failed"])
+    return report
+
+
+def main(argv=None):
+    """
+    Command-line entry point: python -m src.tau_project.simulation.batch jobs.json --out batch_results
+    """
+    parser = argparse.ArgumentParser(description="Run a file of simulation jobs across a worker pool.")
+    parser.add_argument("jobs", help="Job file (.json or .jsonl)")
+    parser.add_argument("--out", default="batch_results", help="Output directory")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-in-flight", type=int, default=None, help="Bound on queued plus running jobs")
+    parser.add_argument("--retries", type=int, default=1, help="Extra attempts for failing jobs")
+    args = parser.parse_args(argv)
+    jobs = load_jobs(args.jobs)
+
+    def report_progress(entry):
+        print(f"[batch] {entry['name']}: {entry['status']}" + (f" ({entry['error']})" if "error" in entry else ""), file=sys.stderr, flush=True)
+
+    report = run_batch(jobs, args.out, args.processes, args.max_in_flight, args.retries, report_progress)
+    print(f"{len(report['completed'])} completed, {len(report['skipped'])} already done, {len(report['failed'])} failed; results in {args.out}")
+    if report["failed"]:
+        print(f"Errors written to {os.path.join(args.out, ERROR_FILE)}")
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
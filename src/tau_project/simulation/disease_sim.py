@@ -1,13 +1,12 @@
 from ..models.aa import AminoAcid
 from ..models.protein import Protein
+from ..models.isoforms import CANONICAL_SEQUENCE
 from ..phospho_utils import phosphorylation_constants, phosphorylation, phospo_over_time
-from ..plot_utils import plot_tau_summary, plot_site_probabilities, plot_phosphorylation_heatmap  # Shared utilities available
 import numpy as np
-import matplotlib.pyplot as plt
 
 
 def run_and_plot_disease_simulation():
-    tau_seq = "MAEPRQEFEVMEDHAGTYGLGDRKDQGGYTMHQDQEGDTDAGLKESPLQTPTEDGSEEPGSETSDAKSTPTAEDVTAPLVDEGAPGKQAAAQPHTEIPEGTTAEEAGIGDTPSLEDEAAGHVTQARMVSKSKDGTGSDDKKAKGADGKTKIATPRGAAPPGQKGQANATRIPAKTPPAPKTPPSSGEPPKSGDRSGYSSPGSPGTPGSRSRTPSLPTPPTREPKKVAVVRTPPKSPSSAKSRLQTAPVPMPDLKNVKSKIGSTENLKHQPGGGKVQIINKKLDLSNVQSKCGSKDNIKHVPGGGSVQIVYKPVDLSKVTSKCGSLGNIHHKPGGGQVEVKSEKLDFKDRVQSKIGSLDNITHVPGGGNKKIETHKLTFRENAKAKTDHGAEIVYKSPVVSGDTSPRHLSNVSSTGSIDMVDSPQLATLADEVSASLAKQGL"
+    tau_seq = CANONICAL_SEQUENCE
     tau_prot = Protein("Tau", tau_seq)
     acetyl_sites = [
         (163, "Acetyl"),
@@ -18,6 +17,9 @@ def run_and_plot_disease_simulation():
     # phospho_data=phospo_over_time(tau_prot,180, acetyl_sites)
     phospho_data = phospo_over_time(tau_prot, 180)
 
+    # Imported here so that importing this module does not load matplotlib.
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(10, 6))
     plt.plot(phospho_data, label="Phosphorylation %", color="mediumblue", linewidth=2)
     plt.title("Tau Phosphorylation Simulation Over Time")
@@ -30,4 +32,5 @@ def run_and_plot_disease_simulation():
     print("Close the plot window to return to the menu.")
     plt.show()
 
-# Shared plot utilities (plot_tau_summary, plot_site_probabilities, plot_phosphorylation_heatmap) are available for future use.
+# Shared plot utilities (plot_tau_summary, plot_site_probabilities, plot_phosphorylation_heatmap) are available
+# for future use from ..plot_utils.
@@ -0,0 +1,69 @@
+"""
+replicates.py
+Independent, reproducible replicates of the stochastic simulations.
+Each replicate receives its own numpy Generator spawned from one SeedSequence, so replicates are statistically
+independent, the same seed always gives the same results, and the results do not depend on the number of
+worker processes or the order in which workers finish.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from ..models.protein import Protein
+from ..models.tau_protein import TauProtein
+from ..phospho_utils import phospo_over_time
+from ..rng import spawn_generators
+
+
+def run_replicates(task, n_replicates, seed=None, processes=1, args=(), kwargs=None):
+    """
+    Run task(rng, *args, **kwargs) once per replicate, each with an independent child Generator.
+    Args:
+        task (callable): Picklable (module-level) function taking the Generator as its first argument.
+        n_replicates (int): Number of replicates.
+        seed (int or np.random.SeedSequence, optional): Root seed; None draws fresh entropy.
+        processes (int): Worker processes; 1 runs in this process.
+        args (tuple): Further positional arguments of task.
+        kwargs (dict, optional): Keyword arguments of task.
+    Returns:
+        list: Result of every replicate, in replicate order.
+    Raises:
+        ValueError: If n_replicates is negative.
+    """
+    if n_replicates < 0:
+        raise ValueError(f"Number of replicates must be non-negative, got {n_replicates}")
+    kwargs = kwargs or {}
+    generators = spawn_generators(seed, n_replicates)
+    if processes <= 1 or n_replicates <= 1:
+        return [task(rng, *args, **kwargs) for rng in generators]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(task, rng, *args, **kwargs) for rng in generators]
+        return [future.result() for future in futures]
+
+
+def phospho_replicate(rng, sequence, time, list_of_PTMs=None):
+    """
+    One phospo_over_time replicate on a fresh protein.
+    Args:
+        rng (np.random.Generator): Replicate stream.
+        sequence (str): Amino acid sequence.
+        time (int): Number of steps.
+        list_of_PTMs (list, optional): (position, modification) presets.
+    Returns:
+        np.ndarray: Phosphorylated-residue percentage per step.
+    """
+    return phospo_over_time(Protein("Tau", sequence), time, list_of_PTMs, rng=rng)
+
+
+def tau_replicate(rng, environment, n_timepoints, isoform="4R"):
+    """
+    One TauProtein.update_state replicate from randomly drawn initial site probabilities.
+    Args:
+        rng (np.random.Generator): Replicate stream.
+        environment (Environment): Simulation environment.
+        n_timepoints (int): Number of timepoints.
+        isoform (str): Tau isoform.
+    Returns:
+        np.ndarray: Sites x timepoints probability matrix.
+    """
+    tau = TauProtein(isoform=isoform, rng=rng)
+    return tau.update_state(environment, np.arange(n_timepoints)).matrix
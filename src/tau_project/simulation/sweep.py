@@ -0,0 +1,357 @@
+"""
+sweep.py
+Parameter sweeps of the tau simulation over Environment grids.
+Grid points are processed in chunks, either as one batched NumPy computation per chunk or point by point
+through TauProtein.update_state, optionally fanned out over a process pool. Finished chunks are written
+to the output directory so an interrupted sweep resumes where it stopped.
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from ..environment import Environment
+from ..history import AGGREGATION_STATES
+from ..models.tau_protein import SITE_IDS, TauProtein
+from ..site_engine import advance
+from ..plot_utils import plot_phosphorylation_heatmap, plot_tau_summary, render_batch
+
+PARAMETERS = ("temperature", "kinase_level", "phosphatase_level", "protease_level", "oxidative_stress")
+METRICS = ("final_avg_prob", "mean_avg_prob", "final_phospho_count", "max_phospho_count", "aggregation_state")
+DEFAULTS = {
+    "temperature": 39,
+    "kinase_level": 1.5,
+    "phosphatase_level": 1.0,
+    "protease_level": 1.0,
+    "oxidative_stress": 0.2,
+}
+
+
+def parse_range(text):
+    """
+    Parse a CLI parameter range.
+    Args:
+        text (str): 'start:stop:num' (inclusive linspace), 'a,b,c' (explicit values) or a single value.
+    Returns:
+        np.ndarray: Parameter values.
+    """
+    if ":" in text:
+        start, stop, num = text.split(":")
+        return np.linspace(float(start), float(stop), int(num))
+    return np.array([float(value) for value in text.split(",")])
+
+
+def parameter_grid(**ranges):
+    """
+    Build the full Cartesian grid of environment parameters.
+    Args:
+        **ranges: Parameter name -> iterable of values (or a scalar); missing parameters use DEFAULTS.
+    Returns:
+        dict: Parameter name -> flat array of values, one entry per grid point.
+    Raises:
+        ValueError: If an unknown parameter is given.
+    """
+    unknown = set(ranges) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+    axes = [np.atleast_1d(np.asarray(ranges.get(name, DEFAULTS[name]), dtype=float)) for name in PARAMETERS]
+    mesh = np.meshgrid(*axes, indexing="ij")
+    return {name: values.ravel() for name, values in zip(PARAMETERS, mesh)}
+
+
+def point_environment(grid, index):
+    """
+    Args:
+        grid (dict): Grid from parameter_grid.
+        index (int): Grid point.
+    Returns:
+        Environment: Environment of that point.
+    """
+    return Environment(**{name: float(grid[name][index]) for name in PARAMETERS})
+
+
+def initial_probabilities(seed, index, n_sites):
+    """
+    Initial site probabilities of one grid point, reproducible from (seed, index) alone.
+    """
+    return np.random.default_rng([seed, index]).random(n_sites)
+
+
+def simulate_point(environment, horizon, initial, isoform="4R"):
+    """
+    Run one grid point through TauProtein.update_state and summarize it.
+    Args:
+        environment (Environment): Environment of the point.
+        horizon (int): Number of timepoints.
+        initial (np.ndarray): Initial site probabilities.
+        isoform (str): Tau isoform.
+    Returns:
+        dict: Metric name -> value.
+    """
+    tau = TauProtein(isoform=isoform, initial_probabilities=initial)
+    tau.update_state(environment, np.arange(horizon))
+    avg_probs = tau.history.column("avg_prob")
+    counts = tau.history.column("phospho_count")
+    return {
+        "final_avg_prob": avg_probs[-1],
+        "mean_avg_prob": float(np.mean(avg_probs)),
+        "final_phospho_count": counts[-1],
+        "max_phospho_count": counts.max(),
+        "aggregation_state": AGGREGATION_STATES.index(tau.aggregation_state),
+    }
+
+
+def simulate_batched(environments, horizon, initial, isoform="4R"):
+    """
+    Run many grid points as one vectorized computation over a (points, sites) probability matrix, stepped by the
+    same site_engine.advance as SiteStateEngine with one constant pair per point.
+    Args:
+        environments (list): Environment per point.
+        horizon (int): Number of timepoints.
+        initial (np.ndarray): (points, sites) initial probabilities.
+        isoform (str): Tau isoform.
+    Returns:
+        dict: Metric name -> array over points.
+    """
+    tau = TauProtein(isoform=isoform, initial_probabilities=np.zeros(len(SITE_IDS)))
+    constants = np.array([tau.effective_constants(environment) for environment in environments])
+    k_p = constants[:, :1]
+    k_d = constants[:, 1:]
+    probs = np.array(initial, dtype=float)
+    gain = np.empty_like(probs)
+    loss = np.empty_like(probs)
+    avg_prob = probs.mean(axis=1)
+    count = np.count_nonzero(probs > 0.5, axis=1)
+    avg_sum = avg_prob.copy()
+    max_count = count.copy()
+    for _ in range(1, max(horizon, 1)):
+        advance(probs, k_p, k_d, probs, gain, loss)
+        avg_prob = probs.mean(axis=1)
+        count = np.count_nonzero(probs > 0.5, axis=1)
+        avg_sum += avg_prob
+        np.maximum(max_count, count, out=max_count)
+    states = []
+    for row in initial:
+        # The aggregation state depends only on the initial site state (see TauProtein.update_state).
+        tau.phosphorylation_sites = {site: np.array([p]) for site, p in zip(tau.phosphorylation_sites, row)}
+        tau.update_aggregation_state()
+        states.append(AGGREGATION_STATES.index(tau.aggregation_state))
+    return {
+        "final_avg_prob": avg_prob,
+        "mean_avg_prob": avg_sum / max(horizon, 1),
+        "final_phospho_count": count,
+        "max_phospho_count": max_count,
+        "aggregation_state": np.array(states, dtype=np.int8),
+    }
+
+
+def run_chunk(grid, indices, horizon, seed, batched, isoform="4R"):
+    """
+    Compute the metrics of a chunk of grid points.
+    Args:
+        grid (dict): Grid from parameter_grid.
+        indices (np.ndarray): Grid points in the chunk.
+        horizon (int): Number of timepoints.
+        seed (int): Sweep seed.
+        batched (bool): Use simulate_batched instead of per-point update_state runs.
+        isoform (str): Tau isoform.
+    Returns:
+        dict: Column name -> array over the chunk (parameters and metrics).
+    """
+    n_sites = len(SITE_IDS)
+    environments = [point_environment(grid, i) for i in indices]
+    initial = np.array([initial_probabilities(seed, i, n_sites) for i in indices])
+    if batched:
+        metrics = simulate_batched(environments, horizon, initial, isoform)
+    else:
+        rows = [simulate_point(env, horizon, init, isoform) for env, init in zip(environments, initial)]
+        metrics = {name: np.array([row[name] for row in rows]) for name in METRICS}
+    table = {name: grid[name][indices] for name in PARAMETERS}
+    table.update(metrics)
+    table["aggregation_state"] = table["aggregation_state"].astype(np.int8)
+    return table
+
+
+def _chunk_path(out_dir, chunk):
+    return os.path.join(out_dir, f"chunk_{chunk:05d}.npz")
+
+
+def _check_manifest(out_dir, manifest):
+    """
+    Write the sweep manifest, or verify that an existing one describes the same sweep.
+    """
+    path = os.path.join(out_dir, "sweep.json")
+    if os.path.exists(path):
+        with open(path) as handle:
+            existing = json.load(handle)
+        if existing != manifest:
+            raise ValueError(f"{out_dir} holds results of a different sweep; use another directory")
+        return
+    with open(path, "w") as handle:
+        json.dump(manifest, handle, indent=2)
+
+
+def run_sweep(grid, horizon=100, seed=0, out_dir=None, chunk_size=256, processes=1, batched=True, progress=None, isoform="4R"):
+    """
+    Run a parameter sweep and collect the per-point metrics into one columnar table.
+    Args:
+        grid (dict): Grid from parameter_grid.
+        horizon (int): Number of timepoints per point.
+        seed (int): Sweep seed; point i draws its initial state from (seed, i).
+        out_dir (str, optional): Directory for per-chunk partial results; existing chunks are reused.
+        chunk_size (int): Grid points per chunk.
+        processes (int): Worker processes; 1 runs in this process.
+        batched (bool): Vectorize each chunk instead of running points one by one.
+        progress (callable, optional): Called as progress(done_chunks, total_chunks).
+        isoform (str): Tau isoform.
+    Returns:
+        dict: Column name -> array over all grid points (parameters and metrics).
+    Raises:
+        ValueError: If the horizon is not positive, or out_dir holds a different sweep.
+    """
+    if horizon < 1:
+        raise ValueError(f"Horizon must be at least 1, got {horizon}")
+    n_points = len(grid[PARAMETERS[0]])
+    chunks = [np.arange(start, min(start + chunk_size, n_points)) for start in range(0, n_points, chunk_size)]
+    results = {}
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+        manifest = {
+            "parameters": {name: grid[name].tolist() for name in PARAMETERS},
+            "horizon": horizon,
+            "seed": seed,
+            "chunk_size": chunk_size,
+            "isoform": isoform,
+        }
+        _check_manifest(out_dir, manifest)
+        for chunk in range(len(chunks)):
+            if os.path.exists(_chunk_path(out_dir, chunk)):
+                with np.load(_chunk_path(out_dir, chunk)) as data:
+                    results[chunk] = {name: data[name] for name in data.files}
+    pending = [chunk for chunk in range(len(chunks)) if chunk not in results]
+
+    def finish(chunk, table):
+        results[chunk] = table
+        if out_dir is not None:
+            # Write then rename, so a killed sweep never leaves a truncated chunk behind.
+            partial = _chunk_path(out_dir, chunk) + ".part.npz"
+            np.savez(partial, **table)
+            os.replace(partial, _chunk_path(out_dir, chunk))
+        if progress is not None:
+            progress(len(results), len(chunks))
+
+    if processes == 1:
+        for chunk in pending:
+            finish(chunk, run_chunk(grid, chunks[chunk], horizon, seed, batched, isoform))
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = {
+                pool.submit(run_chunk, grid, chunks[chunk], horizon, seed, batched, isoform): chunk
+                for chunk in pending
+            }
+            for future in as_completed(futures):
+                finish(futures[future], future.result())
+    columns = PARAMETERS + METRICS
+    if not chunks:
+        return {name: np.empty(0) for name in columns}
+    return {name: np.concatenate([results[chunk][name] for chunk in range(len(chunks))]) for name in columns}
+
+
+def render_point(grid, index, horizon, seed, out_dir, isoform="4R"):
+    """
+    Re-run one grid point through update_state and write its summary plot and heatmap.
+    Args:
+        grid (dict): Grid from parameter_grid.
+        index (int): Grid point.
+        horizon (int): Number of timepoints.
+        seed (int): Sweep seed.
+        out_dir (str): Directory for the figures.
+        isoform (str): Tau isoform.
+    Returns:
+        list: Paths of the written figures.
+    """
+    initial = initial_probabilities(seed, index, len(SITE_IDS))
+    tau = TauProtein(isoform=isoform, initial_probabilities=initial)
+    timepoints = np.arange(horizon)
+    site_probabilities = tau.update_state(point_environment(grid, index), timepoints)
+    return [
+        plot_tau_summary(tau.history, path=os.path.join(out_dir, f"point_{index:06d}_summary.png")),
+        plot_phosphorylation_heatmap(site_probabilities, timepoints, path=os.path.join(out_dir, f"point_{index:06d}_heatmap.png")),
+    ]
+
+
+def render_points(grid, indices, horizon=100, seed=0, out_dir="sweep_figures", processes=1, isoform="4R"):
+    """
+    Write figures for selected grid points, rendering the points across worker processes.
+    Args:
+        grid (dict): Grid from parameter_grid.
+        indices (iterable): Grid points to render.
+        horizon (int): Number of timepoints.
+        seed (int): Sweep seed.
+        out_dir (str): Directory for the figures (created if missing).
+        processes (int): Worker processes.
+        isoform (str): Tau isoform.
+    Returns:
+        list: Paths of the written figures.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [(render_point, (grid, int(index), horizon, seed, out_dir, isoform), {}) for index in indices]
+    return [path for paths in render_batch(jobs, processes) for path in paths]
+
+
+def save_table(table, path):
+    """
+    Write a sweep table as CSV (one row per grid point).
+    Args:
+        table (dict): Column name -> array.
+        path (str): Output file.
+    """
+    names = list(table)
+    np.savetxt(path, np.column_stack([table[name] for name in names]), fmt="%.10g", delimiter=",", header=",".join(names), comments="")
+
+
+def main(argv=None):
+    """
+    Command-line entry point: python -m src.tau_project.simulation.sweep --temperature 30:42:13 ...
+    """
+    parser = argparse.ArgumentParser(description="Sweep the tau simulation over Environment parameter grids.")
+    for name in PARAMETERS:
+        parser.add_argument(f"--{name.replace('_', '-')}", default=None, help=f"start:stop:num or a,b,c (default {DEFAULTS[name]})")
+    parser.add_argument("--horizon", type=int, default=100, help="Timepoints per grid point")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="sweep_results", help="Directory for partial and final results")
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--per-point", action="store_true", help="Run points through update_state instead of the batched path")
+    parser.add_argument("--figures", default=None, help="Comma-separated grid points whose plots are written to OUT/figures")
+    args = parser.parse_args(argv)
+    ranges = {name: parse_range(getattr(args, name)) for name in PARAMETERS if getattr(args, name) is not None}
+    grid = parameter_grid(**ranges)
+
+    def report(done, total):
+        print(f"\r[sweep] {done}/{total} chunks", end="" if done < total else "\n", file=sys.stderr, flush=True)
+
+    table = run_sweep(
+        grid,
+        horizon=args.horizon,
+        seed=args.seed,
+        out_dir=args.out,
+        chunk_size=args.chunk_size,
+        processes=args.processes,
+        batched=not args.per_point,
+        progress=report,
+    )
+    save_table(table, os.path.join(args.out, "results.csv"))
+    np.savez(os.path.join(args.out, "results.npz"), **table)
+    print(f"{len(table['temperature'])} grid points written to {args.out}")
+    if args.figures:
+        indices = [int(index) for index in args.figures.split(",")]
+        figures = render_points(grid, indices, args.horizon, args.seed, os.path.join(args.out, "figures"), args.processes)
+        print(f"{len(figures)} figures written to {os.path.join(args.out, 'figures')}")
+    return table
+
+
+if __name__ == "__main__":
+    main()
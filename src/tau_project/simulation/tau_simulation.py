@@ -6,26 +6,68 @@ Runs a simulation of tau protein phosphorylation and aggregation over time under
 import numpy as np
 from ..models.tau_protein import TauProtein
 from ..environment import Environment
+from ..history import HistoryRecorder, as_columns
+from ..site_engine import SiteProbabilities
+from ..cache import fingerprint
 from ..plot_utils import plot_tau_summary, plot_site_probabilities, plot_phosphorylation_heatmap
 
 # --- Main Simulation and Visualization Functions ---
 
 
-def run_and_plot_simulation(env=None, plot_sites=False, plot_heatmap=False):
+def simulate_tau(env, n_timepoints=100, isoform="4R", seed=None, cache=None):
+    """
+    Run TauProtein.update_state, or serve a seeded run from the cache.
+    Args:
+        env: Environment object.
+        n_timepoints: Number of timepoints.
+        isoform: Tau isoform.
+        seed: Seed of the run; unseeded runs are never cached.
+        cache: ResultCache (optional).
+    Returns:
+        tuple: (tau, site_probabilities); a tau served from the cache carries the run's history and final
+        aggregation state.
+    """
+    def run():
+        tau = TauProtein(isoform=isoform, rng=np.random.default_rng(seed) if seed is not None else None)
+        return tau, tau.update_state(env, np.arange(n_timepoints))
+
+    if cache is None or seed is None:
+        return run()
+    computed = []
+
+    def compute():
+        tau, site_probabilities = run()
+        computed.append((tau, site_probabilities))
+        result = {"sites": np.asarray(site_probabilities.sites), "matrix": site_probabilities.matrix, "aggregation_state": tau.aggregation_state}
+        result.update({f"history/{name}": values for name, values in as_columns(tau.history).items()})
+        return result
+
+    result = cache.memoize(fingerprint("tau", env, isoform, n_timepoints, seed), compute)
+    if computed:
+        return computed[0]
+    tau = TauProtein(isoform=isoform, rng=np.random.default_rng(seed))
+    tau.history = HistoryRecorder()
+    tau.history.extend(**{name[len("history/"):]: values for name, values in result.items() if name.startswith("history/")})
+    tau.aggregation_state = result["aggregation_state"]
+    return tau, SiteProbabilities(result["sites"].tolist(), result["matrix"])
+
+
+def run_and_plot_simulation(env=None, plot_sites=False, plot_heatmap=False, seed=None, cache=None):
     """
     Runs the tau protein simulation and generates summary and (optionally) site-specific visualizations.
     Args:
         env: Environment object (optional). If None, uses default parameters.
         plot_sites: If True, plot all site probability trajectories.
         plot_heatmap: If True, plot a heatmap of all site probabilities.
+        seed: Seed of the run (optional); with a cache, a repeated seeded run is not recomputed.
+        cache: ResultCache (optional).
     """
     # Set up environment if not provided
     if env is None:
         env = Environment(temperature=39, kinase_level=1.5, oxidative_stress=0.2)
-    # Initialize tau protein and run simulation
-    tau = TauProtein(isoform="4R")
+    # Initialize tau protein and run simulation (or load a seeded run from the cache)
     timepoints = np.arange(100)
-    site_probabilities = tau.update_state(env, timepoints)
+    tau, site_probabilities = simulate_tau(env, len(timepoints), "4R", seed, cache)
     # Main summary plot
     plot_tau_summary(tau.history)
     # Optional: plot all site probability trajectories
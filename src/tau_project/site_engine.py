@@ -0,0 +1,304 @@
+"""
+site_engine.py
+Array-backed engine for the per-site phosphorylation recurrence used by TauProtein.update_state.
+State for every site is kept in one preallocated (n_sites, n_timepoints) NumPy matrix.
+With a fixed environment the recurrence is linear, so an analytic mode evaluates it in closed form.
+"""
+from collections.abc import Mapping
+
+import numpy as np
+
+MODES = ("step", "analytic")
+# Version of the simulation models' numerical results (site engine, phospho_utils, phospho_ssa, aggregation).
+# Bump it in every change that alters the results of a seeded run: it is part of every result-cache key, so
+# results of an older engine are never served as current ones.
+ENGINE_VERSION = 1
+
+
+def step_once(prob, k_p, k_d):
+    """
+    Apply one clamped step of the recurrence to a scalar probability.
+    Args:
+        prob (float): Current probability.
+        k_p (float): Effective phosphorylation constant.
+        k_d (float): Effective dephosphorylation constant.
+    Returns:
+        float: Probability at the next timepoint.
+    """
+    P_new = prob + (k_p * (1 - prob) - k_d * prob)
+    if P_new < 0:
+        return 0.0
+    if P_new > 1:
+        return 1.0
+    return P_new
+
+
+def advance(prev, k_p, k_d, out, gain, loss):
+    """
+    One step of the clamped recurrence for a block of rows, written into out.
+    k_p and k_d broadcast against prev, so one constant pair or one pair per row (as (n_rows, 1) columns of a
+    2-D block) both work. Same operation order as the scalar loop, so results match it bit for bit.
+    Args:
+        prev (np.ndarray): Probabilities at the previous timepoint.
+        k_p (float or np.ndarray): Effective phosphorylation constant(s).
+        k_d (float or np.ndarray): Effective dephosphorylation constant(s).
+        out (np.ndarray): Output, same shape as prev (may be prev itself).
+        gain (np.ndarray): Scratch buffer, same shape as prev.
+        loss (np.ndarray): Scratch buffer, same shape as prev.
+    """
+    np.subtract(1, prev, out=gain)
+    np.multiply(k_p, gain, out=gain)
+    np.multiply(k_d, prev, out=loss)
+    np.subtract(gain, loss, out=gain)
+    np.add(prev, gain, out=gain)
+    np.clip(gain, 0.0, 1.0, out=out)
+
+
+def closed_form(initial, k_p, k_d, t):
+    """
+    Evaluate the unclamped recurrence after t steps: P_t = P* + (P_0 - P*) * (1 - k_p - k_d) ** t.
+    Broadcasts over initial, k_p, k_d and t.
+    Args:
+        initial (float or np.ndarray): Initial probabilities.
+        k_p (float or np.ndarray): Effective phosphorylation constant.
+        k_d (float or np.ndarray): Effective dephosphorylation constant.
+        t (int or np.ndarray): Number of steps.
+    Returns:
+        np.ndarray: Probabilities after t steps.
+    """
+    initial = np.asarray(initial, dtype=float)
+    t = np.asarray(t, dtype=float)
+    total = np.asarray(k_p + k_d, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        fixed = np.where(total != 0, k_p / total, 0.0)
+        geometric = fixed + (initial - fixed) * np.power(1 - total, t)
+    # k_p + k_d == 0 degenerates to a constant drift of k_p per step.
+    linear = initial + t * k_p
+    return np.where(total != 0, geometric, linear)
+
+
+def clamp_free(initial, k_p, k_d):
+    """
+    Check which trajectories never leave [0, 1], i.e. where the [0, 1] clamp never applies.
+    Args:
+        initial (float or np.ndarray): Initial probabilities.
+        k_p (float or np.ndarray): Effective phosphorylation constant.
+        k_d (float or np.ndarray): Effective dephosphorylation constant.
+    Returns:
+        np.ndarray: Boolean mask, True where closed_form is exact for every t.
+    """
+    initial = np.asarray(initial, dtype=float)
+    total = np.asarray(k_p + k_d, dtype=float)
+    ratio = 1 - total
+    first = initial + (k_p * (1 - initial) - k_d * initial)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fixed = np.where(total != 0, k_p / total, np.nan)
+
+    def inside(x):
+        return (x >= 0) & (x <= 1)
+
+    # 0 <= ratio < 1: monotone approach from P_0 towards P*.
+    monotone = (ratio >= 0) & (ratio < 1) & inside(fixed)
+    # -1 <= ratio < 0: damped oscillation bounded by P_0 and P_1.
+    oscillating = (ratio < 0) & (ratio >= -1) & inside(first)
+    # ratio == 1 without drift, or starting exactly on the fixed point.
+    stationary = ((total == 0) & (k_p == 0)) | (initial == fixed)
+    return inside(initial) & (monotone | oscillating | stationary)
+
+
+def probability_at(initial, k_p, k_d, t):
+    """
+    Probability of a single site after t steps, without materializing its trajectory.
+    Uses the closed form whenever the clamp cannot apply from the current state. Otherwise steps
+    until it either becomes clamp-free or revisits a clamped boundary value, which makes the rest periodic.
+    Args:
+        initial (float): Initial probability.
+        k_p (float): Effective phosphorylation constant.
+        k_d (float): Effective dephosphorylation constant.
+        t (int): Number of steps.
+    Returns:
+        float: Probability after t steps.
+    """
+    prob = float(initial)
+    step = 0
+    seen = {}
+    while step < t:
+        if clamp_free(prob, k_p, k_d):
+            return float(np.clip(closed_form(prob, k_p, k_d, t - step), 0.0, 1.0))
+        if prob in (0.0, 1.0):
+            if prob in seen:
+                period = step - seen[prob]
+                step = t - (t - step) % period
+                seen = {}
+                continue
+            seen[prob] = step
+        prob = step_once(prob, k_p, k_d)
+        step += 1
+    return prob
+
+
+class SiteProbabilities(Mapping):
+    """
+    Read-only mapping view over a (n_sites, n_timepoints) probability matrix.
+    Preserves the historical dict-of-lists shape returned by TauProtein.update_state:
+    each key is a site and each value is that site's trajectory (a row view, not a copy).
+    """
+
+    def __init__(self, sites, matrix):
+        """
+        Initialize a SiteProbabilities view.
+        Args:
+            sites (iterable): Site identifiers, in row order.
+            matrix (np.ndarray): Probability matrix of shape (n_sites, n_timepoints).
+        """
+        self.sites = list(sites)
+        self.matrix = matrix
+        self._rows = {site: row for row, site in enumerate(self.sites)}
+
+    def __getitem__(self, site):
+        return self.matrix[self._rows[site]]
+
+    def __iter__(self):
+        return iter(self.sites)
+
+    def __len__(self):
+        return len(self.sites)
+
+    def to_dict(self):
+        """
+        Materialize the view as a plain dict of Python lists.
+        Returns:
+            dict: Site -> list of probabilities.
+        """
+        return {site: self.matrix[row].tolist() for site, row in self._rows.items()}
+
+
+class SiteStateEngine:
+    """
+    Advances the clamped linear recurrence P_new = P + k_p * (1 - P) - k_d * P for all sites at once.
+    """
+
+    def __init__(self, sites, initial, k_p, k_d):
+        """
+        Initialize a SiteStateEngine.
+        Args:
+            sites (iterable): Site identifiers.
+            initial (array-like): Initial probability of each site.
+            k_p (float): Effective phosphorylation constant.
+            k_d (float): Effective dephosphorylation constant.
+        """
+        self.sites = list(sites)
+        self.initial = np.asarray(initial, dtype=float).reshape(len(self.sites))
+        self.k_p = k_p
+        self.k_d = k_d
+        self.probabilities = None
+
+    @classmethod
+    def from_sites(cls, phosphorylation_sites, k_p, k_d):
+        """
+        Build an engine from a TauProtein.phosphorylation_sites dict.
+        Args:
+            phosphorylation_sites (dict): Site -> array holding the initial probability.
+            k_p (float): Effective phosphorylation constant.
+            k_d (float): Effective dephosphorylation constant.
+        Returns:
+            SiteStateEngine: New engine.
+        """
+        sites = list(phosphorylation_sites)
+        initial = [float(np.asarray(phosphorylation_sites[site]).flat[0]) for site in sites]
+        return cls(sites, initial, k_p, k_d)
+
+    def run(self, n_timepoints, mode="step"):
+        """
+        Fill the probability matrix for n_timepoints timepoints (column 0 holds the initial state).
+        Args:
+            n_timepoints (int): Number of timepoints to fill.
+            mode (str): 'step' advances the recurrence one timepoint at a time; 'analytic' evaluates
+                the closed form and only steps the sites for which clamping applies.
+        Returns:
+            SiteProbabilities: Mapping view of the filled matrix.
+        Raises:
+            ValueError: If the mode is unknown.
+        """
+        n_timepoints = max(int(n_timepoints), 1)
+        # Fortran order keeps each timepoint's column contiguous for the per-step update.
+        probs = np.empty((len(self.sites), n_timepoints), dtype=float, order="F")
+        self.fill(probs, 0, n_timepoints, mode)
+        self.probabilities = probs
+        return self.view()
+
+    def fill(self, probs, start, stop, mode="step"):
+        """
+        Fill columns [start, stop) of a probability matrix; column start - 1 must already be filled.
+        Filling a matrix in consecutive segments gives exactly the same values as filling it at once.
+        Args:
+            probs (np.ndarray): Matrix of shape (n_sites, n_timepoints).
+            start (int): First column to fill (0 writes the initial state).
+            stop (int): End of the columns to fill.
+            mode (str): 'step' or 'analytic' (see run).
+        Raises:
+            ValueError: If the mode is unknown.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode: {mode}")
+        if start >= stop:
+            return
+        first = max(start - 1, 0)
+        if mode == "step":
+            self._step(self.initial if start == 0 else probs[:, first].copy(), probs[:, first:stop])
+            return
+        exact = clamp_free(self.initial, self.k_p, self.k_d)
+        t = np.arange(start, stop)
+        probs[exact, start:stop] = np.clip(closed_form(self.initial[exact, None], self.k_p, self.k_d, t), 0.0, 1.0)
+        if not exact.all():
+            clamped = np.empty((int(np.count_nonzero(~exact)), stop - first), order="F")
+            self._step(self.initial[~exact] if start == 0 else probs[~exact, first], clamped)
+            probs[~exact, first:stop] = clamped
+
+    def _step(self, initial, probs):
+        """
+        Advance the recurrence column by column into a preallocated matrix.
+        Args:
+            initial (np.ndarray): Initial probability of each row.
+            probs (np.ndarray): Output matrix of shape (len(initial), n_timepoints).
+        """
+        probs[:, 0] = initial
+        gain = np.empty(len(initial))
+        loss = np.empty(len(initial))
+        for i in range(1, probs.shape[1]):
+            advance(probs[:, i - 1], self.k_p, self.k_d, probs[:, i], gain, loss)
+
+    def probability_at(self, site, t):
+        """
+        Probability of one site at timepoint index t, computed directly from the initial state.
+        Args:
+            site: Site identifier.
+            t (int): Timepoint index.
+        Returns:
+            float: Site probability at t.
+        """
+        return probability_at(self.initial[self.sites.index(site)], self.k_p, self.k_d, t)
+
+    def view(self):
+        """
+        Returns:
+            SiteProbabilities: Mapping view of the current probability matrix.
+        """
+        return SiteProbabilities(self.sites, self.probabilities)
+
+    def phospho_counts(self, threshold=0.5):
+        """
+        Count sites above threshold at every timepoint.
+        Args:
+            threshold (float): Probability above which a site counts as phosphorylated.
+        Returns:
+            np.ndarray: Count per timepoint.
+        """
+        return np.count_nonzero(self.probabilities > threshold, axis=0)
+
+    def average_probabilities(self):
+        """
+        Returns:
+            np.ndarray: Mean site probability per timepoint.
+        """
+        return self.probabilities.mean(axis=0)
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from src.tau_project.aggregation import AggregationKinetics, pivot_split, simulate_population, size_bins
+from src.tau_project.environment import Environment
+from src.tau_project.models.tau_protein import TauProtein
+
+
+def test_pivot_split_conserves_number_and_mass():
+    sizes = size_bins(max_size=1e6)
+    values = np.array([1.0, 7.0, 33.5, 1234.5, 9.9e5])
+    lower, lower_weight, upper, upper_weight = pivot_split(sizes, values)
+    assert np.allclose(lower_weight + upper_weight, 1)
+    assert np.allclose(lower_weight * sizes[lower] + upper_weight * sizes[upper], values)
+
+
+def test_bins_stay_bounded():
+    assert len(size_bins(max_size=1e9)) < 2 * len(size_bins(max_size=1e6))
+
+
+def test_population_conserves_mass():
+    kinetics = AggregationKinetics(n_monomers=2e6, nucleation_rate=1e-2, elongation_rate=5, coagulation_rate=1, fragmentation_rate=1e-4)
+    result = kinetics.run(np.full(100, 0.7))
+    mass = result.total_mass()
+    assert mass == pytest.approx(np.full_like(mass, 2e6), rel=1e-9)
+    assert (result.concentrations >= 0).all()
+    assert result.fraction_above(2)[-1] > 0.5
+
+
+def test_phosphorylation_drives_aggregation():
+    low = AggregationKinetics().run(np.full(60, 0.2))
+    high = AggregationKinetics().run(np.full(60, 0.8))
+    assert high.fraction_above(2)[-1] > low.fraction_above(2)[-1]
+
+
+def test_population_driven_by_update_state():
+    np.random.seed(0)
+    tau = TauProtein()
+    result = simulate_population(tau, Environment(39, 1.5, 1.0, 1.0, 0.2), np.arange(30))
+    assert result.concentrations.shape == (31, len(result.sizes))
+    assert np.allclose(result.avg_prob, [entry["avg_prob"] for entry in tau.history])
@@ -0,0 +1,61 @@
+import json
+import numpy as np
+import pytest
+from src.tau_project.result_store import ResultStore
+from src.tau_project.simulation.batch import load_jobs, normalize_jobs, run_batch
+
+JOBS = [
+    {"name": "tau", "model": "tau", "environment": {"temperature": 41}, "outputs": ["trajectory", "history"]},
+    {"name": "phospho", "model": "phospho", "PTMs": [[163, "Acetyl"]]},
+    {"name": "ssa", "model": "ssa", "mode": "tau_leap"},
+    {"name": "broken", "model": "phospho", "PTMs": [[1, "Phosphorylation"]]},
+]
+
+
+def write_jobs(path, jobs, defaults=None):
+    path.write_text(json.dumps({"defaults": defaults or {}, "jobs": jobs}))
+    return str(path)
+
+
+def test_batch_streams_results_and_reports_failures(tmp_path):
+    jobs = load_jobs(write_jobs(tmp_path / "jobs.json", JOBS, {"horizon": 30, "replicates": 2}))
+    out = tmp_path / "out"
+    report = run_batch(jobs, str(out), retries=1)
+    assert sorted(report["completed"]) == ["phospho", "ssa", "tau"]
+    assert list(report["failed"]) == ["broken"]
+    log = [json.loads(line) for line in (out / "jobs.jsonl").read_text().splitlines()]
+    assert {entry["name"]: entry["attempts"] for entry in log}["broken"] == 2
+    assert "broken" in json.loads((out / "errors.json").read_text())
+    store = ResultStore(out / "tau")
+    assert store.read("trajectory").shape == (2, 30)
+    assert len(store.read_history("replicate_001/history")) == 30
+    again = run_batch(jobs, str(out), retries=0)
+    assert sorted(again["skipped"]) == ["phospho", "ssa", "tau"] and not again["completed"]
+
+
+def test_batch_results_do_not_depend_on_process_count(tmp_path):
+    jobs = normalize_jobs(JOBS[:3], {"horizon": 20, "replicates": 2, "seed": 5})
+    run_batch(jobs, str(tmp_path / "serial"))
+    run_batch(jobs, str(tmp_path / "parallel"), processes=2, max_in_flight=2)
+    for job in jobs:
+        serial = ResultStore(tmp_path / "serial" / job["name"]).read("trajectory")[...]
+        parallel = ResultStore(tmp_path / "parallel" / job["name"]).read("trajectory")[...]
+        assert np.array_equal(serial, parallel)
+        assert not np.array_equal(serial[0], serial[1])
+
+
+def test_invalid_specs_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        normalize_jobs([{"model": "unknown"}])
+    with pytest.raises(ValueError):
+        normalize_jobs([{"model": "phospho", "outputs": ["history"]}])
+    with pytest.raises(ValueError):
+        normalize_jobs([{"name": "a"}, {"name": "a"}])
+    with pytest.raises(ValueError):
+        normalize_jobs([{"environment": {"humidity": 1}}])
+    for spec in [{"replicates": None}, {"PTMs": [5]}, {"outputs": 5}, {"name": {}}, {"horizon": True}, 3]:
+        with pytest.raises(ValueError):
+            normalize_jobs([spec])
+    path = tmp_path / "jobs.jsonl"
+    path.write_text('{"name": "x", "horizon": 5}\n\n{"name": "y", "model": "ssa"}\n')
+    assert [job["name"] for job in load_jobs(str(path))] == ["x", "y"]
@@ -0,0 +1,29 @@
+import json
+from benchmarks import suite
+from src.tau_project.site_engine import ENGINE_VERSION
+
+
+def test_suite_writes_json_and_flags_regressions(tmp_path):
+    results = suite.run_suite(["detect_motifs"], quick=True, repeat=2, min_time=0.001)
+    assert list(results["results"]) == ["detect_motifs[length=441]"]
+    assert results["results"]["detect_motifs[length=441]"]["params"] == {"length": 441}
+    path = tmp_path / "bench.json"
+    path.write_text(json.dumps(results))
+    baseline = json.loads(path.read_text())
+    baseline["results"]["detect_motifs[length=441]"]["median"] /= 2
+    [(key, before, after, ratio, regressed)] = suite.compare(results, baseline, threshold=0.25)
+    assert regressed and ratio == after / before
+    assert not any(row[4] for row in suite.compare(results, results))
+    assert results["meta"]["engine_version"] == ENGINE_VERSION
+
+
+def test_setup_runs_before_every_call():
+    calls = []
+    timing = suite.measure(lambda: calls.append("run"), repeat=2, min_time=0.0, setup=lambda: calls.append("setup"))
+    assert calls == ["setup", "run"] * (2 * timing["number"])
+
+
+def test_case_parameters_cover_the_grid():
+    combinations = suite.case_parameters({"horizon": [1, 2], "n_sites": [3, 4]})
+    assert len(combinations) == 4
+    assert suite.case_parameters({"horizon": [1, 2], "n_sites": [3, 4]}, quick=True) == [{"horizon": 1, "n_sites": 3}]
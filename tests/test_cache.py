@@ -0,0 +1,64 @@
+import os
+import numpy as np
+import pytest
+from src.tau_project import cache as cache_module
+from src.tau_project.cache import ResultCache, fingerprint
+from src.tau_project.environment import Environment
+from src.tau_project.simulation import tau_simulation
+
+
+def test_fingerprint_is_canonical():
+    env = Environment(39, 1.5, oxidative_stress=0.2)
+    same = Environment(39.0, 1.5, 1.0, 1.0, 0.2)
+    assert env.fingerprint() == same.fingerprint() and hash(env.fingerprint()) == hash(same.fingerprint())
+    key = fingerprint("tau", env, "4R", 100, 1)
+    assert key == fingerprint("tau", same, "4R", 100, 1)
+    assert key == fingerprint("tau", {"temperature": 39, "kinase_level": 1.5, "oxidative_stress": 0.2}, "4R", 100, 1)
+    assert key != fingerprint("tau", env, "4R", 100, 2)
+    assert key != fingerprint("tau", env, "3R", 100, 1)
+    env.temperature = 40
+    assert key != fingerprint("tau", env, "4R", 100, 1)
+    assert fingerprint("phospho", PTMs=[(163, "Acetyl")]) != fingerprint("phospho")
+
+
+def test_fingerprint_follows_the_engine_version(monkeypatch):
+    key = fingerprint("tau", Environment(), "4R", 100, 1)
+    monkeypatch.setattr(cache_module, "ENGINE_VERSION", cache_module.ENGINE_VERSION + 1)
+    assert fingerprint("tau", Environment(), "4R", 100, 1) != key
+
+
+def test_seeded_runs_are_memoized(tmp_path, monkeypatch):
+    env = Environment(39, 1.5, oxidative_stress=0.2)
+    cache = ResultCache(tmp_path)
+    tau, sites = tau_simulation.simulate_tau(env, 50, seed=3, cache=cache)
+    monkeypatch.setattr(tau_simulation.TauProtein, "update_state", lambda *args, **kwargs: pytest.fail("recomputed"))
+    cached_tau, cached_sites = tau_simulation.simulate_tau(env, 50, seed=3, cache=ResultCache(tmp_path))
+    assert np.array_equal(cached_sites.matrix, sites.matrix) and list(cached_sites) == list(sites)
+    assert np.array_equal(cached_tau.history.column("avg_prob"), tau.history.column("avg_prob"))
+    assert cached_tau.aggregation_state == tau.aggregation_state
+    tau_simulation.simulate_tau(env, 50, seed=3, cache=cache)
+    assert cache.hits == 1
+
+
+def test_unseeded_runs_are_not_cached(monkeypatch):
+    cache = ResultCache()
+    env = Environment()
+    first = tau_simulation.simulate_tau(env, 20, cache=cache)[1].matrix
+    second = tau_simulation.simulate_tau(env, 20, cache=cache)[1].matrix
+    assert not cache.memory and not np.array_equal(first, second)
+
+
+def test_lru_and_disk_eviction(tmp_path):
+    cache = ResultCache(tmp_path, max_entries=2)
+    for index in range(4):
+        cache.put(f"k{index}", {"values": np.full(200, index, dtype=np.float64), "label": f"run {index}"})
+        os.utime(tmp_path / f"k{index}.npz", (index, index))
+        if index == 0:
+            cache.max_bytes = 2.5 * os.path.getsize(tmp_path / "k0.npz")
+        cache._evict()
+    assert list(cache.memory) == ["k2", "k3"]
+    assert sorted(os.listdir(tmp_path)) == ["k2.npz", "k3.npz"]
+    reopened = ResultCache(tmp_path)
+    value = reopened.get("k2")
+    assert value["label"] == "run 2" and value["values"][0] == 2 and not value["values"].flags.writeable
+    assert reopened.get("k0") is None and (reopened.hits, reopened.misses) == (1, 1)
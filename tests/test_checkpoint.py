@@ -0,0 +1,83 @@
+import random
+import numpy as np
+import pytest
+from src.tau_project import phospho_utils
+from src.tau_project.checkpoint import Checkpointer
+from src.tau_project.environment import Environment
+from src.tau_project.models.isoforms import CANONICAL_SEQUENCE
+from src.tau_project.models.protein import Protein
+from src.tau_project.models.tau_protein import TauProtein
+from src.tau_project.site_engine import SiteStateEngine
+
+SEQUENCE = "Ser-Lys-Thr-Lys-Gly-Tyr-Lys-Ser"
+PRESETS = [(2, "Acetyl"), (4, "Acetyl"), (7, "Acetyl")]
+
+
+class DummyAA:
+    def __init__(self, three_letter, PTM=None):
+        self.three_letter = three_letter
+        self.PTM = PTM
+
+    def add_PTM(self, ptm):
+        self.PTM = {"Phosphorylation": "Phospho", "Acetylation": "Acetyl"}.get(ptm, ptm)
+
+    def remove_PTM(self):
+        self.PTM = None
+
+
+class DummyProteinClass:
+    def __init__(self, sequence):
+        self.sequence = [DummyAA(aa) for aa in sequence.split("-")]
+
+
+def seed(value):
+    random.seed(value)
+
+
+def crash_after(monkeypatch, module, name, calls):
+    original = getattr(module, name)
+    count = [0]
+
+    def wrapped(*args, **kwargs):
+        count[0] += 1
+        if count[0] > calls:
+            raise RuntimeError("simulated crash")
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(module, name, wrapped)
+
+
+@pytest.mark.parametrize("make_protein", [lambda: Protein("Tau", CANONICAL_SEQUENCE), lambda: DummyProteinClass(SEQUENCE)])
+def test_phospo_over_time_resumes_bit_identically(tmp_path, monkeypatch, make_protein):
+    presets = PRESETS if isinstance(make_protein(), DummyProteinClass) else None
+    seed(5)
+    reference = phospho_utils.phospo_over_time(make_protein(), 120, presets)
+    seed(5)
+    with monkeypatch.context() as patch:
+        crash_after(patch, phospho_utils, "phosphorylation", 53)
+        with pytest.raises(RuntimeError):
+            phospho_utils.phospo_over_time(make_protein(), 120, presets, checkpoint=Checkpointer(tmp_path, every=10))
+    seed(99)  # The checkpoint restores the RNG state.
+    resumed = phospho_utils.phospo_over_time(make_protein(), 120, presets, checkpoint=Checkpointer(tmp_path, every=10))
+    assert np.array_equal(resumed, reference)
+
+
+@pytest.mark.parametrize("mode", ["step", "analytic"])
+def test_update_state_resumes_bit_identically(tmp_path, monkeypatch, mode):
+    env = Environment(39, 1.5, oxidative_stress=0.2)
+    tau = TauProtein()
+    reference = tau.update_state(env, np.arange(500), mode=mode).matrix.copy()
+    with monkeypatch.context() as patch:
+        crash_after(patch, SiteStateEngine, "fill", 3)
+        with pytest.raises(RuntimeError):
+            tau.update_state(env, np.arange(500), mode=mode, checkpoint=Checkpointer(tmp_path, every=64))
+    resumed = tau.update_state(env, np.arange(500), mode=mode, checkpoint=Checkpointer(tmp_path, every=64))
+    assert np.array_equal(resumed.matrix, reference)
+    assert len(tau.history) == 500
+
+
+def test_checkpoint_of_other_run_is_rejected(tmp_path):
+    tau = TauProtein()
+    tau.update_state(Environment(), np.arange(20), checkpoint=Checkpointer(tmp_path, every=8))
+    with pytest.raises(ValueError):
+        tau.update_state(Environment(), np.arange(30), checkpoint=Checkpointer(tmp_path, every=8))
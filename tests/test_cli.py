@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+from src.tau_project import cli
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Cold start of `tau-project simulate` (interpreter excluded), in seconds; about 0.2 s when plotting stays lazy.
+SIMULATE_BUDGET = 1.5
+HEAVY_MODULES = ("matplotlib", "pandas", "seaborn")
+
+COLD_START = """
+import json, sys, time
+start = time.perf_counter()
+from src.tau_project import cli
+cli.main(["simulate", "--timepoints", "5"])
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "heavy": [name for name in %r if name in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def test_simulate_cold_start_is_lazy_and_within_budget():
+    result = subprocess.run([sys.executable, "-c", COLD_START], cwd=ROOT, capture_output=True, text=True, check=True)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    assert report["heavy"] == []
+    assert report["elapsed"] < SIMULATE_BUDGET
+
+
+def test_simulate_store_and_plot_round_trip(tmp_path, capsys):
+    store = str(tmp_path / "store")
+    assert cli.main(["simulate", "--timepoints", "40", "--seed", "3", "--store", store]) == 0
+    assert "Final aggregation state" in capsys.readouterr().out
+    assert cli.main(["plot", store, "--out", str(tmp_path / "figures"), "--kind", "summary", "heatmap"]) == 0
+    assert sorted(os.listdir(tmp_path / "figures")) == ["heatmap.png", "summary.png"]
+
+
+def test_batch_forwards_its_options(monkeypatch):
+    from src.tau_project.simulation import batch as batch_module
+
+    seen = []
+    monkeypatch.setattr(batch_module, "main", lambda argv: seen.append(argv) or 0)
+    assert cli.main(["batch", "jobs.json", "--processes", "2", "--max-in-flight", "3"]) == 0
+    assert seen == [["jobs.json", "--out", "batch_results", "--retries", "1", "--processes", "2", "--max-in-flight", "3"]]
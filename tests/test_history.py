@@ -0,0 +1,81 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from src.tau_project.environment import Environment
+from src.tau_project.history import HistoryRecorder
+from src.tau_project.models.tau_protein import TauProtein
+from src.tau_project.plot_utils import plot_tau_summary
+
+
+def record(recorder, n, blocks=(7, 30, 1)):
+    rng = np.random.default_rng(0)
+    avg = rng.random(n)
+    start = 0
+    while start < n:
+        for size in blocks:
+            stop = min(start + size, n)
+            steps = np.arange(start, stop)
+            recorder.extend(steps, steps, steps % 5, np.where(steps % 3, "oligomer", "fibril"), avg[start:stop])
+            start = stop
+    return avg
+
+
+def test_rows_match_former_dict_format():
+    tau = TauProtein()
+    tau.update_state(Environment(39, 1.5, oxidative_stress=0.2), np.arange(25))
+    assert len(tau.history) == 25
+    entry = tau.history[-1]
+    assert set(entry) == {"age", "minute", "phospho_count", "aggregation_state", "avg_prob"}
+    assert isinstance(entry["phospho_count"], int)
+    assert entry["aggregation_state"] == tau.aggregation_state
+    assert tau.history.column("aggregation_state").dtype == np.int8
+
+
+def test_stride_decimation_across_blocks():
+    recorder = HistoryRecorder(stride=4)
+    avg = record(recorder, 200)
+    assert np.array_equal(recorder.column("age"), np.arange(0, 200, 4))
+    assert np.array_equal(recorder.column("avg_prob"), avg[::4])
+
+
+def test_minmax_windows_keep_extremes():
+    recorder = HistoryRecorder(window=10)
+    avg = record(recorder, 95)
+    ages = recorder.column("age")
+    for start in range(0, 95, 10):
+        window = avg[start:start + 10]
+        kept = ages[(ages >= start) & (ages < start + 10)]
+        assert set(kept) == {start + window.argmin(), start + window.argmax()}
+
+
+def test_ring_buffer_keeps_latest_rows():
+    recorder = HistoryRecorder(max_rows=16)
+    avg = record(recorder, 150)
+    assert len(recorder) == 16
+    assert np.array_equal(recorder.column("age"), np.arange(134, 150))
+    assert np.array_equal(recorder.column("avg_prob"), avg[-16:])
+    assert recorder.states() == ["oligomer" if age % 3 else "fibril" for age in range(134, 150)]
+
+
+@pytest.mark.parametrize("options", [{}, {"max_rows": 16}, {"window": 10}])
+def test_indexing_matches_columns(options, monkeypatch):
+    recorder = HistoryRecorder(**options)
+    record(recorder, 95)
+    rows = recorder.to_dicts()
+    if "window" not in options:
+        # A single row is read from the stored arrays, without assembling the columns.
+        monkeypatch.setattr(recorder, "columns", None)
+    assert [recorder[i] for i in range(len(rows))] == rows
+    assert recorder[-1] == rows[-1] and recorder[-len(rows)] == rows[0]
+    with pytest.raises(IndexError):
+        recorder[len(rows)]
+
+
+def test_plot_summary_consumes_recorder(monkeypatch):
+    monkeypatch.setattr(plt, "show", lambda *args, **kwargs: None)
+    monkeypatch.setattr(HistoryRecorder, "__iter__", lambda self: pytest.fail("converted to dicts"))
+    tau = TauProtein()
+    tau.update_state(Environment(), np.arange(30), history=HistoryRecorder(stride=3))
+    plot_tau_summary(tau.history)
+    assert len(plt.gcf().axes[0].get_lines()[0].get_xdata()) == 10
+    plt.close("all")
@@ -0,0 +1,63 @@
+import csv
+import json
+import random
+import numpy as np
+from src.tau_project import phospho_utils
+from src.tau_project.checkpoint import Checkpointer
+from src.tau_project.environment import Environment
+from src.tau_project.instrumentation import Instrumentation
+from src.tau_project.models.isoforms import CANONICAL_SEQUENCE
+from src.tau_project.models.protein import Protein
+from src.tau_project.models.tau_protein import TauProtein
+
+
+def test_update_state_observer_matches_plain_run():
+    env = Environment(39, 1.5, oxidative_stress=0.2)
+    tau = TauProtein()
+    plain = tau.update_state(env, np.arange(250)).matrix.copy()
+    seen = []
+    observer = Instrumentation(every=100, callbacks=[lambda step, values, _: seen.append(step)])
+    observed = tau.update_state(env, np.arange(250), observer=observer)
+    assert np.array_equal(observed.matrix, plain)
+    assert seen == [100, 200]
+    assert observer.counters["steps"] == 250
+    assert {"rates", "engine", "aggregation", "history"} <= set(observer.timers)
+    assert observer.samples[0]["avg_prob"] == plain[:, 99].mean()
+
+
+def test_checkpointed_update_state_still_samples(tmp_path):
+    env = Environment(39, 1.5)
+    tau = TauProtein()
+    observed = Instrumentation(every=40)
+    tau.update_state(env, np.arange(250), observer=observed)
+    checkpointed = Instrumentation(every=40)
+    tau.update_state(env, np.arange(250), checkpoint=Checkpointer(tmp_path, every=64), observer=checkpointed)
+    assert [sample["step"] for sample in checkpointed.samples] == list(range(40, 250, 40))
+    assert checkpointed.samples == observed.samples
+
+
+def test_phospo_over_time_counters_and_unchanged_results():
+    random.seed(3)
+    plain = phospho_utils.phospo_over_time(Protein("Tau", CANONICAL_SEQUENCE), 80)
+    random.seed(3)
+    observer = Instrumentation(every=10)
+    observed = phospho_utils.phospo_over_time(Protein("Tau", CANONICAL_SEQUENCE), 80, observer=observer)
+    assert np.array_equal(observed, plain)
+    assert observer.counters["steps"] == 80
+    assert observer.counters["ptm_events"] > 0
+    assert observer.counters["random_draws"] >= 80 * 10
+    assert {"rates", "draws", "mutation"} <= set(observer.timers)
+    assert [sample["step"] for sample in observer.samples] == list(range(10, 81, 10))
+    assert observer.steps_per_second > 0
+
+
+def test_report_and_export(tmp_path):
+    observer = Instrumentation(every=50)
+    TauProtein().update_state(Environment(), np.arange(200), observer=observer)
+    assert "update_state" in observer.report() and "steps" in observer.report()
+    observer.export(tmp_path / "profile.json")
+    assert json.loads((tmp_path / "profile.json").read_text())["counters"]["steps"] == 200
+    observer.export(tmp_path / "samples.csv")
+    with open(tmp_path / "samples.csv") as handle:
+        rows = list(csv.DictReader(handle))
+    assert [int(row["step"]) for row in rows] == [50, 100, 150, 200]
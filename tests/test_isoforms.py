@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from src.tau_project.models.isoforms import CANONICAL_SEQUENCE, ISOFORMS, isoform, translate_sites
+from src.tau_project.models.sequence import PHOSPHO
+from src.tau_project.models.tau_protein import TauProtein
+
+LENGTHS = {"0N3R": 352, "1N3R": 381, "2N3R": 410, "0N4R": 383, "1N4R": 412, "2N4R": 441}
+
+
+def test_isoform_lengths_and_sequences():
+    assert len(CANONICAL_SEQUENCE) == 441
+    for name in ISOFORMS:
+        view = isoform(name)
+        assert len(view) == LENGTHS[name]
+        assert view.residue_sequence().one_letter_string() == view.sequence_string()
+        assert "".join(CANONICAL_SEQUENCE[p - 1] for p in view.canonical_positions) == view.sequence_string()
+    assert isoform("4R") is isoform("2N4R")
+    assert "VQIINKKLDLSNVQSKCGSKDNIKHVPGGGS" not in isoform("2N3R").sequence_string()
+    with pytest.raises(ValueError):
+        isoform("3N4R")
+
+
+def test_molecules_share_the_isoform_buffer():
+    first, second = TauProtein.from_isoform("0N3R"), TauProtein.from_isoform("0N3R")
+    assert first.isoform == "0N3R" and first.length == 352
+    assert first.sequence.codes is second.sequence.codes and not first.sequence.codes.flags.writeable
+    assert all(np.shares_memory(view, isoform("2N4R").codes) for view in isoform("0N3R").segment_views())
+    first.sequence.set_ptm(isoform("0N3R").from_canonical(202) - 1, PHOSPHO)
+    assert first.sequence.candidate_phospho_count() == 1
+    assert second.sequence.ptm_codes.sum() == 0
+
+
+def test_site_translation():
+    sites = ["S202", "T205", "T231", "S396", "S404"]
+    assert translate_sites(sites, "2N4R", "0N3R") == ["S144", "T147", "T173", "S307", "S315"]
+    assert translate_sites(translate_sites(sites, "2N4R", "0N4R"), "0N4R", "2N4R") == sites
+    assert translate_sites([50, 280, 100], "2N4R", "1N3R") == [50, None, None]
+    assert isoform("1N4R").from_canonical(isoform("1N4R").to_canonical(200)) == 200
+    with pytest.raises(ValueError):
+        translate_sites(["T202"])
@@ -0,0 +1,38 @@
+import re
+import numpy as np
+import pytest
+from src.tau_project.models.motifs import MotifIndex
+from src.tau_project.models.sequence import ResidueSequence
+from src.tau_project.models.tau_protein import TauProtein
+
+MOTIFS = ("VQIINK", "VQIVYK", "VQI", "KK", "K[A-Z]K")
+
+
+def test_counts_match_findall():
+    rng = np.random.default_rng(0)
+    text = "".join(rng.choice(list("VQIKNY"), size=5000)) + "VQIINKVQIVYKKKK"
+    index = MotifIndex(MOTIFS).scan(text)
+    for motif in MOTIFS:
+        assert index.count(motif) == len(re.findall(motif, text)), motif
+        assert np.array_equal(index.hits[motif], [m.start() for m in re.finditer(motif, text)])
+    assert index.count() == sum(len(re.findall(m, text)) for m in MOTIFS)
+
+
+def test_invalid_motifs_raise():
+    with pytest.raises(ValueError):
+        MotifIndex(["VQI", "VQI"])
+    with pytest.raises(ValueError):
+        MotifIndex([""])
+
+
+def test_tau_caches_index_until_truncation():
+    tau = TauProtein()
+    tau.sequence = ResidueSequence.from_identifiers("GGVQIINKGGGVQIVYKGDVQIVYK")
+    assert tau.detect_aggregation_motifs() == 3
+    index = tau.motif_index()
+    assert tau.motif_index() is index
+    tau.add_aggregation_motifs("GGG")
+    assert tau.detect_aggregation_motifs() == 4
+    tau.truncate("D19")
+    assert tau.motif_index() is not index
+    assert tau.detect_aggregation_motifs() == 3
@@ -0,0 +1,99 @@
+import random
+import numpy as np
+import pytest
+from src.tau_project.phospho_utils import PhosphoEnsemble, phospo_over_time, phospo_over_time_ensemble
+
+
+class DummyAA:
+    def __init__(self, three_letter, PTM=None):
+        self.three_letter = three_letter
+        self.PTM = PTM
+
+    def add_PTM(self, ptm):
+        self.PTM = {"Phosphorylation": "Phospho"}.get(ptm, ptm)
+
+    def remove_PTM(self):
+        self.PTM = None
+
+
+class DummyProteinClass:
+    def __init__(self, sequence):
+        self.sequence = [DummyAA(aa) for aa in sequence.split("-")]
+
+
+SEQUENCE = "Ser-Lys-Thr-Lys-Gly-Tyr-Lys-Ser"
+PRESETS = [(2, "Acetyl"), (4, "Acetyl"), (7, "Acetyl")]
+
+
+def test_ensemble_shape_and_template_untouched():
+    prot = DummyProteinClass(SEQUENCE)
+    data = phospo_over_time_ensemble(prot, 15, 32, PRESETS, rng=np.random.default_rng(0))
+    assert data.shape == (32, 15)
+    assert ((data >= 0) & (data <= 100)).all()
+    assert all(aa.PTM is None for aa in prot.sequence)
+
+
+def test_ensemble_makes_one_draw_per_step_and_chunk():
+    class CountingGenerator:
+        def __init__(self):
+            self.rng = np.random.default_rng(0)
+            self.calls = []
+
+        def random(self, shape):
+            self.calls.append(shape)
+            return self.rng.random(shape)
+
+    rng = CountingGenerator()
+    PhosphoEnsemble(DummyProteinClass(SEQUENCE), 10, PRESETS, rng=rng, chunk_size=4).run(6)
+    assert len(rng.calls) == 3 * 6
+
+
+def test_ensemble_full_ptm_codes_include_presets():
+    ensemble = PhosphoEnsemble(DummyProteinClass(SEQUENCE), 4, PRESETS, rng=np.random.default_rng(0))
+    ensemble.run(3)
+    codes = ensemble.ptm_codes
+    assert codes.shape == (4, 8)
+    assert (codes[:, [1, 3, 6]] == 2).all()
+
+
+def test_ensemble_rejects_invalid_preset():
+    with pytest.raises(Exception):
+        PhosphoEnsemble(DummyProteinClass(SEQUENCE), 4, [(5, "Acetyl")])
+
+
+def test_ensemble_matches_reference_distribution():
+    random.seed(0)
+    n, time = 600, 12
+    reference = np.array(
+        [phospo_over_time(DummyProteinClass(SEQUENCE), time, PRESETS) for _ in range(n)]
+    )
+    ensemble = phospo_over_time_ensemble(
+        DummyProteinClass(SEQUENCE), time, 20000, PRESETS, rng=np.random.default_rng(1)
+    )
+    stderr = reference.std(axis=0) / np.sqrt(n) + 1e-9
+    assert (np.abs(ensemble.mean(axis=0) - reference.mean(axis=0)) < 4 * stderr).all()
+
+
+def test_counted_protein_path_matches_reference_distribution():
+    from src.tau_project.models.protein import Protein
+
+    random.seed(2)
+    np.random.seed(2)
+    n, time = 600, 12
+    reference = np.array(
+        [phospo_over_time(DummyProteinClass(SEQUENCE), time, PRESETS) for _ in range(n)]
+    )
+    counted = np.array([phospo_over_time(Protein("P", "SKTKGYKS"), time, PRESETS) for _ in range(n)])
+    stderr = np.sqrt((reference.var(axis=0) + counted.var(axis=0)) / n) + 1e-9
+    assert (np.abs(counted.mean(axis=0) - reference.mean(axis=0)) < 4 * stderr).all()
+
+
+def test_random_seed_alone_reproduces_the_counted_path():
+    from src.tau_project.models.protein import Protein
+
+    runs = []
+    for numpy_seed in (0, 1):
+        random.seed(7)
+        np.random.seed(numpy_seed)
+        runs.append(phospo_over_time(Protein("P", "SKTKGYKSSTY" * 20), 40, PRESETS))
+    assert np.array_equal(runs[0], runs[1])
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from src.tau_project.models.isoforms import CANONICAL_SEQUENCE
+from src.tau_project.models.protein import Protein
+from src.tau_project.phospho_ssa import PhosphoSSA, phospo_over_time_ssa
+from src.tau_project.phospho_utils import phosphorylation_constants
+
+
+def phosphorylated_serines(n):
+    prot = Protein("P", "S" * n)
+    prot.sequence.set_ptm_codes(np.arange(n), 1)
+    return prot
+
+
+@pytest.mark.parametrize("mode", ["exact", "tau_leap"])
+def test_pure_dephosphorylation_matches_step_probability(mode):
+    n = 40000
+    log = PhosphoSSA(phosphorylated_serines(n), 0.0, 0.02, rng=np.random.default_rng(0)).run(50, mode=mode)
+    expected = n * 0.98 ** np.array([10, 50])
+    assert np.allclose(log.phospho_count([10, 50]), expected, rtol=0.02)
+
+
+def test_tau_leap_batches_events():
+    log = PhosphoSSA(phosphorylated_serines(40000), 0.0, 0.02, rng=np.random.default_rng(1)).run(50, mode="tau_leap")
+    assert len(np.unique(log.times)) < len(log) / 20
+
+
+def test_event_log_state_matches_written_protein():
+    prot = Protein("T", CANONICAL_SEQUENCE[:44] * 5)
+    percentages = phospo_over_time_ssa(prot, 300, rng=np.random.default_rng(2))
+    assert percentages.shape == (300,)
+    final = np.count_nonzero(prot.sequence.ptm_codes == 1)
+    assert percentages[-1] == pytest.approx(final / prot.sequence.n_candidates * 100)
+    assert prot.sequence.candidate_phospho_count() == final
+
+
+def test_unknown_mode_raises():
+    with pytest.raises(ValueError):
+        PhosphoSSA(phosphorylated_serines(3), 0.1, 0.1).run(5, mode="euler")
+
+
+def test_constants_come_from_presets_without_modifying_the_protein():
+    prot = Protein("Tau", CANONICAL_SEQUENCE)
+    ssa = PhosphoSSA(prot, list_of_PTMs=[(163, "Acetyl")], rng=np.random.default_rng(4))
+    assert prot.sequence.ptm_count("Acetyl") == 0
+    reference = phosphorylation_constants(Protein("Tau", CANONICAL_SEQUENCE), [(163, "Acetyl")], np.random.default_rng(4))
+    assert (ssa.phospho_k, ssa.dephospho_k) == reference
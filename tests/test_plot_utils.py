@@ -0,0 +1,57 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from src.tau_project.environment import Environment
+from src.tau_project.models.tau_protein import TauProtein
+from src.tau_project.plot_utils import (
+    block_average,
+    minmax_downsample,
+    plot_phosphorylation_heatmap,
+    plot_site_probabilities,
+    plot_tau_summary,
+)
+from src.tau_project.simulation.sweep import parameter_grid, render_points
+
+
+def test_minmax_downsample_keeps_extremes_within_budget():
+    x = np.arange(100_000)
+    y = np.sin(x / 500.0)
+    y[12_345] = 5.0
+    y[77_777] = -5.0
+    xs, ys = minmax_downsample(x, y, 1000)
+    assert len(xs) <= 1000
+    assert np.all(np.diff(xs) > 0)
+    assert ys.max() == 5.0 and ys.min() == -5.0
+    assert np.array_equal(ys, y[xs])
+    short_x, short_y = minmax_downsample(x[:10], y[:10], 1000)
+    assert np.array_equal(short_y, y[:10])
+
+
+def test_block_average_matches_blockwise_means():
+    matrix = np.random.default_rng(0).random((79, 1000))
+    cells, rows, cols = block_average(matrix, max_rows=100, max_cols=100)
+    assert cells.shape == (79, 100)
+    assert np.allclose(cells[:, 3], matrix[:, 30:40].mean(axis=1))
+    assert np.isclose(cells.mean(), matrix.mean())
+
+
+def test_plots_write_files_without_showing(tmp_path, monkeypatch):
+    monkeypatch.setattr(plt, "show", lambda *args, **kwargs: pytest.fail("figure shown"))
+    tau = TauProtein()
+    timepoints = np.arange(20_000)
+    probs = tau.update_state(Environment(), timepoints)
+    paths = [
+        plot_tau_summary(tau.history, path=tmp_path / "summary.png"),
+        plot_site_probabilities(probs, timepoints, path=tmp_path / "sites.png"),
+        plot_phosphorylation_heatmap(probs, timepoints, path=tmp_path / "heatmap.png"),
+    ]
+    assert all((tmp_path / name).stat().st_size > 0 for name in ("summary.png", "sites.png", "heatmap.png"))
+    assert paths[0] == str(tmp_path / "summary.png")
+    assert plt.get_fignums() == []
+
+
+def test_render_points_across_processes(tmp_path):
+    grid = parameter_grid(temperature=[37, 40])
+    paths = render_points(grid, [0, 1], horizon=30, out_dir=tmp_path, processes=2)
+    assert len(paths) == 4
+    assert all((tmp_path / path).exists() for path in paths)
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from src.tau_project.models.aa import AminoAcid_library
+from src.tau_project.models.isoforms import CANONICAL_SEQUENCE
+from src.tau_project.models.protein import Protein
+from src.tau_project.models.sequence import ResidueSequence, SequenceResidue
+from src.tau_project.models.truncation import ProteinTruncator
+
+SEQ = CANONICAL_SEQUENCE[:44]
+
+
+def test_protein_stores_uint8_codes():
+    prot = Protein("Tau", SEQ)
+    assert isinstance(prot.sequence, ResidueSequence)
+    assert prot.sequence.codes.dtype == np.uint8
+    assert prot.sequence.ptm_codes.dtype == np.uint8
+    assert prot.sequence.one_letter_string() == SEQ
+    assert [aa.one_letter for aa in prot.sequence] == list(SEQ)
+
+
+def test_unknown_identifier_raises():
+    with pytest.raises(ValueError):
+        Protein("Bad", "MAXB")
+
+
+def test_residue_ptm_writes_back_without_touching_library():
+    prot = Protein("Tau", SEQ)
+    lys = prot.sequence[len(SEQ) - 1]
+    assert isinstance(lys, SequenceResidue)
+    lys.add_PTM("Acetyl")
+    assert prot.sequence[len(SEQ) - 1].PTM == "Acetyl"
+    assert prot.sequence.ptm_counts()[2] == 1
+    assert all(not aa.PTM for aa in AminoAcid_library)
+    prot.sequence[-1].remove_PTM()
+    assert prot.sequence[-1].PTM is None
+
+
+def test_slices_and_truncation_share_arrays():
+    prot = Protein("Tau", SEQ)
+    truncated, trunc_aa = ProteinTruncator.truncate(prot.sequence, "D13")
+    assert trunc_aa.one_letter == "D"
+    assert len(truncated) == 13
+    assert np.shares_memory(truncated.codes, prot.sequence.codes)
+    assert truncated.one_letter_string() == SEQ[:13]
+
+
+def test_identifier_index_and_byte_table_agree():
+    by_three = ResidueSequence.from_identifiers(["Met", "ALA", "glutamic acid", "p"])
+    by_bytes = ResidueSequence.from_identifiers("maEP")
+    assert by_three.one_letter_string() == by_bytes.one_letter_string() == "MAEP"
+    with pytest.raises(ValueError):
+        ResidueSequence.from_identifiers("MAéP")
+
+
+def test_incremental_counters_track_writes_through_views():
+    prot = Protein("Tau", SEQ)
+    rng = np.random.default_rng(0)
+    serines = np.flatnonzero(prot.sequence.candidate_mask())
+    for index in rng.choice(serines, 5, replace=False):
+        prot.sequence[int(index)].add_PTM("Phosphorylation")
+    prot.sequence.set_ptm_codes(serines[:2], 0)
+    view = prot.sequence[:20]
+    view[0].add_PTM("Acetyl")
+    lys = len(SEQ) - 1
+    prot.sequence[lys].add_PTM("Acetyl")
+    for seq in (prot.sequence, view):
+        expected = np.bincount(seq.ptm_codes, minlength=6)
+        assert np.array_equal(seq.ptm_counts(), expected)
+        assert seq.candidate_phospho_count() == np.count_nonzero(seq.candidate_mask() & (seq.ptm_codes == 1))
+
+
+def test_weights_are_table_lookups_and_tracked_incrementally(monkeypatch):
+    from src.tau_project.models import aa as aa_module
+
+    prot = Protein("Tau", SEQ)
+    start = prot.molecular_weight()
+    monkeypatch.setattr(aa_module.re, "findall", lambda *args: pytest.fail("regex on hot path"))
+    serines = np.flatnonzero(prot.sequence.candidate_mask())
+    for index in serines[:3]:
+        prot.sequence[int(index)].add_PTM("Phosphorylation")
+    prot.sequence[int(serines[0])].remove_PTM()
+    masses = prot.sequence.tables.masses
+    gained = sum(masses[prot.sequence.codes[i], 1] - masses[prot.sequence.codes[i], 0] for i in serines[1:3])
+    assert prot.molecular_weight() == pytest.approx(start + gained)
+    fresh = prot.sequence.copy()
+    fresh.refresh_counts()
+    assert prot.molecular_weight() == pytest.approx(fresh.molecular_weight())
+    forms = np.stack([prot.sequence.ptm_codes, np.zeros_like(prot.sequence.ptm_codes)])
+    assert prot.sequence.proteoform_masses(forms) == pytest.approx([prot.molecular_weight(), start])
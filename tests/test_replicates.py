@@ -0,0 +1,62 @@
+import random
+import numpy as np
+import pytest
+from src.tau_project import phospho_utils
+from src.tau_project.checkpoint import Checkpointer
+from src.tau_project.environment import Environment
+from src.tau_project.models.isoforms import CANONICAL_SEQUENCE
+from src.tau_project.models.protein import Protein
+from src.tau_project.models.tau_protein import TauProtein
+from src.tau_project.rng import RandomBuffer, spawn_generators
+from src.tau_project.simulation.replicates import phospho_replicate, run_replicates, tau_replicate
+
+
+def test_replicates_are_reproducible_across_process_counts():
+    serial = run_replicates(phospho_replicate, 4, seed=11, args=(CANONICAL_SEQUENCE, 30))
+    parallel = run_replicates(phospho_replicate, 4, seed=11, processes=2, args=(CANONICAL_SEQUENCE, 30))
+    assert all(np.array_equal(a, b) for a, b in zip(serial, parallel))
+
+
+def test_replicates_are_independent():
+    results = run_replicates(tau_replicate, 3, seed=2, args=(Environment(), 10))
+    assert not np.array_equal(results[0], results[1])
+    assert not np.array_equal(results[1], results[2])
+    assert not np.array_equal(results[0], run_replicates(tau_replicate, 1, seed=3, args=(Environment(), 10))[0])
+
+
+def test_seeded_runs_leave_global_state_untouched():
+    random.seed(1)
+    np.random.seed(1)
+    expected = (random.random(), np.random.rand())
+    random.seed(1)
+    np.random.seed(1)
+    run_replicates(phospho_replicate, 2, seed=0, args=(CANONICAL_SEQUENCE, 5))
+    TauProtein(rng=np.random.default_rng(0)).phosphorylate("T231")
+    assert (random.random(), np.random.rand()) == expected
+
+
+def test_random_buffer_follows_generator_stream():
+    buffer = RandomBuffer(np.random.default_rng(4), size=3)
+    draws = [buffer.random() for _ in range(7)]
+    assert draws == np.random.default_rng(4).random(9)[:7].tolist()
+    first, second = spawn_generators(4, 2)
+    assert first.random() != second.random()
+
+
+def test_seeded_run_resumes_from_checkpoint(tmp_path, monkeypatch):
+    reference = phospho_utils.phospo_over_time(Protein("Tau", CANONICAL_SEQUENCE), 60, rng=np.random.default_rng(8))
+    original = phospho_utils.phosphorylation
+    calls = [0]
+
+    def crashing(*args, **kwargs):
+        calls[0] += 1
+        if calls[0] > 25:
+            raise RuntimeError("simulated crash")
+        return original(*args, **kwargs)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(phospho_utils, "phosphorylation", crashing)
+        with pytest.raises(RuntimeError):
+            phospho_utils.phospo_over_time(Protein("Tau", CANONICAL_SEQUENCE), 60, checkpoint=Checkpointer(tmp_path, every=10), rng=np.random.default_rng(8))
+    resumed = phospho_utils.phospo_over_time(Protein("Tau", CANONICAL_SEQUENCE), 60, checkpoint=Checkpointer(tmp_path, every=10), rng=np.random.default_rng(123))
+    assert np.array_equal(resumed, reference)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from src.tau_project.environment import Environment
+from src.tau_project.models.tau_protein import TauProtein
+from src.tau_project.result_store import ResultStore, save_update_state
+from src.tau_project.site_engine import ENGINE_VERSION
+
+
+def test_update_state_round_trip(tmp_path):
+    env = Environment(39, 1.5, oxidative_stress=0.2)
+    tau = TauProtein()
+    site_probabilities = tau.update_state(env, np.arange(100))
+    save_update_state(tmp_path / "run", tau, site_probabilities, env, seed=7, chunk_size=16)
+    store = ResultStore(tmp_path / "run")
+    assert store.meta["engine_version"] == ENGINE_VERSION
+    assert store.meta["environment"]["temperature"] == 39
+    assert store.meta["seed"] == 7 and store.meta["isoform"] == "4R"
+    matrix = store.read("site_probabilities")
+    assert matrix.shape == (79, 100) and matrix.n_chunks == 7
+    assert isinstance(matrix.chunk(0), np.memmap)
+    assert np.array_equal(np.asarray(matrix), site_probabilities.matrix)
+    assert np.array_equal(store.site_series(5), site_probabilities[5])
+    history = store.read_history()
+    assert history.to_dicts() == tau.history.to_dicts()
+
+
+def test_appends_and_slices_across_chunks(tmp_path):
+    store = ResultStore.create(tmp_path / "s", chunk_size=7)
+    data = np.arange(150, dtype=float).reshape(3, 50)
+    for start, stop in [(0, 10), (10, 11), (11, 50)]:
+        store.append("x", data[:, start:stop])
+    stored = ResultStore(tmp_path / "s").read("x")
+    for key in [1, (slice(None), slice(3, 40, 4)), (2, slice(None, None, -3)), (..., 49), (0, slice(5, 5)), (slice(0, 2), slice(-20, None))]:
+        assert np.array_equal(stored[key], data[key]), key
+    with pytest.raises(ValueError):
+        store.append("x", np.zeros((2, 3)))
+    with pytest.raises(ValueError):
+        ResultStore.create(tmp_path / "s")
+
+
+def test_read_table_strips_nested_prefixes(tmp_path):
+    store = ResultStore.create(tmp_path / "t", chunk_size=4)
+    table = {"minute": np.arange(6), "avg_prob": np.linspace(0, 1, 6)}
+    store.write_table(table, "replicate_000/history")
+    store.write_table({"minute": np.arange(3)}, "replicate_001/history")
+    read = ResultStore(tmp_path / "t").read_table("replicate_000/history")
+    assert set(read) == {"minute", "avg_prob"}
+    assert np.array_equal(np.asarray(read["avg_prob"]), table["avg_prob"])
@@ -0,0 +1,115 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from src.tau_project.service import ServiceBusy, SimulationService
+
+
+async def request(port, method, path, body=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+
+def run_service(scenario, **options):
+    async def main():
+        service = SimulationService(**options)
+        port = await service.start(port=0)
+        try:
+            return await scenario(service, port)
+        finally:
+            await service.stop()
+
+    return asyncio.run(main())
+
+
+def test_identical_requests_coalesce_on_process_pool(tmp_path):
+    spec = {"model": "phospho", "horizon": 40, "replicates": 2, "seed": 4}
+
+    async def scenario(service, port):
+        first, second, other = await asyncio.gather(
+            request(port, "POST", "/simulate", spec),
+            request(port, "POST", "/simulate", spec),
+            request(port, "POST", "/simulate", dict(spec, seed=5)),
+        )
+        return first, second, other, service.executed
+
+    first, second, other, executed = run_service(scenario, processes=2, store_dir=str(tmp_path))
+    assert first[0] == second[0] == other[0] == 200
+    assert first[1]["job"] == second[1]["job"] != other[1]["job"]
+    assert executed == 2
+    assert len(first[1]["result"]["trajectories"]) == 2
+    assert first[1]["result"]["trajectories"] != other[1]["result"]["trajectories"]
+
+
+def test_queued_jobs_and_result_store_handles(tmp_path):
+    async def scenario(service, port):
+        status, queued = await request(port, "POST", "/simulate", {"model": "tau", "horizon": 30, "store": True, "wait": False})
+        assert status == 202
+        while True:
+            status, job = await request(port, "GET", f"/jobs/{queued['job']}")
+            if job["status"] in ("done", "failed"):
+                break
+            await asyncio.sleep(0.01)
+        health = await request(port, "GET", "/health")
+        invalid = await request(port, "POST", "/simulate", {"model": "unknown"})
+        missing = await request(port, "GET", "/jobs/999999")
+        return job, health, invalid, missing
+
+    job, health, invalid, missing = run_service(scenario, processes=1, store_dir=str(tmp_path), executor=ThreadPoolExecutor(1))
+    assert job["status"] == "done"
+    assert (tmp_path / job["result"]["store"].rsplit("/", 1)[1] / "summary.json").exists()
+    assert health == (200, {"queued": 0, "running": 0, "executed": 1, "capacity": 64, "cache_hits": 0})
+    assert invalid[0] == 400 and missing[0] == 404
+
+
+def test_seeded_requests_are_served_from_the_cache(tmp_path):
+    spec = {"model": "ssa", "horizon": 30, "seed": 2}
+
+    async def scenario(service, port):
+        first = await request(port, "POST", "/simulate", spec)
+        again = await request(port, "POST", "/simulate", dict(spec, environment={"temperature": 37}))
+        return first, again, service.executed, service.cache.hits
+
+    first, again, executed, hits = run_service(scenario, processes=1, store_dir=str(tmp_path), executor=ThreadPoolExecutor(1))
+    assert first[1]["result"] == again[1]["result"]
+    assert executed == 1 and hits == 1
+
+
+def test_full_queue_applies_backpressure():
+    async def scenario():
+        service = SimulationService(processes=1, queue_size=2)
+        service.submit({"horizon": 10, "seed": 1})
+        service.submit({"horizon": 10, "seed": 2})
+        assert service.submit({"horizon": 10, "seed": 1}).id == "000001"  # Coalesced, so not rejected.
+        with pytest.raises(ServiceBusy):
+            service.submit({"horizon": 10, "seed": 3})
+        return await service.route("POST", "/simulate", json.dumps({"horizon": 10, "seed": 3}).encode())
+
+    assert asyncio.run(scenario())[0] == 503
+
+
+def test_invalid_content_length_is_a_bad_request():
+    async def scenario(service, port):
+        statuses = []
+        for length in ["abc", "-5"]:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(f"POST /simulate HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+            await writer.drain()
+            statuses.append(int((await reader.read()).split()[1]))
+            writer.close()
+        return statuses
+
+    assert run_service(scenario, processes=1) == [400, 400]
+
+
+def test_mistyped_body_is_a_bad_request():
+    async def scenario(service, port):
+        return [(await request(port, "POST", "/simulate", body))[0] for body in [{"replicates": None}, {"PTMs": [5]}, {"name": {}}]]
+
+    assert run_service(scenario, processes=1) == [400, 400, 400]
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from src.tau_project.environment import Environment
+from src.tau_project.models.tau_protein import TauProtein
+from src.tau_project.site_engine import SiteStateEngine, SiteProbabilities
+
+
+def reference_trajectories(initial, k_p, k_d, n_timepoints):
+    site_probabilities = {site: [p] for site, p in initial.items()}
+    for i in range(1, n_timepoints):
+        for site in site_probabilities:
+            prev = site_probabilities[site][-1]
+            P_new = prev + (k_p * (1 - prev) - k_d * prev)
+            if P_new < 0:
+                P_new = 0.0
+            elif P_new > 1:
+                P_new = 1.0
+            site_probabilities[site].append(P_new)
+    return site_probabilities
+
+
+@pytest.mark.parametrize("k_p,k_d", [(0.05, 0.02), (0.9, 0.6), (-0.3, 0.1)])
+def test_engine_matches_scalar_loop(k_p, k_d):
+    rng = np.random.default_rng(0)
+    initial = {site: float(p) for site, p in zip(range(1, 80), rng.random(79))}
+    expected = reference_trajectories(initial, k_p, k_d, 50)
+    view = SiteStateEngine(initial.keys(), list(initial.values()), k_p, k_d).run(50)
+    assert isinstance(view, SiteProbabilities)
+    assert view.to_dict() == expected
+
+
+def test_update_state_history_from_bulk_metrics():
+    tau = TauProtein(isoform="4R")
+    env = Environment(temperature=39, kinase_level=1.5, oxidative_stress=0.2)
+    timepoints = np.arange(20)
+    site_probabilities = tau.update_state(env, timepoints)
+    assert site_probabilities.matrix.shape == (79, 20)
+    assert set(site_probabilities) == set(tau.phosphorylation_sites)
+    for i, entry in enumerate(tau.history):
+        probs_now = [site_probabilities[site][i] for site in site_probabilities]
+        assert entry["phospho_count"] == sum(p > 0.5 for p in probs_now)
+        assert entry["avg_prob"] == pytest.approx(np.mean(probs_now))
+
+
+@pytest.mark.parametrize(
+    "k_p,k_d",
+    [(0.05, 0.02), (0.9, 0.6), (1.2, 0.7), (-0.3, 0.1), (0.3, -0.5), (0.0, 0.0), (2.0, 2.5)],
+)
+def test_analytic_mode_matches_stepping(k_p, k_d):
+    rng = np.random.default_rng(1)
+    initial = rng.random(79)
+    stepped = SiteStateEngine(range(79), initial, k_p, k_d).run(200).matrix
+    analytic = SiteStateEngine(range(79), initial, k_p, k_d).run(200, mode="analytic").matrix
+    np.testing.assert_allclose(analytic, stepped, atol=1e-9)
+    engine = SiteStateEngine(range(79), initial, k_p, k_d)
+    for t in (0, 1, 57, 199):
+        assert engine.probability_at(5, t) == pytest.approx(stepped[5, t], abs=1e-9)
+
+
+def test_site_probability_long_horizon():
+    tau = TauProtein(isoform="4R")
+    env = Environment(temperature=39, kinase_level=1.5, oxidative_stress=0.2)
+    k_p, k_d = tau.effective_constants(env)
+    assert tau.site_probability(env, 31, 10**7) == pytest.approx(k_p / (k_p + k_d))
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from src.tau_project.environment import Environment
+from src.tau_project.simulation import sweep
+
+
+def small_grid():
+    return sweep.parameter_grid(temperature=[35, 39, 41], kinase_level=[0.5, 2.0], oxidative_stress=[0.0, 0.6])
+
+
+def test_parameter_grid_is_cartesian():
+    grid = small_grid()
+    assert len(grid["temperature"]) == 12
+    assert set(grid["phosphatase_level"]) == {sweep.DEFAULTS["phosphatase_level"]}
+    assert np.array_equal(sweep.parse_range("30:42:7"), np.linspace(30, 42, 7))
+    with pytest.raises(ValueError):
+        sweep.parameter_grid(pressure=[1])
+
+
+def test_batched_matches_per_point():
+    grid = small_grid()
+    batched = sweep.run_sweep(grid, horizon=40, seed=3, chunk_size=5)
+    per_point = sweep.run_sweep(grid, horizon=40, seed=3, chunk_size=5, batched=False)
+    for name in sweep.METRICS:
+        assert np.allclose(batched[name], per_point[name]), name
+
+
+def test_sweep_resumes_from_partial_chunks(tmp_path):
+    grid = small_grid()
+    seen = []
+    first = sweep.run_sweep(grid, horizon=20, out_dir=tmp_path, chunk_size=4, progress=lambda d, t: seen.append((d, t)))
+    assert seen[-1] == (3, 3)
+    (tmp_path / "chunk_00001.npz").unlink()
+    seen.clear()
+    resumed = sweep.run_sweep(grid, horizon=20, out_dir=tmp_path, chunk_size=4, progress=lambda d, t: seen.append((d, t)))
+    assert seen == [(3, 3)]
+    for name in first:
+        assert np.array_equal(first[name], resumed[name])
+    with pytest.raises(ValueError):
+        sweep.run_sweep(grid, horizon=21, out_dir=tmp_path, chunk_size=4)
+
+
+def test_sweep_leaves_the_global_rng_alone(tmp_path):
+    grid = small_grid()
+    np.random.seed(5)
+    state = np.random.get_state()[1].copy()
+    sweep.simulate_point(Environment(), 10, np.linspace(0.1, 0.9, 79))
+    for batched in (True, False):
+        sweep.run_sweep(grid, horizon=10, seed=1, batched=batched)
+    sweep.render_point(grid, 0, 10, 1, str(tmp_path))
+    assert np.array_equal(np.random.get_state()[1], state)
+    with pytest.raises(ValueError):
+        sweep.run_sweep(grid, horizon=0, batched=False)
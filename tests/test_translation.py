@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from src.tau_project.models.protein import Protein
+from src.tau_project.models.sequence import ResidueSequence
+from src.tau_project.models import translation
+
+# Met-Ala-Glu-Pro-Arg-Gln followed by a stop codon and trailing bases.
+DNA = "ATGGCTGAACCGCGTCAGTAAGGC"
+
+
+def one_letter(codes):
+    return ResidueSequence(codes).one_letter_string()
+
+
+def test_codon_table_covers_all_codons():
+    table = translation.codon_table()
+    assert table.shape == (64,)
+    assert (table == translation.STOP).sum() == 3
+    assert not (table == 255).any()
+
+
+def test_protein_translate_stops_at_stop_codon():
+    prot = Protein("Tau")
+    prot.translate(DNA)
+    assert prot.sequence.one_letter_string() == "MAEPRQ"
+    assert prot.length == 6
+
+
+def test_six_frames_match_reverse_complement():
+    frames = translation.six_frame_translation(DNA)
+    complement = DNA[::-1].translate(str.maketrans("ACGT", "TGCA"))
+    for frame in range(3):
+        assert np.array_equal(frames[frame + 3], translation.translate(complement, frame=frame))
+
+
+def test_streamed_file_matches_in_memory(tmp_path):
+    rng = np.random.default_rng(0)
+    dna = "".join(rng.choice(list("ACGT"), size=3001))
+    path = tmp_path / "transcript.fa"
+    path.write_text(">tau transcript\n" + "\n".join(dna[i:i + 60] for i in range(0, len(dna), 60)) + "\n")
+    for frame in range(6):
+        streamed = np.concatenate(list(translation.translate_file(path, frame=frame, chunk_size=97)))
+        assert np.array_equal(streamed, translation.translate(dna, frame=frame))
+    prot = Protein.from_transcript_file("Tau", path)
+    assert one_letter(prot.sequence.codes) == one_letter(translation.translate(dna, to_stop=True))
+
+
+def test_invalid_nucleotide_raises():
+    with pytest.raises(ValueError):
+        translation.translate("ATGNNN")
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from src.tau_project.models.aa import AminoAcid_library
+from src.tau_project.models.isoforms import CANONICAL_SEQUENCE
+from src.tau_project.models.motifs import MotifIndex
+from src.tau_project.models.protein import Protein
+from src.tau_project.models.tau_protein import TauProtein
+from src.tau_project.models.truncation import ProteinTruncator
+
+SITES = ["D421", "D13", "D402"]
+
+
+def test_batch_truncation_returns_views():
+    sequence = Protein("Tau", CANONICAL_SEQUENCE).sequence
+    fragments = ProteinTruncator.truncate_batch(sequence, SITES)
+    assert [len(fragment) for fragment in fragments] == [421, 13, 402]
+    for fragment in fragments:
+        assert fragment.one_letter_string() == CANONICAL_SEQUENCE[:len(fragment)]
+        assert np.shares_memory(fragment.view().codes, sequence.codes)
+        assert fragment.cleavage_residue().one_letter == "D"
+    residue = ProteinTruncator.truncate_batch(CANONICAL_SEQUENCE, ["D13"])[0].cleavage_residue()
+    assert residue.three_letter == "Asp" and any(residue is aa for aa in AminoAcid_library)
+    with pytest.raises(ValueError):
+        ProteinTruncator.truncate_batch(sequence, ["D421", "S13"])
+    with pytest.raises(ValueError):
+        ProteinTruncator.truncate_batch(sequence, ["D442"])
+
+
+def test_fragment_library_and_motif_counts():
+    sequence = Protein("Tau", CANONICAL_SEQUENCE).sequence
+    fragments = ProteinTruncator.fragments(sequence, SITES + ["D13"])
+    assert [(f.offset, f.stop, f.site) for f in fragments] == [(0, 13, "D13"), (13, 402, "D402"), (402, 421, "D421"), (421, 441, None)]
+    assert "".join(f.one_letter_string() for f in fragments) == CANONICAL_SEQUENCE
+    motifs = ("VQIINK", "VQIVYK", "KK", "GGG")
+    counts = ProteinTruncator.motif_counts(fragments + ProteinTruncator.truncate_batch(sequence, SITES), motifs)
+    expected = [MotifIndex(motifs).scan(f.one_letter_string()).count() for f in fragments]
+    expected += [MotifIndex(motifs).scan(CANONICAL_SEQUENCE[:int(site[1:])]).count() for site in SITES]
+    assert counts.tolist() == expected
+
+
+def test_tau_truncation_scores_the_fragment_without_rescanning(monkeypatch):
+    tau = TauProtein.from_isoform("2N4R")
+    assert tau.detect_aggregation_motifs() == 2
+    monkeypatch.setattr(MotifIndex, "scan", lambda *args: pytest.fail("rescanned"))
+    tau.truncate("D295")
+    assert len(tau.sequence) == 295 and tau.is_truncated and tau.truncation_aa.one_letter == "D"
+    assert tau.detect_aggregation_motifs() == 1